@@ -2,7 +2,10 @@
 The entry point for the application, creates a dash web server.
 """
 from frontend.page import init
+from backend.user_input import INVESTMENT_CLASS_DICT
 
 if __name__ == '__main__':
+    # Refresh the binary data sets and load them while the page is being set up
+    INVESTMENT_CLASS_DICT.prefetch(background=True, convert=True)
     APP = init()
     APP.run_server(debug=True)
@@ -0,0 +1,227 @@
+"""
+This file measures risk and return on many paths of log values at once,
+such as portfolios sharing a calendar or the stationary bootstrap
+resamples of one investment, which give confidence intervals for the
+risk and return of each portfolio.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from backend.log_prices import YEAR_EXACT, YEAR, DAY_NS, log_growth_rate, date_positions
+from backend.risk_measures import VAR_LEVELS, risk_measure
+from backend.drawdown import DRAWDOWN_TYPES, drawdown_measures
+
+
+#Constants
+BOOTSTRAP_BLOCK = 90
+BOOTSTRAP_CHUNK = 50
+BOOTSTRAP_CONFIDENCE = 0.9
+
+
+def risk_return_days(calendar, start, end, risk_type='stddev', period=YEAR, freq=1):
+    """
+    Finds the days of a gap-free daily calendar that batch_risk_return needs.
+
+    Args:
+        calendar = DatetimeIndex of a gap-free daily calendar
+        start, end = start and end dates for measuring risk and return
+        other arguments = same as calc_risk
+    Returns:
+        Sorted NumPy array of positions on the calendar
+    """
+    frame = pd.DataFrame(index=calendar)
+    start_pos, end_pos = date_positions(frame, [start, end])
+    if risk_type in DRAWDOWN_TYPES:
+        return np.arange(start_pos, end_pos + 1)
+    samples = date_positions(frame, pd.date_range(start, end - timedelta(days=period),
+                                                  freq=timedelta(days=freq)))
+    return np.union1d(np.union1d(samples, samples + period), [start_pos, end_pos])
+
+
+def batch_risk_return(log_paths, calendar, start, end, days=None, return_type='percent',
+                      annualize_return=False, risk_type='stddev', annualize_risk=False,
+                      period=YEAR, freq=1, threshold=0, level=VAR_LEVELS[0]):
+    """
+    Measures the risk and return of many paths of log values on the same
+    gap-free daily calendar at once. The measures are the same as
+    calc_return and calc_risk on each path.
+
+    Args:
+        log_paths = 2-D array of log values (paths x days)
+        calendar = DatetimeIndex of a gap-free daily calendar
+        start, end = start and end dates for measuring risk and return
+        days = sorted positions on the calendar of the columns of log_paths
+            (by default every day); must include risk_return_days
+        other arguments = same as get_risk_return and calc_risk
+    Returns:
+        Tuple of NumPy arrays (risk, return) with one entry per path
+    """
+    paths = LogPaths(log_paths, calendar, days)
+    if risk_type in DRAWDOWN_TYPES:
+        risk = drawdown_measures(*paths.window(start, end), return_type=return_type)[risk_type]
+    else:
+        risk = risk_measure(paths.rolling_returns(start, end, period=period, freq=freq,
+                                                  return_type=return_type,
+                                                  annualize=annualize_risk),
+                            risk_type, threshold=threshold, level=level)
+    return risk, paths.returns([start], [end], return_type=return_type,
+                               annualize=annualize_return)[:, 0]
+
+
+class LogPaths(object):
+    """
+    Log values of many paths (such as portfolios or bootstrap resamples) on
+    the same gap-free daily calendar, kept only on the days that are needed.
+
+    Attributes:
+        log_values = 2-D array of log values (paths x days)
+        calendar = DatetimeIndex of the gap-free daily calendar
+        days = sorted positions on the calendar of the columns of log_values
+    """
+
+    def __init__(self, log_values, calendar, days=None):
+        self.log_values = log_values
+        self.calendar = calendar
+        self.days = np.arange(len(calendar)) if days is None else days
+        self._frame = pd.DataFrame(index=calendar)
+
+    def columns(self, dates):
+        """
+        Finds the columns of log_values holding some dates.
+
+        Args:
+            dates = dates to look up (must be among the days kept)
+        Returns:
+            NumPy array of column positions, one per date
+        """
+        return np.searchsorted(self.days, date_positions(self._frame, dates))
+
+    def returns(self, starts, ends, return_type='percent', annualize=False):
+        """
+        Calculates the rates of return of every path between many pairs of dates.
+
+        Args:
+            starts, ends = start and end dates of each investment
+            return_type = measure of return (percent or log)
+            annualize = whether to return annualized returns instead of total returns
+        Returns:
+            2-D NumPy array of rates of return (paths x pairs of dates)
+        """
+        starts, ends = pd.DatetimeIndex(starts), pd.DatetimeIndex(ends)
+        log_change = (self.log_values[:, self.columns(ends)] -
+                      self.log_values[:, self.columns(starts)])
+        if annualize:
+            div = (ends.asi8 - starts.asi8) / (YEAR_EXACT * DAY_NS)
+        else:
+            div = 1
+        return log_growth_rate(log_change, div, return_type=return_type)
+
+    def rolling_returns(self, start, end, period=YEAR, freq=1, return_type='percent',
+                        annualize=False):
+        """
+        Calculates the rolling returns of every path, sampled as in return_list.
+
+        Args:
+            same as return_list
+        Returns:
+            2-D NumPy array of rates of return (paths x sample days)
+        """
+        samples = pd.date_range(start, end - timedelta(days=period), freq=timedelta(days=freq))
+        return self.returns(samples, samples + timedelta(days=period), return_type=return_type,
+                            annualize=annualize)
+
+    def window(self, start, end):
+        """
+        Restricts the paths to the days between two dates.
+
+        Args:
+            start, end = start and end dates (must be among the days kept)
+        Returns:
+            Tuple of the log values (paths x days) and the positions of the days
+            on the calendar
+        """
+        first, last = self.columns([start, end])
+        return self.log_values[:, first:last + 1], self.days[first:last + 1]
+
+
+def stationary_bootstrap(num_days, resamples, block_length=BOOTSTRAP_BLOCK, seed=0):
+    """
+    Draws the days of stationary bootstrap resamples: blocks of consecutive
+    days (wrapping around at the end) with random starts and lengths
+    following a geometric distribution.
+
+    Args:
+        num_days = number of days to resample
+        resamples = number of resamples
+        block_length = average length of a block in days
+        seed = seed of the random numbers
+    Returns:
+        2-D NumPy array of day positions (resamples x days)
+    """
+    random = np.random.RandomState(seed)
+    new_block = random.random_sample((resamples, num_days)) < 1. / block_length
+    new_block[:, 0] = True
+    block_starts = random.randint(0, num_days, size=(resamples, num_days))
+    # Position in the resample where the current block started
+    started = np.maximum.accumulate(np.where(new_block, np.arange(num_days), 0), axis=1)
+    rows = np.arange(resamples)[:, None]
+    return (block_starts[rows, started] + np.arange(num_days) - started) % num_days
+
+
+def bootstrap_risk_return(log_prices, start, end, draws, chunk_size=BOOTSTRAP_CHUNK, **kwargs):
+    """
+    Measures risk and return on bootstrap resamples of the daily returns
+    of an investment between two dates, in batches of resamples.
+
+    Args:
+        log_prices = LogPrices of the investment on a gap-free daily calendar
+        start, end = start and end dates for measuring risk and return
+        draws = 2-D array of resampled day positions (resamples x days between
+            start and end), from stationary_bootstrap
+        chunk_size = number of resamples measured together
+        kwargs = measures of risk and return (see batch_risk_return)
+    Returns:
+        Tuple of NumPy arrays (risk, return) with one entry per resample
+    """
+    first, last = date_positions(log_prices, [start, end])
+    calendar = log_prices.index[first:last + 1]
+    daily = np.diff(log_prices.log_values[first:last + 1])
+    days = risk_return_days(calendar, start, end, risk_type=kwargs.get('risk_type', 'stddev'),
+                            period=kwargs.get('period', YEAR), freq=kwargs.get('freq', 1))
+    results = []
+    for chunk_start in range(0, len(draws), chunk_size):
+        chunk = draws[chunk_start:chunk_start + chunk_size]
+        paths = np.zeros((len(chunk), len(daily) + 1))
+        np.cumsum(daily[chunk], axis=1, out=paths[:, 1:])
+        results.append(batch_risk_return(paths[:, days], calendar, start, end, days=days,
+                                         **kwargs))
+    return tuple(np.concatenate(part) for part in zip(*results))
+
+
+def bootstrap_intervals(portfolios, start, end, resamples, seed=0, block_length=BOOTSTRAP_BLOCK,
+                        confidence=BOOTSTRAP_CONFIDENCE, **kwargs):
+    """
+    Calculates confidence intervals for the risk and return of portfolios
+    from stationary bootstrap resamples. Every portfolio is resampled on
+    the same days.
+
+    Args:
+        portfolios = list of LogPrices of the portfolios
+        start, end = start and end dates for measuring risk and return
+        resamples = number of resamples
+        seed = seed of the resamples
+        block_length = average length in days of the resampled blocks
+        confidence = confidence level of the intervals
+        kwargs = measures of risk and return (see batch_risk_return)
+    Returns:
+        Dataframe with Risk low, Risk high, Return low and Return high by portfolio
+    """
+    percentiles = [50 * (1 - confidence), 50 * (1 + confidence)]
+    draws = stationary_bootstrap((end - start).days, resamples, block_length, seed)
+    intervals = []
+    for portfolio in portfolios:
+        risk, returns = bootstrap_risk_return(portfolio, start, end, draws, **kwargs)
+        intervals.append(np.concatenate([np.percentile(risk, percentiles),
+                                         np.percentile(returns, percentiles)]))
+    return pd.DataFrame(np.array(intervals).reshape(-1, 4),
+                        columns=['Risk low', 'Risk high', 'Return low', 'Return high'])
@@ -0,0 +1,244 @@
+"""
+This file contains the registry of investment data sets, which loads each
+data set on first use, and the AssetMatrix that aligns several data sets
+on one shared daily calendar.
+"""
+import multiprocessing
+from collections import OrderedDict
+from collections.abc import Mapping
+from threading import Lock, Thread
+import numpy as np
+import pandas as pd
+from backend.log_prices import day_offset, LogPrices
+from backend.functions import invest_dataframe, binary_is_current, convert_dataset
+
+
+class DatasetRegistry(Mapping):
+    """
+    Dictionary translating descriptions of investment classes to data sets,
+    which loads each data set the first time it is looked up and keeps it
+    for the rest of the process. Investment classes without a data file
+    are listed with the value None.
+    """
+
+    def __init__(self, filenames, loader=invest_dataframe):
+        """
+        Args:
+            filenames = dictionary of investment class descriptions to CSV file names
+                (or None if there is no data yet)
+            loader = function loading a CSV file name into a data frame
+        """
+        self._filenames = OrderedDict(filenames)
+        self._loader = loader
+        self._loaded = {}
+        self._matrix = None
+        self._lock = Lock()
+        self._matrix_lock = Lock()
+
+    def __getitem__(self, name):
+        filename = self._filenames[name]
+        if filename is None:
+            return None
+        data = self._loaded.get(name)
+        if data is None:
+            with self._lock:
+                data = self._loaded.get(name)
+                if data is None:
+                    data = self._loaded[name] = self._loader(filename)
+        return data
+
+    def __iter__(self):
+        return iter(self._filenames)
+
+    def __len__(self):
+        return len(self._filenames)
+
+    def is_loaded(self, name):
+        """
+        Checks whether a data set has been loaded already.
+
+        Args:
+            name = description of the investment class
+        Returns:
+            True if the data set is loaded
+        """
+        return name in self._loaded
+
+    def matrix(self, names=None):
+        """
+        Aligns data sets into one shared AssetMatrix. It holds the investment
+        classes asked for so far and those already loaded, and is rebuilt with
+        more columns when another is asked for, so only the data sets in use
+        are loaded.
+
+        Args:
+            names = descriptions of the investment classes needed
+                (None for every investment class that has data)
+        Returns:
+            AssetMatrix holding at least the investment classes that have data
+        """
+        if names is None:
+            names = list(self)
+        names = set(name for name in names if self._filenames[name] is not None)
+        with self._matrix_lock:
+            held = set(self._matrix.columns) if self._matrix is not None else set()
+            if not names.issubset(held):
+                held |= names | set(self._loaded)
+                self._matrix = AssetMatrix(OrderedDict((name, self[name]) for name in self
+                                                       if name in held))
+            return self._matrix
+
+    def convert(self):
+        """
+        Writes the binary form of every data set whose CSV file is newer
+        than its binary form (see convert_dataset).
+
+        Returns:
+            List of CSV file names that were converted
+        """
+        converted = []
+        for filename in self._filenames.values():
+            if filename is None:
+                continue
+            if not binary_is_current(filename):
+                convert_dataset(filename)
+                converted.append(filename)
+        return converted
+
+    def prefetch(self, background=False, convert=False):
+        """
+        Loads every data set ahead of its first use.
+
+        Args:
+            background = whether to load in a background thread and return immediately
+            convert = whether to update the binary form of the data sets first
+        Returns:
+            The loading thread if background is True, else None
+        """
+        if not background:
+            if convert:
+                self.convert()
+            for name in self:
+                _ = self[name]
+            return None
+        thread = Thread(target=self.prefetch, kwargs={'convert': convert},
+                        name='dataset-prefetch')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+def pool_context():
+    """
+    Picks how worker processes are started: forked where the platform allows,
+    so they share the data sets already loaded by this process, else the default.
+
+    Returns:
+        multiprocessing context, whose Pool starts the workers
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+class AssetMatrix(object):
+    """
+    Holds several data sets as the columns of one contiguous 2-D array on a
+    shared daily calendar, so portfolio code can slice prices by integer
+    position instead of looking up each data set by date.
+
+    Attributes:
+        calendar = DatetimeIndex of the shared daily calendar
+        columns = descriptions of the investment classes, one per column
+        values = 2-D array of investment values (days x investment classes),
+            NaN outside the range of each data set
+        first, last = arrays with the position of the first and last valid day
+            of each investment class
+        log_values = log of values, so returns of each investment class are
+            differences of two entries (see LogPrices)
+    """
+
+    def __init__(self, frames):
+        """
+        Args:
+            frames = dictionary of investment class descriptions to data frames
+                on a gap-free daily calendar
+        """
+        self.columns = list(frames)
+        self._column_positions = {name: i for i, name in enumerate(self.columns)}
+        starts = [data.index[0] for data in frames.values()]
+        ends = [data.index[-1] for data in frames.values()]
+        self.calendar = pd.date_range(min(starts), max(ends))
+        self.first = np.array([(day - self.calendar[0]).days for day in starts], dtype=int)
+        self.last = np.array([(day - self.calendar[0]).days for day in ends], dtype=int)
+        self.values = np.full((len(self.calendar), len(self.columns)), np.nan)
+        for i, data in enumerate(frames.values()):
+            assert len(data) == self.last[i] - self.first[i] + 1
+            self.values[self.first[i]:self.last[i] + 1, i] = data.iloc[:, 0].values
+        self.log_values = np.log(self.values)
+
+    def log_prices(self, name):
+        """
+        Gets the LogPrices of one investment class over its valid range.
+
+        Args:
+            name = description of the investment class
+        Returns:
+            LogPrices of the investment class
+        """
+        i = self._column_positions[name]
+        return LogPrices(self.calendar[self.first[i]:self.last[i] + 1],
+                         self.log_values[self.first[i]:self.last[i] + 1, i])
+
+    def position(self, date):
+        """
+        Finds the position of a date on the shared calendar.
+
+        Args:
+            date = date to look up
+        Returns:
+            Integer position of the date
+        """
+        return day_offset(self.calendar, date)
+
+    def common_range(self, names):
+        """
+        Finds the positions of the first and last day covered by every one
+        of several investment classes.
+
+        Args:
+            names = descriptions of the investment classes
+        Returns:
+            Tuple of first and last positions on the calendar
+        """
+        cols = [self._column_positions[name] for name in names]
+        return self.first[cols].max(), self.last[cols].min()
+
+    def prices(self, names, first, last):
+        """
+        Slices the prices of several investment classes between two positions.
+
+        Args:
+            names = descriptions of the investment classes
+            first, last = first and last positions on the calendar (inclusive)
+        Returns:
+            2-D array of prices (days x investment classes)
+        """
+        cols = [self._column_positions[name] for name in names]
+        return self.values[first:last + 1, cols]
+
+
+def asset_matrix(investment_class_dict, names):
+    """
+    Gets an AssetMatrix holding the given investment classes.
+
+    Args:
+        investment_class_dict = dictionary to translate user input to data frames
+        names = descriptions of the investment classes needed
+    Returns:
+        The registry's shared AssetMatrix for a DatasetRegistry,
+        else a new AssetMatrix of the given investment classes
+    """
+    if isinstance(investment_class_dict, DatasetRegistry):
+        return investment_class_dict.matrix(names)
+    return AssetMatrix(OrderedDict((name, investment_class_dict[name]) for name in names))
@@ -2,12 +2,15 @@
 This file creates many examples of portfolios for the in-class demonstration.
 """
 import pandas as pd
+from backend.sweep import simplex_counts
 
 
 #Constants
 YEAR = 365
 QUARTER = 90
 MONTH = 30
+# Demo portfolios split 100% in steps of 20%
+DEMO_STEPS = 5
 
 THRESHOLD_A = 0
 THRESHOLD_B = None
@@ -35,54 +38,32 @@ def demo_portfolios(initial, rebal_time, start, end, _user_parameters,
     Returns:
         A list of portfolios
     """
-    # pylint: disable=invalid-name, too-many-locals, redefined-outer-name
-    # Disabling a pylint errors since this function is readable
-    # with the single loop variable names (invalid-name) and all of them
-    # are required (too-many-locals error)
-
-    # Large-medium-small capitalization U.S. stock splits
-
-    splits = {}
+    # Each group lists its investment classes in the order of the label;
+    # bond splits list their classes from the shortest term in each portfolio
+    groups = []
     if stock_only:
-        for x in range(0, 11, 2):
-            for y in range(0, 11 - x, 2):
-                z = 10 - x - y
-                label = "Stock LMS %d-%d-%d" % (x, y, z)
-                splits[label] = {
-                    'U.S. large-cap stocks (Wilshire index)': x / 10.,
-                    'U.S. mid-cap stocks (Wilshire index)': y / 10.,
-                    'U.S. small-cap stocks (Wilshire index)': z / 10.
-                }
-
-    # Short and medium term U.S. Treasury bond splits
-
+        # Large-medium-small capitalization U.S. stock splits
+        groups.append(("Stock LMS %d-%d-%d", [
+            'U.S. large-cap stocks (Wilshire index)',
+            'U.S. mid-cap stocks (Wilshire index)',
+            'U.S. small-cap stocks (Wilshire index)'
+        ], False))
     if bond_only:
-        for t in range(0, 11, 2):
-            for u in range(0, 11 - t, 2):
-                for v in range(0, 11 - t - u, 2):
-                    w = 10 - t - u - v
-                    label = "Bond split %d-%d-%d-%d" % (t, u, v, w)
-                    splits[label] = {
-                        'U.S. Treasury bonds, 0-1 year (S&P index)': w / 10.,
-                        'U.S. Treasury bonds, 1-3 year (S&P index)': v / 10.,
-                        'U.S. Treasury bonds, 3-5 year (S&P index)': u / 10.,
-                        'U.S. Treasury bonds, 5-7 year (S&P index)': t / 10.
-                    }
-
-    # Stock (3-tier) and total bond market mixed portfolios
-
+        # Short and medium term U.S. Treasury bond splits
+        groups.append(("Bond split %d-%d-%d-%d", [
+            'U.S. Treasury bonds, 5-7 year (S&P index)',
+            'U.S. Treasury bonds, 3-5 year (S&P index)',
+            'U.S. Treasury bonds, 1-3 year (S&P index)',
+            'U.S. Treasury bonds, 0-1 year (S&P index)'
+        ], True))
     if mix:
-        for p in range(0, 11, 2):
-            for q in range(0, 11 - p, 2):
-                for r in range(0, 11 - p - q, 2):
-                    s = 10 - p - q - r
-                    label = "Stock LMS - Total bond %d-%d-%d-%d" % (p, q, r, s)
-                    splits[label] = {
-                        'U.S. large-cap stocks (S&P 500 index)': p / 10.,
-                        'U.S. mid-cap stocks (Wilshire index)': q / 10.,
-                        'U.S. small-cap stocks (Wilshire index)': r / 10.,
-                        'U.S. Treasury bonds, total market (S&P index)': s / 10.
-                    }
+        # Stock (3-tier) and total bond market mixed portfolios
+        groups.append(("Stock LMS - Total bond %d-%d-%d-%d", [
+            'U.S. large-cap stocks (S&P 500 index)',
+            'U.S. mid-cap stocks (Wilshire index)',
+            'U.S. small-cap stocks (Wilshire index)',
+            'U.S. Treasury bonds, total market (S&P index)'
+        ], False))
 
     portfolios = [{
         'name': label,
@@ -94,11 +75,32 @@ def demo_portfolios(initial, rebal_time, start, end, _user_parameters,
             'Start date': start,
             'End date': end
         }
-    } for label, ivc in splits.items()]
+    } for label, ivc in demo_splits(groups).items()]
 
     return portfolios
 
 
+def demo_splits(groups):
+    """
+    Splits 100% in steps of 1/DEMO_STEPS between the investment classes of
+    each group of demo portfolios.
+
+    Args:
+        groups: list of tuples (label format, investment classes, whether
+            to list the classes of each portfolio in reverse order)
+    Returns:
+        A dictionary of investment classes and weights by label
+    """
+    splits = {}
+    for label_format, assets, reverse in groups:
+        for counts in simplex_counts(len(assets), DEMO_STEPS):
+            for row in counts:
+                label = label_format % tuple(row * 10 // DEMO_STEPS)
+                classes = [(asset, part / float(DEMO_STEPS)) for asset, part in zip(assets, row)]
+                splits[label] = dict(classes[::-1] if reverse else classes)
+    return splits
+
+
 #Test sets of user parameters for graphing
 TEST_USER_PARAM_A = {
     'Measure of return': 'Change in log of portfolio value',
@@ -0,0 +1,71 @@
+"""
+This file contains the drawdown measures of risk, which follow the fall
+of an investment from its previous peak day by day rather than its
+rolling returns.
+"""
+import numpy as np
+import pandas as pd
+from backend.log_prices import DAY_NS, date_positions, LogPrices, as_log_prices
+
+
+#Constants
+DRAWDOWN_TYPES = ('maxdd', 'avgdd', 'underwater')
+
+
+def drawdown_measures(log_values, days=None, return_type='percent'):
+    """
+    Calculates drawdown measures with a running maximum over the log values,
+    for one investment or for many at once.
+    - maxdd = maximum drawdown: largest fall from a previous peak
+    - avgdd = average drawdown over all days
+    - underwater = longest time (days) spent below a previous peak
+
+    Args:
+        log_values = NumPy array of log values, either one dimensional or
+            two dimensional with one row per investment and one column per date
+        days = day number of each column (by default the columns are consecutive days)
+        return_type = measure of the fall in value (percent or log)
+    Returns:
+        Dictionary of drawdown measures by name: floats for one investment,
+        or NumPy arrays with one entry per investment
+    """
+    log_values = np.asarray(log_values, dtype=float)
+    if days is None:
+        days = np.arange(log_values.shape[-1])
+    peak = np.maximum.accumulate(log_values, axis=-1)
+    log_drawdown = peak - log_values
+    if return_type == 'percent':
+        drawdown = -np.expm1(-log_drawdown)
+    else:
+        drawdown = log_drawdown
+    # Day of the latest peak: carry forward the day of each date that is at its peak
+    peak_day = np.maximum.accumulate(np.where(log_drawdown > 0, days[0], days), axis=-1)
+    return {
+        'maxdd': drawdown.max(axis=-1),
+        'avgdd': drawdown.mean(axis=-1),
+        'underwater': (days - peak_day).max(axis=-1)
+    }
+
+
+def calc_drawdown(data, start, end, return_type='percent'):
+    """
+    Calculates drawdown measures of an investment between two dates.
+    For LogPrices (such as cached portfolios) the result is memoized.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        start, end = start and end dates
+        return_type = measure of the fall in value (percent or log)
+    Returns:
+        Dictionary of drawdown measures by name (see drawdown_measures)
+    """
+    def _measures():
+        log_prices = as_log_prices(data)
+        first = date_positions(log_prices, [start])[0]
+        stop = np.searchsorted(log_prices.index.asi8, pd.Timestamp(end).value, side='right')
+        days = log_prices.index.asi8[first:stop] // DAY_NS
+        return drawdown_measures(log_prices.log_values[first:stop], days,
+                                 return_type=return_type)
+    if isinstance(data, LogPrices):
+        return data.memoize(('drawdown', start, end, return_type), _measures)
+    return _measures()
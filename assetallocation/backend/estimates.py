@@ -0,0 +1,246 @@
+"""
+This file estimates the risk and return of portfolios in closed form from
+the means and covariances of the returns of their investment classes,
+instead of tracking each portfolio's value day by day.
+- risk: the variance of a portfolio's rolling returns is about w' S w, where
+    S is the covariance of the investment classes' rolling returns and w the
+    weights; the probability of a return below a threshold (and annualized
+    percent returns) take log returns to be normal
+- return: the log growth of a portfolio rebalanced back to its weights is
+    about w' m + (w' diag(D) - w' D w) / 2 per day, where m and D are the mean
+    and covariance of daily log returns (the second term is the gain from
+    rebalancing between investment classes that do not move together)
+The means and covariances are computed once per set of investment classes,
+dates and measure of return, and cached, so each estimate is a few matrix products.
+"""
+from math import erf, sqrt
+from collections import OrderedDict, namedtuple
+from threading import Lock
+import numpy as np
+from backend.log_prices import YEAR_EXACT, YEAR, log_growth_rate
+from backend.datasets import asset_matrix
+
+# Number of moment estimates kept (the least recently used are dropped first)
+MOMENT_ESTIMATES_SIZE = 64
+
+# Error function applied to each entry of an array
+_ERF = np.vectorize(erf, otypes=[float])
+
+# Mean and covariance of the returns of several investment classes
+Moments = namedtuple('Moments', ['mean', 'cov'])
+
+
+def normal_cdf(values):
+    """
+    Calculates the probability of a standard normal variable below each value.
+
+    Args:
+        values = NumPy array of values
+    Returns:
+        NumPy array of probabilities
+    """
+    return 0.5 * (1 + _ERF(np.asarray(values, dtype=float) / sqrt(2)))
+
+
+def quadratic_form(weight_matrix, cov):
+    """
+    Calculates w' C w for each row w of a weight matrix.
+
+    Args:
+        weight_matrix = 2-D array of weights (portfolios x investment classes)
+        cov = 2-D covariance matrix of the investment classes
+    Returns:
+        NumPy array with one entry per portfolio
+    """
+    return (weight_matrix.dot(cov) * weight_matrix).sum(axis=1)
+
+
+class MomentEstimate(object):
+    """
+    Means and covariances of the returns of several investment classes,
+    from which the risk and return of any portfolio of them are estimated.
+
+    Attributes:
+        assets = descriptions of the investment classes
+        period = Moments of the rolling log returns of each investment class
+            (sampled as in return_list, not annualized)
+        percent_cov = covariance of the rolling percent returns of each investment class
+        daily = Moments of the daily log returns of each investment class
+            between the start and end dates
+        num_days = number of days between the start and end dates
+        return_type = measure of return (percent or log)
+        period_div = number of years in a period if rolling returns are annualized, else 1
+    """
+
+    def __init__(self, assets, period, percent_cov, daily, num_days, return_type='percent',
+                 period_div=1):
+        self.assets = assets
+        self.period = period
+        self.percent_cov = percent_cov
+        self.daily = daily
+        self.num_days = num_days
+        self.return_type = return_type
+        self.period_div = period_div
+
+    def log_moments(self, weight_matrix):
+        """
+        Estimates the mean and standard deviation of the rolling log returns
+        (not annualized) of many portfolios at once.
+
+        Args:
+            weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        Returns:
+            Tuple of NumPy arrays (mean, standard deviation) with one entry per portfolio
+        """
+        variance = quadratic_form(weight_matrix, self.period.cov)
+        # The log return of a mix is above the mix of log returns
+        mean = weight_matrix.dot(self.period.mean) + 0.5 * (
+            weight_matrix.dot(np.diag(self.period.cov)) - variance)
+        return mean, np.sqrt(np.maximum(variance, 0))
+
+    def risk(self, weight_matrix, risk_type='stddev', threshold=0):
+        """
+        Estimates the risk of many portfolios at once. Log returns are taken
+        to be normal, so annualized percent returns are lognormal; the percent
+        return over a period is the mix of the investment classes' percent returns.
+        Annualized percent returns over short periods have much heavier tails
+        than lognormal, so their standard deviation is the roughest estimate.
+
+        Args:
+            weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+            risk_type = stddev or proba
+            threshold = threshold rate of return (None is treated as 0)
+        Returns:
+            NumPy array with the risk of each portfolio
+        """
+        weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+        mean, stddev = self.log_moments(weight_matrix)
+        div = self.period_div
+        if risk_type == 'stddev':
+            if self.return_type == 'log':
+                return stddev / div
+            if div == 1:
+                return np.sqrt(np.maximum(quadratic_form(weight_matrix, self.percent_cov), 0))
+            mean, variance = mean / div, (stddev / div)**2
+            return np.sqrt(np.expm1(variance) * np.exp(2 * mean + variance))
+        if risk_type == 'proba':
+            if threshold is None:
+                threshold = 0
+            # Log return (not annualized) below which the return is below the threshold
+            cutoff = div * (threshold if self.return_type == 'log' else np.log1p(threshold))
+            return normal_cdf((cutoff - mean) / stddev)
+        raise Exception('Estimated risk measure must be stddev or proba.')
+
+    def returns(self, weight_matrix, annualize=False):
+        """
+        Estimates the return of many portfolios at once between the start and end dates.
+
+        Args:
+            weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+            annualize = whether to return annualized returns instead of total returns
+        Returns:
+            NumPy array with the rate of return of each portfolio
+        """
+        weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+        growth = weight_matrix.dot(self.daily.mean) + 0.5 * (
+            weight_matrix.dot(np.diag(self.daily.cov)) -
+            quadratic_form(weight_matrix, self.daily.cov))
+        div = self.num_days / YEAR_EXACT if annualize else 1
+        return log_growth_rate(growth * self.num_days, div, return_type=self.return_type)
+
+
+# Moment estimates by (sorted investment classes, start, end, period, freq, return_type,
+# annualize), least recently used first
+MOMENT_ESTIMATES = OrderedDict()
+MOMENT_ESTIMATES_LOCK = Lock()
+
+
+def moment_estimate(assets, start, end, investment_class_dict, period=YEAR, freq=1,
+                    return_type='percent', annualize=False):
+    """
+    Gets the means and covariances of the returns of some investment classes,
+    computing them the first time they are asked for (in any order of the classes).
+    Only the MOMENT_ESTIMATES_SIZE most recently used estimates are kept.
+
+    Args:
+        assets = descriptions of the investment classes
+        start, end = start and end dates for measuring risk and return
+        investment_class_dict = dictionary to translate user input to data frames
+        period = # of days over which to calculate rolling returns
+        freq = how often to sample rolling returns
+        return_type = measure of return (percent or log)
+        annualize = whether rolling returns are annualized
+    Returns:
+        MomentEstimate, with the investment classes in sorted order
+    """
+    assets = sorted(assets)
+    key = (tuple(assets), start, end, period, freq, return_type, annualize)
+    with MOMENT_ESTIMATES_LOCK:
+        if key in MOMENT_ESTIMATES:
+            MOMENT_ESTIMATES.move_to_end(key)
+        else:
+            MOMENT_ESTIMATES[key] = estimate_moments(
+                assets, start, end, investment_class_dict, period=period, freq=freq,
+                return_type=return_type, annualize=annualize)
+            if len(MOMENT_ESTIMATES) > MOMENT_ESTIMATES_SIZE:
+                MOMENT_ESTIMATES.popitem(last=False)
+        return MOMENT_ESTIMATES[key]
+
+
+def estimate_moments(assets, start, end, investment_class_dict, period=YEAR, freq=1,
+                     return_type='percent', annualize=False):
+    """
+    Computes the means and covariances of the returns of some investment classes.
+
+    Args:
+        same as moment_estimate
+    Returns:
+        MomentEstimate, with the investment classes in the order given
+    """
+    matrix = asset_matrix(investment_class_dict, assets)
+    first, last = matrix.position(start), matrix.position(end)
+    log_values = np.log(matrix.prices(assets, first, last))
+    # Rolling returns start every freq days and end by the end date
+    samples = np.arange(0, last - first - period + 1, freq)
+    rolling = log_values[samples + period] - log_values[samples]
+    return MomentEstimate(assets, sample_moments(rolling), sample_moments(np.expm1(rolling)).cov,
+                          sample_moments(np.diff(log_values, axis=0)), last - first,
+                          return_type=return_type,
+                          period_div=period / YEAR_EXACT if annualize else 1)
+
+
+def sample_moments(returns):
+    """
+    Calculates the mean and covariance of the returns of several investment classes.
+
+    Args:
+        returns = 2-D array of returns (samples x investment classes)
+    Returns:
+        Moments, with the covariance as a 2-D array even for one investment class
+    """
+    return Moments(returns.mean(axis=0),
+                   np.atleast_2d(np.cov(returns, rowvar=False, bias=True)))
+
+
+def estimate_risk_return(assets, weight_matrix, start, end, investment_class_dict,
+                         return_type='percent', annualize_return=False, risk_type='stddev',
+                         annualize_risk=False, period=YEAR, freq=1, threshold=0):
+    """
+    Estimates the risk and return of many portfolios holding the same
+    investment classes, in closed form (see MomentEstimate).
+
+    Args:
+        assets = descriptions of the investment classes
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        start, end = start and end dates for measuring risk and return
+        investment_class_dict = dictionary to translate user input to data frames
+        other arguments = same as get_risk_return (risk_type must be stddev or proba)
+    Returns:
+        Tuple of NumPy arrays (risk, return) with one entry per portfolio
+    """
+    estimate = moment_estimate(assets, start, end, investment_class_dict, period=period,
+                               freq=freq, return_type=return_type, annualize=annualize_risk)
+    # The estimate's investment classes are in sorted order
+    weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=float))[:, np.argsort(assets)]
+    return (estimate.risk(weight_matrix, risk_type=risk_type, threshold=threshold),
+            estimate.returns(weight_matrix, annualize=annualize_return))
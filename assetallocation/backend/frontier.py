@@ -0,0 +1,285 @@
+"""
+This file finds the efficient frontier of a set of investment classes: the
+portfolios that no other portfolio beats on both risk and return.
+Instead of evaluating every split on a grid, it climbs towards the best
+portfolio for a range of trade-offs between risk and return, moving weight
+between pairs of investment classes and evaluating each round of moves as
+one batch. Climbing only finds the convex part of the frontier, so the
+frontier is then refined where its points leave a gap or bend the wrong way,
+by evaluating the neighbours of the points on each side, until no new point
+needs it. The frontier keeps at most one point per bucket of risk.
+"""
+import numpy as np
+from backend.sweep import SWEEP_CHUNK, evaluate_weights
+
+# Number of trade-offs between risk and return to optimize
+FRONTIER_POINTS = 21
+# Smallest change of weight (the frontier's weights are multiples of it)
+FRONTIER_STEP = 0.01
+# First change of weight tried by the hill climb
+FRONTIER_START_STEP = 0.16
+# Number of buckets of risk, each holding at most one point of the frontier
+FRONTIER_BUCKETS = 50
+
+
+def pareto_front(risk, returns):
+    """
+    Finds the points that no other point beats with both lower risk
+    and higher return.
+
+    Args:
+        risk, returns = NumPy arrays with the risk and return of each point
+    Returns:
+        NumPy array with the positions of the Pareto-optimal points, by increasing risk
+    """
+    risk, returns = np.asarray(risk), np.asarray(returns)
+    order = np.lexsort((-returns, risk))
+    best_before = np.maximum.accumulate(np.concatenate([[-np.inf], returns[order][:-1]]))
+    return order[returns[order] > best_before]
+
+
+def risk_buckets(risk, buckets=FRONTIER_BUCKETS):
+    """
+    Splits the range of risk of the points of a frontier into buckets of
+    the same width. The first point (the lowest risk) is alone in bucket 0.
+
+    Args:
+        risk = NumPy array of the risk of the points, increasing
+        buckets = number of buckets after the first point
+    Returns:
+        NumPy array with the bucket of each point
+    """
+    width = (risk[-1] - risk[0]) / float(buckets)
+    if width == 0:
+        return np.zeros(len(risk), dtype=int)
+    return np.ceil((risk - risk[0]) / width).astype(int)
+
+
+def thin_front(risk, buckets=FRONTIER_BUCKETS):
+    """
+    Thins the points of a frontier to the last point (the highest return)
+    of each bucket of risk.
+
+    Args:
+        risk = NumPy array of the risk of the points, increasing
+        buckets = number of buckets after the first point
+    Returns:
+        NumPy array with the positions of the points kept
+    """
+    if len(risk) == 0:
+        return np.arange(0)
+    bucket = risk_buckets(risk, buckets)
+    return np.flatnonzero(np.append(np.diff(bucket) != 0, True))
+
+
+def rough_pairs(risk, returns, buckets=FRONTIER_BUCKETS):
+    """
+    Finds the pairs of adjacent points of a thinned frontier that need
+    refining: those with an empty bucket of risk between them (a gap) and
+    those around a point where the frontier bends up (a non-convexity, as
+    the return gained for each unit of risk should fall as risk grows).
+
+    Args:
+        risk, returns = NumPy arrays of the points, by increasing risk
+        buckets = number of buckets after the first point
+    Returns:
+        NumPy array with the position of the first point of each pair
+    """
+    if len(risk) < 2:
+        return np.arange(0)
+    rough = np.diff(risk_buckets(risk, buckets)) > 1
+    slopes = np.diff(returns) / np.diff(risk)
+    bends = slopes[1:] > slopes[:-1] * (1 + 1e-9)
+    rough[:-1] |= bends
+    rough[1:] |= bends
+    return np.flatnonzero(rough)
+
+
+def midpoint(counts_a, counts_b):
+    """
+    Finds the portfolio halfway between two portfolios, rounded to whole units.
+
+    Args:
+        counts_a, counts_b = tuples of the units of weight of each portfolio
+    Returns:
+        Tuple of the units of weight of the portfolio halfway between them
+    """
+    total = np.array(counts_a) + np.array(counts_b)
+    middle = total // 2
+    # The odd units left over go to the first classes with an odd total
+    odd = np.flatnonzero(total % 2)
+    middle[odd[:len(odd) // 2]] += 1
+    return tuple(middle)
+
+
+class FrontierSearch(object):
+    """
+    Portfolios evaluated while searching for the efficient frontier of some
+    investment classes, with weights counted in units of the smallest change
+    of weight. The risk and return of each portfolio are remembered.
+
+    Attributes:
+        units = number of units of weight in 100%
+        sizes = changes of weight tried (in units), from the first one down to 1
+        moves = 2-D array of the moves of one unit of weight between every
+            pair of investment classes (moves x classes)
+        evaluated = dictionary of (risk, return) by tuple of units of weight
+    """
+
+    def __init__(self, assets, rebal_time, start, end, investment_class_dict,
+                 step=FRONTIER_STEP, start_step=FRONTIER_START_STEP, **kwargs):
+        """
+        Args:
+            same as efficient_frontier
+        """
+        self.units = int(round(1 / step))
+        self.sizes = [max(int(round(start_step * self.units)), 1)]
+        while self.sizes[-1] > 1:
+            self.sizes.append(self.sizes[-1] // 2)
+        pairs = [(i, j) for i in range(len(assets)) for j in range(len(assets)) if i != j]
+        self.moves = np.zeros((len(pairs), len(assets)), dtype=int)
+        for row, (i, j) in enumerate(pairs):
+            self.moves[row, i], self.moves[row, j] = -1, 1
+        self.evaluated = {}
+        self._portfolios = (assets, rebal_time, start, end, investment_class_dict, kwargs)
+
+    def evaluate(self, counts_list):
+        """
+        Measures the risk and return of portfolios, evaluating those not seen
+        yet SWEEP_CHUNK at a time.
+
+        Args:
+            counts_list = list of tuples of units of weight
+        Returns:
+            2-D NumPy array of risk and return (portfolios x 2)
+        """
+        assets, rebal_time, start, end, investment_class_dict, kwargs = self._portfolios
+        missing = sorted(set(c for c in counts_list if c not in self.evaluated))
+        for chunk_start in range(0, len(missing), SWEEP_CHUNK):
+            chunk = missing[chunk_start:chunk_start + SWEEP_CHUNK]
+            risk, returns = evaluate_weights(assets, np.array(chunk) / float(self.units),
+                                             rebal_time, start, end, investment_class_dict,
+                                             **kwargs)
+            self.evaluated.update(zip(chunk, zip(risk, returns)))
+        return np.array([self.evaluated[c] for c in counts_list]).reshape(-1, 2)
+
+    def neighbours(self, counts, sizes=None):
+        """
+        Lists the portfolios one move of weight away from a portfolio.
+
+        Args:
+            counts = tuple of units of weight
+            sizes = changes of weight to move (by default every size tried)
+        Returns:
+            List of tuples of units of weight, without negative weights
+        """
+        sizes = self.sizes if sizes is None else sizes
+        candidates = np.concatenate([np.array(counts) + size * self.moves for size in sizes])
+        return [tuple(c) for c in candidates[(candidates >= 0).all(axis=1)]]
+
+    def climb(self, num_points=FRONTIER_POINTS):
+        """
+        Climbs to the portfolio maximizing (1 - t) * return - t * risk for
+        trade-offs t from 0 to 1 (each scaled by its range over single-class
+        portfolios), starting from the previous trade-off's best portfolio.
+        Each round tries every move of the current change of weight at once,
+        and halves the change when no move helps.
+
+        Args:
+            num_points = number of trade-offs between risk and return
+        """
+        corners = [tuple(self.units * row) for row in np.eye(self.moves.shape[1], dtype=int)]
+        corner_values = self.evaluate(corners)
+        scale = np.ptp(corner_values, axis=0)
+        scale[scale == 0] = 1
+        current = corners[int(np.argmax(corner_values[:, 1]))]
+        for trade_off in np.linspace(0, 1, num_points):
+            objective = np.array([-trade_off / scale[0], (1 - trade_off) / scale[1]])
+            current_value = self.evaluate([current])[0].dot(objective)
+            for size in self.sizes:
+                while True:
+                    candidates = self.neighbours(current, [size])
+                    values = self.evaluate(candidates).dot(objective)
+                    if len(values) == 0 or \
+                            values.max() <= current_value + 1e-12 * abs(current_value):
+                        break
+                    current, current_value = candidates[int(np.argmax(values))], values.max()
+
+    def front(self, buckets=FRONTIER_BUCKETS):
+        """
+        Finds the thinned Pareto front of every portfolio evaluated whose
+        risk and return are not NaN.
+
+        Args:
+            buckets = number of buckets of risk
+        Returns:
+            Tuple of the list of tuples of units of weight and the 2-D NumPy
+            array of their risk and return, by increasing risk
+        """
+        counts = sorted(c for c, value in self.evaluated.items() if np.isfinite(value).all())
+        values = np.array([self.evaluated[c] for c in counts]).reshape(-1, 2)
+        front = pareto_front(values[:, 0], values[:, 1])
+        front = front[thin_front(values[front, 0], buckets)]
+        return [counts[i] for i in front], values[front]
+
+    def refine(self, buckets=FRONTIER_BUCKETS):
+        """
+        Refines the front between the pairs of adjacent points found by
+        rough_pairs, evaluating the portfolio halfway between them and the
+        neighbours of each point (once per point), until the pairs left
+        have no new point.
+
+        Args:
+            buckets = number of buckets of risk
+        Returns:
+            Same as front
+        """
+        refined = set()
+        counts, values = self.front(buckets)
+        while True:
+            pairs = rough_pairs(values[:, 0], values[:, 1], buckets)
+            new_counts = sorted(set(counts[i] for i in np.union1d(pairs, pairs + 1)) - refined)
+            if not new_counts:
+                return counts, values
+            refined.update(new_counts)
+            self.evaluate([midpoint(counts[i], counts[i + 1]) for i in pairs] +
+                          [c for counts_a in new_counts for c in self.neighbours(counts_a)])
+            counts, values = self.front(buckets)
+
+
+def efficient_frontier(assets, rebal_time, start, end, investment_class_dict,
+                       num_points=FRONTIER_POINTS, step=FRONTIER_STEP,
+                       start_step=FRONTIER_START_STEP, buckets=FRONTIER_BUCKETS, **kwargs):
+    """
+    Finds the efficient frontier of portfolios holding some investment classes.
+    It climbs to the best portfolio of each trade-off between risk and return
+    (see FrontierSearch.climb), then refines the Pareto front of every
+    portfolio evaluated where it has gaps or bends up, so the frontier also
+    reaches portfolios that no trade-off favors and steps past plateaus of
+    measures such as proba. The frontier keeps the point with the highest
+    return in each bucket of risk. Portfolios whose risk or return is NaN
+    are left out.
+
+    Args:
+        assets = descriptions of the investment classes
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        start, end = start and end dates for measuring risk and return
+        investment_class_dict = dictionary to translate user input to data frames
+        num_points = number of trade-offs between risk and return
+        step = smallest change of weight
+        start_step = first change of weight tried
+        buckets = number of buckets of risk (the frontier has at most buckets + 1 points)
+        kwargs = measures of risk and return (see sweep.evaluate_weights)
+    Returns:
+        NumPy structured array with fields weights, risk and return of the
+        frontier portfolios, by increasing risk
+    """
+    search = FrontierSearch(assets, rebal_time, start, end, investment_class_dict, step=step,
+                            start_step=start_step, **kwargs)
+    search.climb(num_points)
+    counts, values = search.refine(buckets)
+    results = np.zeros(len(counts), dtype=[('weights', float, (len(assets),)),
+                                           ('risk', float), ('return', float)])
+    results['weights'] = np.array(counts).reshape(-1, len(assets)) / float(search.units)
+    results['risk'], results['return'] = values[:, 0], values[:, 1]
+    return results
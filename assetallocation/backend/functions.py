@@ -4,15 +4,22 @@ the desired information from the data on the backend, use it to
 calculate risk and return values for various portfolios,
 and prepare them for export to the graph on the frontend.
 """
+import os
+from collections import namedtuple
 from datetime import timedelta
 import numpy as np
 import pandas as pd
+from backend.log_prices import YEAR_EXACT, YEAR, log_growth_rate, day_offset, \
+    date_positions, LogPrices, as_log_prices
+from backend.risk_measures import VAR_LEVELS, measure_name, risk_type_error, risk_measures
+from backend.drawdown import DRAWDOWN_TYPES, calc_drawdown
+from backend.bootstrap import BOOTSTRAP_BLOCK, BOOTSTRAP_CONFIDENCE, bootstrap_intervals
 
 
 #Constants
-YEAR_EXACT = 365.2425
-YEAR = 365
 INDEX_BASE = 100
+EPOCH = pd.Timestamp('1970-01-01')
+RISK_CHUNK = 4096
 
 
 def invest_dataframe(filename, sep=','):
@@ -23,6 +30,24 @@ def invest_dataframe(filename, sep=','):
     Fills in missing dates with most recent investment value
     Checks there is only one value per date.
 
+    Uses the binary form written by convert_dataset instead of parsing the
+    CSV file when the binary form is newer than the CSV file.
+
+    Args:
+        filename = name of CSV file
+        sep = separator in CSV file
+    Returns:
+        DataFrame of investment values by date.
+    """
+    if binary_is_current(filename):
+        return load_binary_dataset(filename, sep=sep)
+    return read_csv_dataset(filename, sep=sep)
+
+
+def read_csv_dataset(filename, sep=','):
+    """
+    Parses and cleans a data set from its CSV file (see invest_dataframe).
+
     Args:
         filename = name of CSV file
         sep = separator in CSV file
@@ -46,26 +71,118 @@ def invest_dataframe(filename, sep=','):
     return data
 
 
+def binary_paths(filename):
+    """
+    Names the files holding the binary form of a data set.
+
+    Args:
+        filename = name of CSV file
+    Returns:
+        Tuple of file names for the day-ordinal array and the value array
+    """
+    stem = os.path.splitext(filename)[0]
+    return stem + '.days.npy', stem + '.values.npy'
+
+
+def binary_is_current(filename):
+    """
+    Checks whether the binary form of a data set exists and is newer than its CSV file.
+
+    Args:
+        filename = name of CSV file
+    Returns:
+        True if the binary form can be used instead of the CSV file
+    """
+    csv_time = os.path.getmtime(filename)
+    return all(os.path.exists(path) and os.path.getmtime(path) >= csv_time
+               for path in binary_paths(filename))
+
+
+def convert_dataset(filename, sep=','):
+    """
+    Writes a cleaned data set in binary form next to its CSV file: an array
+    of day ordinals (days since 1970-01-01) and an array of investment values.
+    Both arrays are plain .npy files, so they can be memory-mapped.
+
+    Args:
+        filename = name of CSV file
+        sep = separator in CSV file
+    Returns:
+        None
+    """
+    data = read_csv_dataset(filename, sep=sep)
+    arrays = (data.index.values.astype('datetime64[D]').astype(np.int64),
+              data.iloc[:, 0].values.astype(float))
+    for path, array in zip(binary_paths(filename), arrays):
+        # Write to a temporary file first so readers never see a partial array
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp_path, 'wb') as temp_file:
+            np.save(temp_file, array)
+        os.replace(temp_path, path)
+
+
+def load_binary_dataset(filename, sep=','):
+    """
+    Loads a data set from the binary form written by convert_dataset.
+    The values are memory-mapped rather than read into memory.
+
+    Args:
+        filename = name of CSV file
+        sep = separator in CSV file
+    Returns:
+        DataFrame of investment values by date.
+    """
+    days_path, values_path = binary_paths(filename)
+    days = np.load(days_path, mmap_mode='r')
+    values = np.load(values_path, mmap_mode='r')
+    # The calendar is gap-free, so the first day and the length describe it
+    assert len(days) == len(values) and days[-1] - days[0] == len(days) - 1
+    # Column name comes from the CSV header, as when parsing the CSV file
+    with open(filename) as csv_file:
+        column = csv_file.readline().rstrip('\r\n').split(sep)[1]
+    idx = pd.date_range(EPOCH + timedelta(days=int(days[0])), periods=len(days))
+    return pd.DataFrame(values.reshape(-1, 1), index=idx, columns=[column], copy=False)
+
+
 def calc_return(data, start, end, return_type='percent', annualize=False):
     """
     Calculates rate of return on a data set between two dates.
     Allows for either percentage rate or log growth.
 
     Args:
-        data = data frame of investment values
+        data = data frame of investment values (or LogPrices)
         start, end = start and end dates of investment
         return_type = measure of return (percent or log)
         annualize = whether to return annualized return instead of total return
     Returns:
         Rate of return on investment over the time frame
     """
-    startval = float(data.loc[start][0])
-    endval = float(data.loc[end][0])
+    if isinstance(data, LogPrices):
+        return float(data.returns([start], [end], return_type=return_type,
+                                  annualize=annualize)[0])
+    values = data.values[:, 0]
+    startval = float(values[day_offset(data.index, start)])
+    endval = float(values[day_offset(data.index, end)])
     # Divisor = number of years if annualized return, else 1
     if annualize:
         div = (end - start) / timedelta(days=YEAR_EXACT)
     else:
         div = 1
+    return growth_rate(startval, endval, div, return_type=return_type)
+
+
+def growth_rate(startval, endval, div=1, return_type='percent'):
+    """
+    Converts start and end investment values to a rate of return.
+    Works element-wise on NumPy arrays as well as on single values.
+
+    Args:
+        startval, endval = investment values at the start and end of the period
+        div = number of years if annualized return, else 1
+        return_type = measure of return (percent or log)
+    Returns:
+        Rate of return for each pair of values
+    """
     # Calculate percentage or log return
     if return_type == 'percent':
         total = endval / startval
@@ -77,14 +194,13 @@ def calc_return(data, start, end, return_type='percent', annualize=False):
         raise Exception("Return type must be percent or log.")
 
 
-# We will want to cache this
 def return_list(data, start, end, period=YEAR, freq=1, return_type='percent', annualize=False):
     """
     Calculates a list of rates of return over a range of time.
     Ignores partial periods at the end when freq > 1 day.
 
     Args:
-        data = dataframe of investment values
+        data = dataframe of investment values (or LogPrices)
         start, end = overall start and end date of investment
         period = # of days over which to calculate the rate of return
             Example: yearly return = 365
@@ -95,25 +211,42 @@ def return_list(data, start, end, period=YEAR, freq=1, return_type='percent', an
     Returns:
         List of rates of return for different time periods
     """
-    # Use date_range
-    return np.array([calc_return(data, day, day + timedelta(days=period),
-                                 return_type=return_type, annualize=annualize)
-                     for day in pd.date_range(start, end - timedelta(days=period),
-                                              freq=timedelta(days=freq))])
+    days = pd.date_range(start, end - timedelta(days=period), freq=timedelta(days=freq))
+    if isinstance(data, LogPrices):
+        def _returns():
+            returns = data.returns(days, days + timedelta(days=period), return_type=return_type,
+                                   annualize=annualize)
+            returns.setflags(write=False)
+            return returns
+        return data.memoize(('returns', start, end, period, freq, return_type, annualize),
+                            _returns)
+    # Look up every window at once and compute the returns as array arithmetic
+    values = data.values[:, 0]
+    startvals = values[date_positions(data, days)]
+    endvals = values[date_positions(data, days + timedelta(days=period))]
+    if annualize:
+        div = timedelta(days=period) / timedelta(days=YEAR_EXACT)
+    else:
+        div = 1
+    return np.asarray(growth_rate(startvals.astype(float), endvals.astype(float),
+                                  div, return_type=return_type), dtype=float)
 
 
 def calc_risk(data, start, end, risk_type='stddev', period=YEAR,
-              freq=1, threshold=0, return_type='percent', annualize=False):
+              freq=1, threshold=0, return_type='percent', annualize=False, level=VAR_LEVELS[0]):
     """
     Calculates measure of risk on an investment over a period of time.
     Risk measure:
     - proba = historical probability of return below a certain value
     - stddev = standard deviation of rate of return
+    - var, cvar, downside, semivar = see risk_measures
+    - maxdd, avgdd, underwater = see drawdown_measures
 
     Args:
-        data = dataframe of investment values
+        data = dataframe of investment values (or LogPrices)
         start, end = overall start and end dates of investment
-        risk_type = measure of risk (proba or stddev)
+        risk_type = measure of risk (proba, stddev, var, cvar, downside, semivar,
+            maxdd, avgdd or underwater)
         period = # of days over which to calculate rate of return
             Example: yearly return = 365
         freq = how often to sample
@@ -121,17 +254,256 @@ def calc_risk(data, start, end, risk_type='stddev', period=YEAR,
         rate = threshold rate of return
         return_type = measure of return (percent or log)
         annualize = whether to use annualized return to measure risk
+        level = confidence level for var and cvar
     Returns:
         Measure of risk on the investment
     """
-    if risk_type == 'stddev':
-        return np.std(return_list(data, start, end, period=period, freq=freq,
-                                  return_type=return_type, annualize=annualize))
-    elif risk_type == 'proba':
-        return np.mean(return_list(data, start, end, period=period, freq=freq,
-                                   return_type=return_type, annualize=annualize) < threshold)
+    if risk_type == 'proba' and isinstance(data, LogPrices):
+        return prob_below(sorted_returns(data, start, end, period=period, freq=freq,
+                                         return_type=return_type, annualize=annualize),
+                          threshold)
+    elif risk_type in ('stddev', 'proba'):
+        stats = rolling_risk_stats(data, start, end, periods=[period], freq=freq,
+                                   threshold=threshold if risk_type == 'proba' else None,
+                                   return_type=return_type, annualize=annualize)[period]
+        if risk_type == 'stddev':
+            return np.sqrt(stats.variance)
+        # No window fits between start and end, as np.mean([]) would say
+        return stats.below / stats.count if stats.count else np.nan
+    elif risk_type in ('var', 'cvar'):
+        return risk_bundle(data, start, end, period=period, freq=freq, threshold=threshold,
+                           return_type=return_type, annualize=annualize,
+                           levels=(level,))[measure_name(risk_type, level)]
+    elif risk_type in ('downside', 'semivar'):
+        return risk_bundle(data, start, end, period=period, freq=freq, threshold=threshold,
+                           return_type=return_type, annualize=annualize)[risk_type]
+    elif risk_type in DRAWDOWN_TYPES:
+        return calc_drawdown(data, start, end, return_type=return_type)[risk_type]
     else:
-        raise Exception('Risk measure must be sttdev or proba.')
+        raise risk_type_error()
+
+
+def sorted_returns(data, start, end, period=YEAR, freq=1, return_type='percent',
+                   annualize=False):
+    """
+    Sorts the rolling returns of return_list. For LogPrices (such as cached
+    portfolios) the sorted returns are memoized, so the probability of a
+    return below any threshold is then a binary search.
+
+    Args:
+        same as return_list
+    Returns:
+        Sorted NumPy array of rates of return
+    """
+    def _sorted():
+        returns = np.sort(return_list(data, start, end, period=period, freq=freq,
+                                      return_type=return_type, annualize=annualize))
+        returns.setflags(write=False)
+        return returns
+    if isinstance(data, LogPrices):
+        return data.memoize(('sorted', start, end, period, freq, return_type, annualize),
+                            _sorted)
+    return _sorted()
+
+
+def prob_below(returns, thresholds):
+    """
+    Calculates the historical probability of a return below each threshold.
+
+    Args:
+        returns = sorted NumPy array of rates of return (from sorted_returns)
+        thresholds = threshold rate of return, or array of thresholds
+    Returns:
+        Probability (or array of probabilities) of a return below the threshold
+    """
+    return np.searchsorted(returns, thresholds, side='left') / len(returns)
+
+
+def return_cdf(data, start, end, thresholds=None, period=YEAR, freq=1,
+               return_type='percent', annualize=False):
+    """
+    Calculates the empirical distribution of rolling returns: the probability
+    of a return below each of many thresholds.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        start, end = overall start and end dates of investment
+        thresholds = thresholds rate of return (by default every observed return)
+        other arguments = same as return_list
+    Returns:
+        Tuple of NumPy arrays (thresholds, probabilities)
+    """
+    returns = sorted_returns(data, start, end, period=period, freq=freq,
+                             return_type=return_type, annualize=annualize)
+    if thresholds is None:
+        # Probability of a return at or below each observed return
+        return returns, np.arange(1, len(returns) + 1) / len(returns)
+    thresholds = np.asarray(thresholds, dtype=float)
+    return thresholds, prob_below(returns, thresholds)
+
+
+def risk_bundle(data, start, end, period=YEAR, freq=1, threshold=0,
+                return_type='percent', annualize=False, levels=VAR_LEVELS):
+    """
+    Calculates every measure of risk in risk_measures from one list of rolling returns.
+    For LogPrices (such as cached portfolios) the returns and the measures are
+    memoized, so switching between measures recomputes nothing.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        other arguments = arguments of return_list and risk_measures
+    Returns:
+        Dictionary of risk measures by name
+    """
+    def _measures():
+        returns = return_list(data, start, end, period=period, freq=freq,
+                              return_type=return_type, annualize=annualize)
+        return risk_measures(returns, threshold=threshold, levels=levels)
+    if isinstance(data, LogPrices):
+        return data.memoize(('risk', start, end, period, freq, threshold, return_type,
+                             annualize, tuple(levels)), _measures)
+    return _measures()
+
+
+# Summary of the sampled rolling-window returns for one period
+RiskStats = namedtuple('RiskStats', ['count', 'mean', 'variance', 'below'])
+
+
+class RunningSums(object):
+    """
+    Running sums of rates of return, added a chunk at a time, that summarize
+    them as RiskStats. The sums are kept relative to a shift (the first return)
+    for accuracy.
+
+    Attributes:
+        threshold = threshold rate of return (None to skip counting returns below it)
+        count = number of returns added
+    """
+
+    def __init__(self, threshold=0):
+        self.threshold = threshold
+        self.count = 0
+        self._shift = 0.
+        self._sum = 0.
+        self._squares = 0.
+        self._below = 0
+
+    def add(self, returns):
+        """
+        Adds rates of return to the sums.
+
+        Args:
+            returns = NumPy array of rates of return
+        Returns:
+            None
+        """
+        if self.count == 0:
+            self._shift = returns[0]
+        deviations = returns - self._shift
+        self.count += len(returns)
+        self._sum += deviations.sum()
+        self._squares += deviations.dot(deviations)
+        if self.threshold is not None:
+            self._below += int(np.count_nonzero(returns < self.threshold))
+
+    def stats(self):
+        """
+        Summarizes the returns added so far.
+
+        Returns:
+            RiskStats of the returns
+        """
+        if self.count == 0:
+            return RiskStats(0, np.nan, np.nan, 0)
+        mean_deviation = self._sum / self.count
+        return RiskStats(self.count, self._shift + mean_deviation,
+                         max(self._squares / self.count - mean_deviation**2, 0.),
+                         self._below if self.threshold is not None else None)
+
+
+def chunked_returns(log_prices, start, end, periods, freq=1, return_type='percent',
+                    annualize=False, chunk_size=None):
+    """
+    Lists the rolling returns sampled by return_list for several periods,
+    a chunk of sample days at a time. Each chunk of start values is shared
+    by every period.
+
+    Args:
+        log_prices = LogPrices of the investment
+        start, end = overall start and end dates of investment
+        periods = list of # of days over which to calculate rates of return
+        freq = how often to sample
+            Example: calculate return every day = 1, once a year = 365
+        return_type = measure of return (percent or log)
+        annualize = whether to use annualized returns
+        chunk_size = number of sample days to handle at once (None for all of them)
+    Returns:
+        Generator of tuples (position in periods, NumPy array of rates of return),
+        in the order of the sample days
+    """
+    counts = [len(pd.date_range(start, end - timedelta(days=p), freq=timedelta(days=freq)))
+              for p in periods]
+    days = pd.date_range(start, end - timedelta(days=min(periods)), freq=timedelta(days=freq))
+    chunk_size = chunk_size or max(len(days), 1)
+    for chunk_start in range(0, len(days), chunk_size):
+        starts = days[chunk_start:chunk_start + chunk_size]
+        start_values = log_prices.log_values[date_positions(log_prices, starts)]
+        for i, count in enumerate(counts):
+            if count > chunk_start:
+                yield i, window_returns(log_prices, starts[:count - chunk_start],
+                                        start_values[:count - chunk_start], periods[i],
+                                        return_type=return_type, annualize=annualize)
+
+
+def window_returns(log_prices, starts, start_values, period, return_type='percent',
+                   annualize=False):
+    """
+    Calculates the rates of return over windows of the same length.
+
+    Args:
+        log_prices = LogPrices of the investment
+        starts = DatetimeIndex of the first day of each window
+        start_values = log values on the first day of each window
+        period = # of days in each window
+        return_type = measure of return (percent or log)
+        annualize = whether to return annualized returns instead of total returns
+    Returns:
+        NumPy array with the rate of return over each window
+    """
+    end_values = log_prices.log_values[
+        date_positions(log_prices, starts + timedelta(days=period))]
+    div = timedelta(days=period) / timedelta(days=YEAR_EXACT) if annualize else 1
+    return log_growth_rate(end_values - start_values, div, return_type)
+
+
+def rolling_risk_stats(data, start, end, periods=(YEAR,), freq=1, threshold=0,
+                       return_type='percent', annualize=False, chunk_size=RISK_CHUNK):
+    """
+    Calculates the mean, variance and number of returns below a threshold of
+    the rolling returns sampled by return_list, for several periods in one pass.
+    The sampled windows are visited in chunks (see chunked_returns), and
+    running sums replace the full list of returns.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        start, end = overall start and end dates of investment
+        periods = list of # of days over which to calculate rates of return
+        freq = how often to sample
+            Example: calculate return every day = 1, once a year = 365
+        threshold = threshold rate of return (None to skip counting returns below it)
+        return_type = measure of return (percent or log)
+        annualize = whether to use annualized returns
+        chunk_size = number of sample days to handle at once
+    Returns:
+        Dictionary of RiskStats by period
+    """
+    periods = list(periods)
+    sums = [RunningSums(threshold) for _ in periods]
+    for i, returns in chunked_returns(as_log_prices(data), start, end, periods, freq=freq,
+                                      return_type=return_type, annualize=annualize,
+                                      chunk_size=chunk_size):
+        sums[i].add(returns)
+    return {period: period_sums.stats() for period, period_sums in zip(periods, sums)}
 
 
 # Track portfolio with rebalancing
@@ -151,110 +523,123 @@ def track_portfolio(initial, percent, rebal_time, start, end):
     """
     assert np.isclose(sum(p[1] for p in percent), 1)
     #assert len(percent) == len(set(p[0] for p in percent))
-    portfolio = pd.Series()
-    portfolio[start] = initial
-    for rebal_day in pd.date_range(start, end, freq=timedelta(days=rebal_time)):
-        value = portfolio[rebal_day]
-        shares = [(k, value * p / (k.loc[rebal_day][0])) for k, p in percent]
-        portfolio_val = portfolio
-        min_val = min(end, rebal_day + timedelta(days=rebal_time))
-        share_val = share_growth(shares=shares, start=rebal_day + timedelta(days=1), end=min_val)
-        portfolio = pd.concat([portfolio_val, share_val])
-    return pd.DataFrame(portfolio, columns=['Value'])
-
+    days = pd.date_range(start, end)
+    prices = price_matrix([k for k, p in percent], days)
+    values = rebalance_index(prices, [p for k, p in percent], rebal_time, initial=initial)
+    return pd.DataFrame({'Value': values}, index=days)
 
-# Track portfolio with rebalancing and cacheing by creating an index to represent the portfolio
-PORTFOLIO_CACHE = {}
-# Contains index for each (percent_tuple, rebal) pair - no need for separate initial investments
 
-
-def index_to_portfolio(initial, portfolio_index, start, end):
+def price_matrix(frames, days):
     """
-    Translates index to portfolio value by multiplying by initial investment.
+    Aligns several investment data sets into one matrix of prices.
 
     Args:
-        portfolio_index = portfolio index created by track_portfolio_cache
-        initial = amount invested on starting day
-        start, end = start and end dates to compute portfolio values
+        frames = list of data frames of investment values
+        days = dates to include in the matrix
     Returns:
-        Dataframe with values of the investment portfolio by date
+        2-D NumPy array of prices (days x investments)
     """
-    portfolio = pd.DataFrame(initial / portfolio_index.loc[start]
-                             * portfolio_index.loc[start:end + timedelta(days=1)],
-                             columns=['Value'])
-    return portfolio
+    return np.column_stack([k.iloc[:, 0].reindex(days).values for k in frames])
 
 
-def track_portfolio_cache(initial, percent_tuple, rebal_time, start, end, investment_class_dict):
+def rebalance_index(prices, weights, rebal_time, initial=INDEX_BASE):
     """
-    Caches a portfolio so it can be called later.
+    Computes values of a rebalanced portfolio from a matrix of asset prices.
+    The portfolio is rebalanced to the given weights on the first day and
+    every rebal_time days after that.
 
     Args:
-        initial = amount invested on starting day
-        percent_tuple = tuple of tuples of investment classes with percentages
-            (must add to 1)
+        prices = 2-D array of asset prices (days x assets) on a gap-free daily calendar
+        weights = weight of each asset (must add to 1)
         rebal_time = how often to rebalance the portfolio (measured in days)
-        start, end = start and end dates to compute values
-        investment_class_dict = dictionary to translate user input to data frames
+        initial = value of the portfolio on the first day
     Returns:
-        Dataframe with values of the investment portfolio by date
+        NumPy array with values of the investment portfolio by day
     """
-    if (percent_tuple, rebal_time) in PORTFOLIO_CACHE:
-        portfolio_index = PORTFOLIO_CACHE[(percent_tuple, rebal_time)]
-    else:
-        assert np.isclose(sum(p[1] for p in percent_tuple), 1)
-        # If not in cache, create a new index, then multiply by initial value
-        # NOTE: This does not allow flexibility in the start date for rebalancing counter.
-        percent_list = [(investment_class_dict[k], v) for k, v in percent_tuple]
-        index_start = max([min(data.index) for data, pct in percent_list])
-        index_end = min([max(data.index) for data, pct in percent_list])
-        portfolio_index = track_portfolio(INDEX_BASE, percent_list,
-                                          rebal_time, index_start, index_end)
-        PORTFOLIO_CACHE[(percent_tuple, rebal_time)] = portfolio_index
-    return index_to_portfolio(initial, portfolio_index, start, end)
+    return rebalance_indices(prices, [weights], rebal_time, initial=initial)[0]
 
 
-# Track portfolio for unchanging number of shares, no rebalancing
-def share_growth(shares, start, end):
+def rebalance_indices(prices, weight_matrix, rebal_time, initial=INDEX_BASE, days=None):
     """
-    Computes growth of a portfolio with a given number of shares of different indices.
+    Computes values of many rebalanced portfolios that hold the same assets.
+    Between rebalancing days every portfolio uses the same growth ratio for
+    each asset, so all portfolios come out of one matrix product.
 
     Args:
-        shares = list of tuples of investment data frames with number of shares
-        start, end = start and end dates to compute values
+        prices = 2-D array of asset prices (days x assets) on a gap-free daily calendar
+        weight_matrix = 2-D array of asset weights (portfolios x assets), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        initial = value of each portfolio on the first day
+        days = sorted positions of the days to return (by default every day);
+            only these days and the rebalancing days are computed
     Returns:
-        Dataframe for portfolio created by summing dataframes of individual assets
+        2-D NumPy array with values of each portfolio (portfolios x days)
     """
-    return sum(s * k.loc[start:end].iloc[:, 0] for k, s in shares)
+    prices = np.asarray(prices, dtype=float)
+    weight_matrix = np.asarray(weight_matrix, dtype=float)
+    num_days = len(prices)
+    # Each day's value grows from the most recent rebalancing day before it
+    anchors = np.maximum(np.arange(num_days) - 1, 0) // rebal_time * rebal_time
+    num_periods = (num_days - 2) // rebal_time + 1
+    period_ends = np.minimum(np.arange(1, num_periods + 1) * rebal_time, num_days - 1)
+    if days is None:
+        days = needed = np.arange(num_days)
+    else:
+        days = np.asarray(days)
+        needed = np.union1d(period_ends[:-1], days)
+    growth = weight_matrix.dot((prices[needed] / prices[anchors[needed]]).T)
+    # Growth over each rebalancing period compounds into the value at the next one
+    period_start_values = initial * np.cumprod(
+        np.column_stack([np.ones(len(weight_matrix)),
+                         growth[:, np.searchsorted(needed, period_ends[:-1])]]), axis=1)
+    values = period_start_values[:, anchors[days] // rebal_time] * \
+        growth[:, np.searchsorted(needed, days)]
+    values[:, days == 0] = initial
+    return values
 
 
 def get_risk_return(portfolios, start, end, return_type='percent',
                     annualize_return=False, risk_type='stddev', annualize_risk=False,
-                    period=365, freq=None, threshold=None):
+                    period=365, freq=None, threshold=None, resamples=0, seed=0,
+                    block_length=BOOTSTRAP_BLOCK, confidence=BOOTSTRAP_CONFIDENCE):
     """
     Gets risk and return measures for a variety of portfolios,
     preparing for export to graph.
 
     Args:
-        portfolios = list of portfolio data frames
+        portfolios = list of portfolio data frames (or LogPrices)
         start, end = start and end dates for measuring risk and return
         period = period for measuring risk
         freq = how often to sample for measuring risk
         rate = threshold rate of return (for probability risk measure)
         return_type = percent or log
-        risk_type = stddev or proba
+        risk_type = stddev, proba, var, cvar, downside, semivar, maxdd, avgdd or underwater
         annualize_return = whether to display annualized return (y axis)
         annualize_risk = whether to use annualized return for measuring risk (x axis)
+        resamples = number of stationary bootstrap resamples for confidence
+            intervals (0 for none)
+        seed = seed of the bootstrap resamples
+        block_length = average length in days of the resampled blocks
+        confidence = confidence level of the intervals
     Returns:
-        Dataframe of risk and return measures by portfolio.
-    """
-    r_type = return_type
-    ann_bool = annualize_return
-    y_val = [calc_return(p, start, end, return_type=r_type, annualize=ann_bool) for p in portfolios]
-    x_val = [calc_risk(p, start, end, threshold=threshold, period=period, freq=freq,
-                       risk_type=risk_type, return_type=r_type, annualize=annualize_risk)
-             for p in portfolios]
-    return pd.DataFrame({'Risk': x_val, 'Return': y_val})
+        Dataframe of risk and return measures by portfolio, with Risk low, Risk high,
+        Return low and Return high confidence intervals if resamples > 0.
+    """
+    # Take logs once per portfolio, shared by the return and risk measures
+    portfolios = [as_log_prices(p) for p in portfolios]
+    df_rr = pd.DataFrame({
+        'Risk': [calc_risk(p, start, end, threshold=threshold, period=period, freq=freq,
+                           risk_type=risk_type, return_type=return_type,
+                           annualize=annualize_risk) for p in portfolios],
+        'Return': [calc_return(p, start, end, return_type=return_type,
+                               annualize=annualize_return) for p in portfolios]})
+    if resamples:
+        df_rr = df_rr.join(bootstrap_intervals(
+            portfolios, start, end, resamples, seed=seed, block_length=block_length,
+            confidence=confidence, return_type=return_type, annualize_return=annualize_return,
+            risk_type=risk_type, annualize_risk=annualize_risk, period=period, freq=freq,
+            threshold=threshold))
+    return df_rr
 
 
 def label_risk_return(labels, **kwargs):
@@ -0,0 +1,253 @@
+"""
+This file contains the log values of data sets and portfolio indices
+(LogPrices), which give the rate of return over any window as the
+difference of two entries, and the date lookups they rely on.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+
+#Constants
+YEAR_EXACT = 365.2425
+YEAR = 365
+DAY_NS = 24 * 3600 * 10**9
+MEMO_SIZE = 32
+
+
+def log_growth_rate(log_change, div=1, return_type='percent'):
+    """
+    Converts a change in log investment value to a rate of return.
+    Works element-wise on NumPy arrays as well as on single values.
+
+    Args:
+        log_change = change in the log of the investment value over the period
+        div = number of years if annualized return, else 1
+        return_type = measure of return (percent or log)
+    Returns:
+        Rate of return for each change
+    """
+    if return_type == 'percent':
+        return np.expm1(log_change / div)
+    elif return_type == 'log':
+        return log_change / div
+    else:
+        raise Exception("Return type must be percent or log.")
+
+
+def is_daily(index):
+    """
+    Checks whether an index is a gap-free daily calendar, as created by invest_dataframe.
+
+    Args:
+        index = DatetimeIndex of a data set
+    Returns:
+        True if every date is one day after the previous one
+    """
+    if len(index) == 0:
+        return False
+    if index.freqstr == 'D':
+        return True
+    return (index.is_monotonic_increasing and index.is_unique and
+            (index[-1] - index[0]).days == len(index) - 1 and index.asi8[0] % DAY_NS == 0)
+
+
+def day_offset(index, date, bounds_check=True):
+    """
+    Finds the position of a date in an index. On a gap-free daily calendar
+    this is the number of days since the first date, with no lookup needed.
+
+    Args:
+        index = DatetimeIndex of a data set
+        date = date to look up
+        bounds_check = whether to raise KeyError if the date is not in the index;
+            if False, returns the position of the last date on or before it
+            (which may be out of range)
+    Returns:
+        Integer position of the date
+    """
+    if not is_daily(index):
+        if bounds_check:
+            return index.get_loc(date)
+        return index.searchsorted(date, side='right') - 1
+    position, remainder = divmod(pd.Timestamp(date).value - index.asi8[0], DAY_NS)
+    if bounds_check and (remainder or not 0 <= position < len(index)):
+        raise KeyError(date)
+    return position
+
+
+def date_positions(data, dates):
+    """
+    Looks up the integer row positions of many dates in a data set at once.
+
+    Args:
+        data = data frame of investment values
+        dates = DatetimeIndex (or list) of dates to look up
+    Returns:
+        NumPy array of integer row positions, one per date
+    """
+    index = data.index
+    dates = pd.DatetimeIndex(dates)
+    if is_daily(index):
+        positions, remainders = np.divmod(dates.asi8 - index.asi8[0], DAY_NS)
+        missing = (remainders != 0) | (positions < 0) | (positions >= len(index))
+    else:
+        positions = index.get_indexer(dates)
+        missing = positions < 0
+    if missing.any():
+        raise KeyError("Dates not found in data: %s" % list(dates[missing][:5]))
+    return positions
+
+
+def memo_nbytes(value):
+    """
+    Measures the memory taken up by a result memoized on LogPrices.
+
+    Args:
+        value = NumPy array, dictionary of measures or LogPrices (a window)
+    Returns:
+        Size in bytes (for a window, the size of the results memoized on it)
+    """
+    if isinstance(value, LogPrices):
+        return value.memo_nbytes
+    if isinstance(value, dict):
+        return sum(memo_nbytes(v) for v in value.values())
+    return getattr(value, 'nbytes', 0)
+
+
+class LogPrices(object):
+    """
+    Log of the values of a data set or portfolio index. The log value on a day
+    is the running sum of all daily log returns up to that day, so the return
+    over any window is the difference of two entries.
+
+    Attributes:
+        index = DatetimeIndex of the values
+        log_values = NumPy array with the log of the value on each date
+    """
+
+    def __init__(self, index, log_values):
+        self.index = index
+        self.log_values = log_values
+        self._memo = OrderedDict()
+        self._memo_nbytes = 0
+        # Function told of every change in memo_nbytes (see PortfolioCache.put)
+        self.on_resize = None
+
+    @property
+    def memo_nbytes(self):
+        """Memory taken up by memoized results, including those of windows, in bytes."""
+        return self._memo_nbytes
+
+    def _resized(self, delta):
+        self._memo_nbytes += delta
+        if self.on_resize is not None:
+            self.on_resize(delta)
+
+    def memoize(self, key, compute):
+        """
+        Keeps results computed from these log values, such as rolling returns,
+        so asking again costs nothing. Only the MEMO_SIZE most recent are kept.
+        Windows count the results memoized on them towards memo_nbytes.
+
+        Args:
+            key = hashable description of the result
+            compute = function with no arguments computing the result
+        Returns:
+            The result
+        """
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return self._memo[key]
+        value = self._memo[key] = compute()
+        if isinstance(value, LogPrices):
+            value.on_resize = self._resized
+        self._resized(memo_nbytes(value))
+        if len(self._memo) > MEMO_SIZE:
+            _, old = self._memo.popitem(last=False)
+            if isinstance(old, LogPrices):
+                old.on_resize = None
+            self._resized(-memo_nbytes(old))
+        return value
+
+    @classmethod
+    def from_frame(cls, data):
+        """
+        Takes the log of a data frame of investment values.
+
+        Args:
+            data = data frame of investment values
+        Returns:
+            LogPrices of the data frame
+        """
+        return cls(data.index, np.log(data.values[:, 0].astype(float)))
+
+    def window(self, start, end):
+        """
+        Restricts the log values to a range of dates, without copying them.
+        Like index_to_portfolio, the range includes the day after end.
+
+        Args:
+            start, end = start and end dates
+        Returns:
+            LogPrices between the two dates
+        """
+        def _window():
+            first = day_offset(self.index, start)
+            stop = min(day_offset(self.index, end + timedelta(days=1), bounds_check=False) + 1,
+                       len(self.index))
+            return LogPrices(self.index[first:stop], self.log_values[first:stop])
+        # The same window object is handed out again, along with its own memoized results
+        return self.memoize(('window', start, end), _window)
+
+    def returns(self, starts, ends, return_type='percent', annualize=False):
+        """
+        Calculates the rates of return between many pairs of dates at once.
+
+        Args:
+            starts, ends = start and end dates of each investment
+            return_type = measure of return (percent or log)
+            annualize = whether to return annualized returns instead of total returns
+        Returns:
+            NumPy array with the rate of return for each pair of dates
+        """
+        starts, ends = pd.DatetimeIndex(starts), pd.DatetimeIndex(ends)
+        log_change = (self.log_values[date_positions(self, ends)] -
+                      self.log_values[date_positions(self, starts)])
+        if annualize:
+            div = (ends.asi8 - starts.asi8) / (YEAR_EXACT * DAY_NS)
+        else:
+            div = 1
+        return log_growth_rate(log_change, div, return_type=return_type)
+
+
+def as_log_prices(data):
+    """
+    Gets the LogPrices of a data set, computing them only if needed.
+
+    Args:
+        data = data frame of investment values (or LogPrices)
+    Returns:
+        LogPrices of the data set
+    """
+    if isinstance(data, LogPrices):
+        return data
+    return LogPrices.from_frame(data)
+
+
+def batch_returns(data, starts, ends, return_type='percent', annualize=False):
+    """
+    Calculates rates of return on a data set between many pairs of dates
+    in one vectorized call.
+
+    Args:
+        data = data frame of investment values (or LogPrices)
+        starts, ends = start and end dates of each investment
+        return_type = measure of return (percent or log)
+        annualize = whether to return annualized returns instead of total returns
+    Returns:
+        NumPy array with the rate of return for each pair of dates
+    """
+    return as_log_prices(data).returns(starts, ends, return_type=return_type,
+                                       annualize=annualize)
@@ -0,0 +1,416 @@
+"""
+This file keeps the indices of portfolios (their values from an initial
+investment of INDEX_BASE) in memory and on disk, so each portfolio is
+computed once and every later request reads its index.
+"""
+import hashlib
+import os
+from collections import OrderedDict, Counter
+from datetime import timedelta
+from threading import Lock
+import numpy as np
+import pandas as pd
+from backend.log_prices import day_offset, LogPrices
+from backend.functions import EPOCH, rebalance_indices
+from backend.datasets import asset_matrix
+
+
+#Constants
+PORTFOLIO_CACHE_BYTES = 256 * 2**20
+KEY_PRECISION = 6
+
+
+# Track portfolio with rebalancing and cacheing by creating an index to represent the portfolio
+class PortfolioCache(object):
+    """
+    Least-recently-used cache of portfolio indices with a memory budget.
+    When the stored indices take up more than max_bytes, the indices used
+    least recently are evicted first. Each index is stored together with
+    its LogPrices, and the results memoized on it count towards the budget.
+
+    Attributes:
+        max_bytes = memory budget for the stored indices
+        counts = Counter of events:
+            hits, misses = number of lookups that found / did not find an index
+            evictions = number of indices evicted to stay within the budget
+            duplicates_avoided = number of times an index was reused for a portfolio
+                written differently (another order, float noise or zero weights)
+    """
+
+    def __init__(self, max_bytes=PORTFOLIO_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.counts = Counter()
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    @property
+    def nbytes(self):
+        """Memory currently taken up by the stored indices, in bytes."""
+        return self._nbytes
+
+    def get(self, key, alias=None, log_prices=False):
+        """
+        Looks up a portfolio index and marks it as recently used.
+
+        Args:
+            key = cache key of the portfolio
+            alias = key as originally written by the caller, before canonical_key
+            log_prices = whether to return the LogPrices of the index instead
+        Returns:
+            Dataframe with the portfolio index, or None if it is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counts['misses'] += 1
+                return None
+            self.counts['hits'] += 1
+            self._entries.move_to_end(key)
+            if alias is not None and alias not in entry[2]:
+                entry[2].add(alias)
+                self.counts['duplicates_avoided'] += 1
+            return entry[3] if log_prices else entry[0]
+
+    def put(self, key, value, aliases=()):
+        """
+        Stores a portfolio index, evicting old indices to stay within the budget.
+        Indices larger than the whole budget are not stored.
+
+        Args:
+            key = cache key of the portfolio
+            value = dataframe with the portfolio index
+            aliases = keys as originally written by the callers that share this index
+        Returns:
+            None
+        """
+        log_prices = LogPrices.from_frame(value)
+        size = int(value.memory_usage(index=True).sum()) + log_prices.log_values.nbytes
+        aliases = set(aliases)
+        with self._lock:
+            self.counts['duplicates_avoided'] += max(len(aliases) - 1, 0)
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, aliases, log_prices)
+            self._nbytes += size
+            self._evict()
+        # Results memoized on the LogPrices later count towards the budget too
+        log_prices.on_resize = lambda delta: self._resize(key, log_prices, delta)
+
+    def clear(self):
+        """Removes every stored index and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.counts.clear()
+
+    def stats(self):
+        """
+        Reports how well the cache is working.
+
+        Returns:
+            Dictionary with entries, bytes, hits, misses, evictions and duplicates avoided
+        """
+        stats = {'entries': len(self._entries), 'bytes': self._nbytes}
+        for name in ('hits', 'misses', 'evictions', 'duplicates_avoided'):
+            stats[name] = self.counts[name]
+        return stats
+
+    def _resize(self, key, log_prices, delta):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] is not log_prices:
+                return
+            self._entries[key] = (entry[0], entry[1] + delta, entry[2], entry[3])
+            self._nbytes += delta
+            self._evict()
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.counts['evictions'] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        entry[3].on_resize = None
+        self._nbytes -= entry[1]
+
+
+# Contains index for each (percent_tuple, rebal) pair - no need for separate initial investments
+PORTFOLIO_CACHE = PortfolioCache()
+
+
+class DiskCache(object):
+    """
+    Stores portfolio indices in a local directory so they survive restarts.
+    Each index is saved as an uncompressed .npz file holding its first day
+    and its daily values. The file name hashes the cache key together with
+    the contents of the data sets the index was computed from, so an index
+    computed from older data is never read back.
+
+    Attributes:
+        directory = directory holding the cached indices (None disables the cache)
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def path(self, key, frames):
+        """
+        Builds the file name for a portfolio index.
+
+        Args:
+            key = cache key of the portfolio
+            frames = data frames of the investment classes in the portfolio
+        Returns:
+            Path of the file holding the index
+        """
+        digest = hashlib.sha1(repr(key).encode('utf-8'))
+        for data in frames:
+            digest.update(data.index.asi8.tobytes())
+            digest.update(np.ascontiguousarray(data.values, dtype=float).tobytes())
+        return os.path.join(self.directory, digest.hexdigest() + '.npz')
+
+    def load(self, key, frames):
+        """
+        Reads a portfolio index saved by an earlier process.
+
+        Args:
+            key = cache key of the portfolio
+            frames = data frames of the investment classes in the portfolio
+        Returns:
+            Dataframe with the portfolio index, or None if it was not saved
+        """
+        if self.directory is None:
+            return None
+        path = self.path(key, frames)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            if str(saved['key']) != repr(key):
+                return None
+            days = pd.date_range(EPOCH + timedelta(days=int(saved['start'])),
+                                 periods=len(saved['values']))
+            return pd.DataFrame({'Value': saved['values']}, index=days)
+
+    def save(self, key, frames, portfolio_index):
+        """
+        Writes a portfolio index so later processes can read it.
+
+        Args:
+            key = cache key of the portfolio
+            frames = data frames of the investment classes in the portfolio
+            portfolio_index = dataframe with the portfolio index on a daily calendar
+        Returns:
+            None
+        """
+        if self.directory is None:
+            return
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self.path(key, frames)
+        # Write to a temporary file first so readers never see a partial index
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp_path, 'wb') as temp_file:
+            np.savez(temp_file, key=np.array(repr(key)),
+                     start=np.array((portfolio_index.index[0] - EPOCH).days),
+                     values=portfolio_index.iloc[:, 0].values.astype(float))
+        os.replace(temp_path, path)
+
+
+# Set ASSET_ALLOCATION_CACHE_DIR to keep portfolio indices between runs
+DISK_CACHE = DiskCache(os.environ.get('ASSET_ALLOCATION_CACHE_DIR'))
+
+
+def canonical_key(percent_tuple, precision=KEY_PRECISION):
+    """
+    Writes a portfolio in one canonical form, so that portfolios which only differ
+    in the order of investment classes, in float noise or in zero-weight classes
+    share one cached index.
+
+    Args:
+        percent_tuple = tuple of tuples of investment classes with percentages
+        precision = number of decimals to round the percentages to
+    Returns:
+        Tuple of (investment class, percentage) sorted by investment class,
+        without zero percentages
+    """
+    rounded = ((k, round(float(v), precision)) for k, v in percent_tuple)
+    return tuple(sorted((k, v) for k, v in rounded if v != 0))
+
+
+def index_to_portfolio(initial, portfolio_index, start, end):
+    """
+    Translates index to portfolio value by multiplying by initial investment.
+
+    Args:
+        portfolio_index = portfolio index created by track_portfolio_cache
+        initial = amount invested on starting day
+        start, end = start and end dates to compute portfolio values
+    Returns:
+        Dataframe with values of the investment portfolio by date
+    """
+    index = portfolio_index.index
+    first = day_offset(index, start)
+    stop = min(day_offset(index, end + timedelta(days=1), bounds_check=False) + 1, len(index))
+    values = portfolio_index.values[:, 0]
+    portfolio = pd.DataFrame({'Value': initial / values[first] * values[first:stop]},
+                             index=index[first:stop])
+    return portfolio
+
+
+def track_portfolio_cache(initial, percent_tuple, rebal_time, start, end, investment_class_dict):
+    """
+    Caches a portfolio so it can be called later.
+
+    Args:
+        initial = amount invested on starting day
+        percent_tuple = tuple of tuples of investment classes with percentages
+            (must add to 1)
+        rebal_time = how often to rebalance the portfolio (measured in days)
+        start, end = start and end dates to compute values
+        investment_class_dict = dictionary to translate user input to data frames
+    Returns:
+        Dataframe with values of the investment portfolio by date
+    """
+    portfolio_index = cached_index(percent_tuple, rebal_time, investment_class_dict)
+    return index_to_portfolio(initial, portfolio_index, start, end)
+
+
+def track_log_prices_cache(percent_tuple, rebal_time, start, end, investment_class_dict):
+    """
+    Looks up the LogPrices of a portfolio from the cache. Rates of return do
+    not depend on the initial investment, so this needs no scaling or copying.
+
+    Args:
+        percent_tuple = tuple of tuples of investment classes with percentages
+            (must add to 1)
+        rebal_time = how often to rebalance the portfolio (measured in days)
+        start, end = start and end dates to compute values
+        investment_class_dict = dictionary to translate user input to data frames
+    Returns:
+        LogPrices of the investment portfolio between the two dates
+    """
+    log_prices = cached_index(percent_tuple, rebal_time, investment_class_dict, log_prices=True)
+    return log_prices.window(start, end)
+
+
+def cached_index(percent_tuple, rebal_time, investment_class_dict, log_prices=False):
+    """
+    Looks up the index of a portfolio in PORTFOLIO_CACHE, computing it if needed.
+
+    Args:
+        percent_tuple = tuple of tuples of investment classes with percentages
+            (must add to 1)
+        rebal_time = how often to rebalance the portfolio (measured in days)
+        investment_class_dict = dictionary to translate user input to data frames
+        log_prices = whether to return the LogPrices of the index instead
+    Returns:
+        Dataframe with the portfolio index (or its LogPrices)
+    """
+    assert np.isclose(sum(p[1] for p in percent_tuple), 1)
+    key = (canonical_key(percent_tuple), rebal_time)
+    alias = (percent_tuple, rebal_time)
+    portfolio_index = PORTFOLIO_CACHE.get(key, alias=alias, log_prices=log_prices)
+    if portfolio_index is None:
+        # If not in cache, create a new index
+        assets = tuple(k for k, v in key[0])
+        portfolio_index = build_indices(assets, [key], investment_class_dict)[0]
+        PORTFOLIO_CACHE.put(key, portfolio_index, aliases=[alias])
+        if log_prices:
+            portfolio_index = LogPrices.from_frame(portfolio_index)
+    return portfolio_index
+
+
+def build_indices(assets, keys, investment_class_dict):
+    """
+    Computes the indices of portfolios that hold the same investment classes,
+    reading them from DISK_CACHE where possible and saving the rest there.
+
+    Args:
+        assets = descriptions of the investment classes, in canonical order
+        keys = canonical cache keys (percent tuple, rebal_time) of the portfolios
+        investment_class_dict = dictionary to translate user input to data frames
+    Returns:
+        List of dataframes with the index of each portfolio
+    """
+    frames = [investment_class_dict[k] for k in assets]
+    indices = [DISK_CACHE.load(key, frames) for key in keys]
+    missing = [i for i, portfolio_index in enumerate(indices) if portfolio_index is None]
+    if not missing:
+        return indices
+    matrix = asset_matrix(investment_class_dict, assets)
+    for rebal_time in set(keys[i][1] for i in missing):
+        group = [i for i in missing if keys[i][1] == rebal_time]
+        built = portfolio_indices(matrix, assets, [keys[i][0] for i in group], rebal_time)
+        for i, portfolio_index in zip(group, built):
+            indices[i] = portfolio_index
+            DISK_CACHE.save(keys[i], frames, portfolio_index)
+    return indices
+
+
+def portfolio_indices(matrix, assets, percent_tuples, rebal_time):
+    """
+    Computes the indices of portfolios that hold the same investment classes
+    over the range covered by all of them.
+
+    Args:
+        matrix = AssetMatrix holding the investment classes
+        assets = descriptions of the investment classes, in canonical order
+        percent_tuples = canonical tuples of (investment class, percentage) in the
+            order of assets
+        rebal_time = how often to rebalance the portfolios (measured in days)
+    Returns:
+        List of dataframes with the index of each portfolio
+    """
+    first, last = matrix.common_range(assets)
+    days = matrix.calendar[first:last + 1]
+    # NOTE: This does not allow flexibility in the start date for rebalancing counter.
+    weight_matrix = np.array([[v for k, v in percent_tuple] for percent_tuple in percent_tuples])
+    weight_matrix /= weight_matrix.sum(axis=1, keepdims=True)
+    values = rebalance_indices(matrix.prices(assets, first, last), weight_matrix, rebal_time)
+    return [pd.DataFrame({'Value': row}, index=days) for row in values]
+
+
+def track_portfolio_batch(percent_tuples, rebal_time, investment_class_dict):
+    """
+    Caches many portfolios at once, so later calls to track_portfolio_cache
+    find them ready. Portfolios that use the same investment classes are
+    computed together with rebalance_indices.
+
+    Args:
+        percent_tuples = list of tuples of tuples of investment classes with percentages
+            (each must add to 1)
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        investment_class_dict = dictionary to translate user input to data frames
+    Returns:
+        None
+    """
+    groups = {}
+    for percent_tuple in percent_tuples:
+        assert np.isclose(sum(p[1] for p in percent_tuple), 1)
+        key = (canonical_key(percent_tuple), rebal_time)
+        if key not in PORTFOLIO_CACHE:
+            assets = tuple(k for k, v in key[0])
+            groups.setdefault(assets, {}).setdefault(key, set()).add((percent_tuple, rebal_time))
+    for assets, group in groups.items():
+        indices = build_indices(assets, list(group), investment_class_dict)
+        for (key, aliases), portfolio_index in zip(group.items(), indices):
+            PORTFOLIO_CACHE.put(key, portfolio_index, aliases=aliases)
@@ -0,0 +1,98 @@
+"""
+This file contains the measures of risk computed from an array of rates
+of return (for example the rolling returns of return_list), for one
+investment or for many at once.
+"""
+import numpy as np
+
+
+#Constants
+VAR_LEVELS = (0.95,)
+
+
+def measure_name(risk_type, level):
+    """
+    Names a risk measure that depends on a confidence level, as used by risk_measures.
+
+    Args:
+        risk_type = var or cvar
+        level = confidence level (for example 0.95)
+    Returns:
+        Name of the measure (for example var_95)
+    """
+    return '%s_%g' % (risk_type, level * 100)
+
+
+def risk_type_error():
+    """
+    Describes the error of an unknown measure of risk (risk_type).
+
+    Returns:
+        Exception to raise
+    """
+    return Exception('Risk measure must be stddev, proba, var, cvar, downside, semivar, '
+                     'maxdd, avgdd or underwater.')
+
+
+def risk_measures(returns, threshold=0, levels=VAR_LEVELS):
+    """
+    Calculates several measures of risk from one array of rates of return.
+    - stddev = standard deviation of rate of return
+    - proba = historical probability of return below the threshold
+    - var_<level> = historical value at risk: the loss (negative return) that is
+        only exceeded with probability 1 - level
+    - cvar_<level> = conditional value at risk: the average loss beyond var_<level>
+    - downside = downside deviation: root mean square shortfall below the threshold
+    - semivar = semi-variance: mean square shortfall below the mean return
+
+    Args:
+        returns = array of rates of return (for example from return_list), or
+            a two dimensional array with the returns of one investment per row
+        threshold = threshold rate of return (None is treated as 0)
+        levels = confidence levels for value at risk
+    Returns:
+        Dictionary of risk measures by name: floats for one investment,
+        or NumPy arrays with one entry per row
+    """
+    returns = np.asarray(returns, dtype=float)
+    if threshold is None:
+        threshold = 0
+    if returns.shape[-1] == 0:
+        names = ['stddev', 'proba', 'downside', 'semivar'] + \
+            [measure_name(r, level) for level in levels for r in ('var', 'cvar')]
+        return {name: np.full(returns.shape[:-1], np.nan)[()] for name in names}
+    mean = np.mean(returns, axis=-1, keepdims=True)
+    measures = {
+        'stddev': np.std(returns, axis=-1),
+        'proba': np.mean(returns < threshold, axis=-1),
+        'downside': np.sqrt(np.mean(np.minimum(returns - threshold, 0)**2, axis=-1)),
+        'semivar': np.mean(np.minimum(returns - mean, 0)**2, axis=-1)
+    }
+    for level in levels:
+        cutoff = np.percentile(returns, 100 * (1 - level), axis=-1, keepdims=True)
+        tail = returns <= cutoff
+        measures[measure_name('var', level)] = -cutoff[..., 0]
+        measures[measure_name('cvar', level)] = -(np.where(tail, returns, 0).sum(axis=-1) /
+                                                  tail.sum(axis=-1))
+    return measures
+
+
+def risk_measure(returns, risk_type, threshold=0, level=VAR_LEVELS[0]):
+    """
+    Calculates one of the measures of risk of risk_measures.
+
+    Args:
+        returns = array of rates of return, or a two dimensional array
+            with the returns of one investment per row
+        risk_type = measure of risk (stddev, proba, var, cvar, downside or semivar)
+        threshold = threshold rate of return (None is treated as 0)
+        level = confidence level for var and cvar
+    Returns:
+        The measure of risk: a float for one investment, or a NumPy array
+        with one entry per row
+    """
+    name = measure_name(risk_type, level) if risk_type in ('var', 'cvar') else risk_type
+    measures = risk_measures(returns, threshold=threshold, levels=(level,))
+    if name not in measures:
+        raise risk_type_error()
+    return measures[name]
@@ -0,0 +1,319 @@
+"""
+This file generates forward scenarios of daily asset returns from joint
+models fitted to the history of the investment classes:
+- normal = multivariate normal daily log returns
+- t = multivariate Student-t daily log returns (heavier tails)
+- regime = two regimes (calm and volatile), each multivariate normal,
+    switching from day to day as a Markov chain
+Models are fitted once per set of investment classes and cached. Scenarios
+are drawn a rebalancing period at a time and fed to the simulation's
+rebalancing, so memory is bounded by the chunk size, not the number of paths.
+"""
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+from backend.simulation import SIMULATION_PATHS, SIMULATION_YEARS, SIMULATION_CHUNK, \
+    asset_log_returns, simulate_periods, run_chunks, simulation_chunks
+
+# Number of days of the rolling volatility that labels regimes
+REGIME_WINDOW = 21
+# Percentile of rolling volatility above which days are labeled volatile
+REGIME_PERCENTILE = 75
+# Range of degrees of freedom fitted for the Student-t model
+T_DOF_RANGE = (4.5, 100.)
+# Number of fitted models kept (the least recently used are dropped first)
+FITTED_MODELS_SIZE = 16
+
+
+class NormalModel(object):
+    """
+    Multivariate normal model of daily log returns.
+
+    Attributes:
+        mean = NumPy array of mean daily log returns by investment class
+        cov = 2-D NumPy array of covariance of daily log returns
+    """
+
+    def __init__(self, mean, cov):
+        self.mean = mean
+        self.cov = cov
+        self.chol = np.linalg.cholesky(cov)
+
+    def scaled(self, vol_scale):
+        """
+        Stresses the model by scaling the volatility of every investment class.
+
+        Args:
+            vol_scale = multiple of the fitted volatility
+        Returns:
+            New model with scaled covariance
+        """
+        return NormalModel(self.mean, self.cov * vol_scale**2)
+
+    def draw_periods(self, random, num_paths, num_days, rebal_time):
+        """
+        Draws scenarios of daily log returns, one rebalancing period at a time.
+
+        Args:
+            random = NumPy RandomState
+            num_paths, num_days = number of paths and days per path
+            rebal_time = number of days per period
+        Returns:
+            Generator of 3-D NumPy arrays of daily log returns
+            (days x paths x investment classes)
+        """
+        for first in range(0, num_days, rebal_time):
+            shape = (min(rebal_time, num_days - first), num_paths, len(self.mean))
+            yield self.mean + random.standard_normal(shape).dot(self.chol.T)
+
+
+class StudentTModel(NormalModel):
+    """
+    Multivariate Student-t model of daily log returns: a normal draw scaled
+    on each day by a random factor shared by all investment classes.
+
+    Attributes:
+        mean = NumPy array of mean daily log returns by investment class
+        cov = 2-D NumPy array of covariance of daily log returns
+        dof = degrees of freedom (lower for heavier tails)
+    """
+
+    def __init__(self, mean, cov, dof):
+        # The scale matrix gives the fitted covariance once multiplied by dof / (dof - 2)
+        super(StudentTModel, self).__init__(mean, cov * (dof - 2) / dof)
+        self.cov = cov
+        self.dof = dof
+
+    def scaled(self, vol_scale):
+        return StudentTModel(self.mean, self.cov * vol_scale**2, self.dof)
+
+    def draw_periods(self, random, num_paths, num_days, rebal_time):
+        for first in range(0, num_days, rebal_time):
+            shape = (min(rebal_time, num_days - first), num_paths, len(self.mean))
+            scale = np.sqrt(self.dof / random.chisquare(self.dof, size=shape[:2]))
+            yield self.mean + random.standard_normal(shape).dot(self.chol.T) * scale[..., None]
+
+
+class RegimeModel(object):
+    """
+    Two-regime model of daily log returns: each regime is multivariate normal,
+    and the regime of the next day depends only on today's regime.
+
+    Attributes:
+        regimes = list of NormalModel for the calm and the volatile regime
+        transition = 2-D NumPy array of probabilities of moving from the
+            regime of a row to the regime of a column on the next day
+        initial = NumPy array of probabilities of the regime on the first day
+    """
+
+    def __init__(self, regimes, transition, initial):
+        self.regimes = regimes
+        self.transition = transition
+        self.initial = initial
+
+    def scaled(self, vol_scale):
+        """
+        Stresses the model by scaling the volatility of every investment class.
+
+        Args:
+            vol_scale = multiple of the fitted volatility
+        Returns:
+            New model with scaled covariances
+        """
+        return RegimeModel([regime.scaled(vol_scale) for regime in self.regimes],
+                           self.transition, self.initial)
+
+    def draw_periods(self, random, num_paths, num_days, rebal_time):
+        """
+        Draws scenarios of daily log returns, one rebalancing period at a time.
+        The regime of each path carries over from one period to the next.
+
+        Args:
+            random = NumPy RandomState
+            num_paths, num_days = number of paths and days per path
+            rebal_time = number of days per period
+        Returns:
+            Generator of 3-D NumPy arrays of daily log returns
+            (days x paths x investment classes)
+        """
+        volatile = random.random_sample(num_paths) < self.initial[1]
+        for first in range(0, num_days, rebal_time):
+            num = min(rebal_time, num_days - first)
+            switches = random.random_sample((num, num_paths))
+            states = np.empty((num, num_paths), dtype=bool)
+            for day in range(num):
+                stay = np.where(volatile, self.transition[1, 1], self.transition[0, 0])
+                volatile = volatile != (switches[day] >= stay)
+                states[day] = volatile
+            normal = random.standard_normal((num, num_paths, len(self.regimes[0].mean)))
+            calm, stressed = [regime.mean + normal.dot(regime.chol.T) for regime in self.regimes]
+            yield np.where(states[..., None], stressed, calm)
+
+
+def fit_normal(log_returns):
+    """
+    Fits a multivariate normal model to daily log returns.
+
+    Args:
+        log_returns = 2-D array of daily log returns (days x investment classes)
+    Returns:
+        NormalModel
+    """
+    return NormalModel(log_returns.mean(axis=0), np.atleast_2d(np.cov(log_returns, rowvar=False)))
+
+
+def fit_student_t(log_returns):
+    """
+    Fits a multivariate Student-t model to daily log returns. The degrees of
+    freedom match the average excess kurtosis of the investment classes
+    (6 / (dof - 4) for a Student-t distribution).
+
+    Args:
+        log_returns = 2-D array of daily log returns (days x investment classes)
+    Returns:
+        StudentTModel
+    """
+    deviations = log_returns - log_returns.mean(axis=0)
+    kurtosis = np.mean((deviations**4).mean(axis=0) / (deviations**2).mean(axis=0)**2 - 3)
+    dof = 4 + 6 / kurtosis if kurtosis > 0 else T_DOF_RANGE[1]
+    normal = fit_normal(log_returns)
+    return StudentTModel(normal.mean, normal.cov, float(np.clip(dof, *T_DOF_RANGE)))
+
+
+def label_regimes(log_returns, window=REGIME_WINDOW, percentile=REGIME_PERCENTILE):
+    """
+    Labels each day calm or volatile by the rolling volatility of the
+    average daily log return of the investment classes.
+
+    Args:
+        log_returns = 2-D array of daily log returns (days x investment classes)
+        window = number of days of the rolling volatility
+        percentile = percentile of rolling volatility above which days are volatile
+    Returns:
+        Boolean NumPy array, True on volatile days
+    """
+    average = log_returns.mean(axis=1)
+    # Rolling variance from running sums; the first days use the first full window
+    sums = np.concatenate([[0], np.cumsum(average)])
+    squares = np.concatenate([[0], np.cumsum(average**2)])
+    window = min(window, len(average))
+    ends = np.maximum(np.arange(1, len(average) + 1), window)
+    mean = (sums[ends] - sums[ends - window]) / window
+    volatility = np.sqrt(np.maximum((squares[ends] - squares[ends - window]) / window - mean**2,
+                                    0))
+    return volatility > np.percentile(volatility, percentile)
+
+
+def fit_regimes(log_returns):
+    """
+    Fits a two-regime model to daily log returns: a normal model for the calm
+    and the volatile days (see label_regimes), and the day to day probability
+    of moving between them.
+
+    Args:
+        log_returns = 2-D array of daily log returns (days x investment classes)
+    Returns:
+        RegimeModel
+    """
+    volatile = label_regimes(log_returns)
+    counts = np.zeros((2, 2))
+    np.add.at(counts, (volatile[:-1].astype(int), volatile[1:].astype(int)), 1)
+    transition = counts / counts.sum(axis=1, keepdims=True)
+    initial = np.array([1 - volatile.mean(), volatile.mean()])
+    return RegimeModel([fit_normal(log_returns[~volatile]), fit_normal(log_returns[volatile])],
+                       transition, initial)
+
+
+MODEL_FITS = {
+    'normal': fit_normal,
+    't': fit_student_t,
+    'regime': fit_regimes
+}
+
+# Fitted models by (sorted investment classes, model, first, last), least recently used first
+FITTED_MODELS = OrderedDict()
+FITTED_MODELS_LOCK = Lock()
+
+
+def fitted_model(assets, investment_class_dict, model='normal', first=None, last=None):
+    """
+    Gets a model fitted to the daily log returns of some investment classes,
+    fitting it the first time it is asked for (in any order of the classes).
+    Only the FITTED_MODELS_SIZE most recently used models are kept.
+
+    Args:
+        assets = descriptions of the investment classes
+        investment_class_dict = dictionary to translate user input to data frames
+        model = normal, t or regime
+        first, last = optional dates restricting the history fitted
+    Returns:
+        Fitted model, with the investment classes in sorted order
+    """
+    if model not in MODEL_FITS:
+        raise Exception('Scenario model must be normal, t or regime.')
+    key = (tuple(sorted(assets)), model, first, last)
+    with FITTED_MODELS_LOCK:
+        if key in FITTED_MODELS:
+            FITTED_MODELS.move_to_end(key)
+        else:
+            FITTED_MODELS[key] = MODEL_FITS[model](
+                asset_log_returns(key[0], investment_class_dict, first, last))
+            if len(FITTED_MODELS) > FITTED_MODELS_SIZE:
+                FITTED_MODELS.popitem(last=False)
+        return FITTED_MODELS[key]
+
+
+def scenario_chunk(model, weight_matrix, rebal_time, num_paths, num_days, seed, chunk_index=0):
+    """
+    Simulates one chunk of scenario paths for several portfolios.
+
+    Args:
+        model = fitted model (see fitted_model)
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        num_paths, num_days = number of paths and days per path
+        seed = seed of the simulation
+        chunk_index = position of the chunk in the simulation
+    Returns:
+        Tuple of 2-D NumPy arrays (paths x portfolios): value at the end of
+        each path as a multiple of the initial value, and maximum drawdown
+    """
+    random = np.random.RandomState([seed, chunk_index])
+    return simulate_periods(model.draw_periods(random, num_paths, num_days, rebal_time),
+                            weight_matrix, num_paths)
+
+
+def simulate_scenarios(assets, weight_matrix, rebal_time, investment_class_dict,
+                       model='normal', num_paths=SIMULATION_PATHS, years=SIMULATION_YEARS,
+                       seed=0, vol_scale=1, first=None, last=None,
+                       chunk_size=SIMULATION_CHUNK, workers=None):
+    """
+    Simulates future values of several portfolios holding some investment
+    classes, on scenarios drawn from a model fitted to their history.
+
+    Args:
+        assets = descriptions of the investment classes
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        investment_class_dict = dictionary to translate user input to data frames
+        model = normal, t or regime
+        num_paths = number of simulated paths
+        years = length of each path in years
+        seed = seed of the simulation (the same seed and chunk_size give the
+            same paths, however many workers are used)
+        vol_scale = multiple of the fitted volatility, to stress the scenarios
+        first, last = optional dates restricting the history fitted
+        chunk_size = number of paths simulated together
+        workers = number of worker processes (None or 1 to simulate in this process)
+    Returns:
+        Dictionary of 2-D NumPy arrays (paths x portfolios), see simulation.run_chunks
+    """
+    fitted = fitted_model(assets, investment_class_dict, model, first, last)
+    if vol_scale != 1:
+        fitted = fitted.scaled(vol_scale)
+    # The model's investment classes are in sorted order
+    weight_matrix = np.asarray(weight_matrix, dtype=float)[:, np.argsort(assets)]
+    return run_chunks(scenario_chunk,
+                      simulation_chunks(fitted, weight_matrix, rebal_time, num_paths=num_paths,
+                                        years=years, seed=seed, chunk_size=chunk_size),
+                      workers)
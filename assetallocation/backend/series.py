@@ -0,0 +1,242 @@
+"""
+This file measures risk and return over many windows and parameters of
+one investment: trailing windows evaluated at regular dates, and every
+combination of period of return, sampling frequency and threshold.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from backend.log_prices import YEAR, DAY_NS, date_positions, as_log_prices
+from backend.risk_measures import VAR_LEVELS, risk_measure
+from backend.drawdown import DRAWDOWN_TYPES, drawdown_measures, calc_drawdown
+from backend.functions import return_list, prob_below, chunked_returns
+
+
+#Constants
+SERIES_WINDOW = 3 * YEAR
+SERIES_STEP = 30
+# Measures of risk that risk_return_series updates with running sums
+SERIES_RUNNING_TYPES = ('stddev', 'proba', 'downside')
+
+
+def risk_return_series(data, start, end, window=SERIES_WINDOW, step=SERIES_STEP,
+                       return_type='percent', annualize_return=False, risk_type='stddev',
+                       annualize_risk=False, period=YEAR, freq=1, threshold=0,
+                       level=VAR_LEVELS[0]):
+    """
+    Measures risk and return over a trailing window, evaluated at regular dates.
+    The rolling returns are listed once for the whole range, sampled every freq
+    days from start, and each window uses the samples that fit inside it (the
+    same as calc_risk over the window when window and step are multiples of freq).
+    Standard deviation, probability below the threshold and downside deviation
+    (SERIES_RUNNING_TYPES) come from running sums, so moving the window adds the
+    samples entering it and removes those leaving it. The other measures are not
+    updated incrementally: value at risk, conditional value at risk and
+    semi-variance (whose shortfall is measured from each window's own mean) are
+    computed afresh from each window's samples, and drawdowns rescan each
+    window's values, so their cost grows with the window times the number of dates.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        start, end = start and end dates of the whole range
+        window = # of days of the trailing window
+        step = # of days between evaluation dates
+        other arguments = same as get_risk_return and calc_risk
+    Returns:
+        Dataframe with a row per evaluation date (the end of each window):
+        Date, Risk and Return
+    """
+    log_prices = as_log_prices(data)
+    dates = pd.date_range(start + timedelta(days=window), end, freq=timedelta(days=step))
+    return pd.DataFrame({
+        'Date': dates,
+        'Risk': series_risk(log_prices, start, end, dates, window, risk_type=risk_type,
+                            return_type=return_type, annualize=annualize_risk, period=period,
+                            freq=freq, threshold=threshold, level=level),
+        'Return': log_prices.returns(dates - timedelta(days=window), dates,
+                                     return_type=return_type, annualize=annualize_return)},
+                        columns=['Date', 'Risk', 'Return'])
+
+
+def series_risk(log_prices, start, end, dates, window, risk_type='stddev',
+                return_type='percent', annualize=False, period=YEAR, freq=1, threshold=0,
+                level=VAR_LEVELS[0]):
+    """
+    Measures risk over the trailing window ending at each date.
+
+    Args:
+        log_prices = LogPrices of the investment
+        start, end = start and end dates of the whole range
+        dates = evaluation dates (the end of each window)
+        window = # of days of the trailing window
+        other arguments = same as calc_risk
+    Returns:
+        NumPy array of risk, one entry per date
+    """
+    if risk_type in DRAWDOWN_TYPES:
+        return window_drawdowns(log_prices, dates - timedelta(days=window), dates,
+                                risk_type=risk_type, return_type=return_type)
+    if window < period:
+        raise Exception('The window must be at least as long as the period of return.')
+    rolling = return_list(log_prices, start, end, period=period, freq=freq,
+                          return_type=return_type, annualize=annualize)
+    lows, highs = sample_windows(start, end, dates, window, period=period, freq=freq)
+    return window_risk(rolling, lows, highs, risk_type=risk_type, threshold=threshold,
+                       level=level)
+
+
+def window_drawdowns(log_prices, firsts, dates, risk_type='maxdd', return_type='percent'):
+    """
+    Measures a drawdown over each window of daily values.
+
+    Args:
+        log_prices = LogPrices of the investment
+        firsts, dates = first and last dates of each window
+        risk_type = measure of drawdown (maxdd, avgdd or underwater)
+        return_type = measure of return (percent or log)
+    Returns:
+        NumPy array of drawdowns, one entry per window
+    """
+    lows = date_positions(log_prices, firsts)
+    highs = np.searchsorted(log_prices.index.asi8, dates.asi8, side='right')
+    days = log_prices.index.asi8 // DAY_NS
+    return np.array([drawdown_measures(log_prices.log_values[low:high], days[low:high],
+                                       return_type=return_type)[risk_type]
+                     for low, high in zip(lows, highs)])
+
+
+def sample_windows(start, end, dates, window, period=YEAR, freq=1):
+    """
+    Finds the rolling returns of return_list that fit inside each trailing window.
+
+    Args:
+        start, end = start and end dates of the whole range
+        dates = evaluation dates (the end of each window)
+        window = # of days of the trailing window
+        period, freq = same as return_list
+    Returns:
+        Tuple of NumPy arrays (lows, highs): window i holds the samples lows[i]:highs[i]
+    """
+    samples = pd.date_range(start, end - timedelta(days=period), freq=timedelta(days=freq))
+    lows = np.searchsorted(samples.asi8, (dates - timedelta(days=window)).asi8)
+    highs = np.searchsorted(samples.asi8, (dates - timedelta(days=period)).asi8, side='right')
+    return lows, highs
+
+
+def window_risk(rolling, lows, highs, risk_type='stddev', threshold=0, level=VAR_LEVELS[0]):
+    """
+    Measures risk over ranges of rolling returns. The measures of
+    SERIES_RUNNING_TYPES come from running sums; the others are computed
+    afresh from each range.
+
+    Args:
+        rolling = NumPy array of rolling returns
+        lows, highs = each range is rolling[lows[i]:highs[i]]
+        other arguments = same as calc_risk
+    Returns:
+        NumPy array of risk, one entry per range
+    """
+    if threshold is None:
+        threshold = 0
+    counts = (highs - lows).astype(float)
+
+    def _window_sums(values):
+        sums = np.concatenate([[0], np.cumsum(values)])
+        return sums[highs] - sums[lows]
+
+    if risk_type == 'stddev':
+        # Running sums are kept relative to a shift (the mean return) for accuracy
+        deviations = rolling - rolling.mean()
+        mean_deviation = _window_sums(deviations) / counts
+        return np.sqrt(np.maximum(_window_sums(deviations**2) / counts - mean_deviation**2, 0))
+    if risk_type == 'proba':
+        return _window_sums(rolling < threshold) / counts
+    if risk_type == 'downside':
+        return np.sqrt(_window_sums(np.minimum(rolling - threshold, 0)**2) / counts)
+    risk_measure(rolling[:1], risk_type, threshold=threshold, level=level)
+    return np.array([risk_measure(rolling[low:high], risk_type, threshold=threshold, level=level)
+                     for low, high in zip(lows, highs)])
+
+
+def risk_sensitivity(data, start, end, periods, freqs, thresholds=(0,), risk_type='stddev',
+                     return_type='percent', annualize=False, level=VAR_LEVELS[0]):
+    """
+    Measures risk for every combination of period of return, sampling
+    frequency and threshold, as calc_risk would for each combination.
+    The log values are read once per combination (for each frequency the
+    start values are shared by every period), and each list of rolling returns
+    is sorted once for all thresholds: the probability below each threshold is a
+    binary search, and the downside deviation comes from running sums of the
+    sorted returns below it.
+
+    Args:
+        data = dataframe of investment values (or LogPrices)
+        start, end = overall start and end dates of investment
+        periods = list of # of days over which to calculate rates of return
+        freqs = list of how often to sample (in days)
+        thresholds = list of threshold rates of return (None is treated as 0)
+        other arguments = same as calc_risk
+    Returns:
+        3-D NumPy array of risk (periods x freqs x thresholds)
+    """
+    log_prices = as_log_prices(data)
+    periods, freqs = list(periods), list(freqs)
+    thresholds = np.array([0 if t is None else t for t in thresholds], dtype=float)
+    cube = np.full((len(periods), len(freqs), len(thresholds)), np.nan)
+    if risk_type in DRAWDOWN_TYPES:
+        # Drawdowns depend on none of the parameters
+        cube[...] = calc_drawdown(log_prices, start, end, return_type=return_type)[risk_type]
+        return cube
+    # Fails early on an unknown measure of risk
+    risk_measure(np.zeros(1), risk_type, level=level)
+    for j, freq in enumerate(freqs):
+        cube[:, j] = sensitivity_column(log_prices, start, end, periods, freq, thresholds,
+                                        risk_type=risk_type, return_type=return_type,
+                                        annualize=annualize, level=level)
+    return cube
+
+
+def sensitivity_column(log_prices, start, end, periods, freq, thresholds, risk_type='stddev',
+                       return_type='percent', annualize=False, level=VAR_LEVELS[0]):
+    """
+    Measures risk for every period of return and threshold at one sampling
+    frequency. Each list of rolling returns is sorted once for all thresholds.
+
+    Args:
+        log_prices = LogPrices of the investment
+        freq = how often to sample (in days)
+        thresholds = NumPy array of threshold rates of return
+        other arguments = same as risk_sensitivity
+    Returns:
+        2-D NumPy array of risk (periods x thresholds), NaN for periods
+        longer than the range
+    """
+    column = np.full((len(periods), len(thresholds)), np.nan)
+    for i, returns in chunked_returns(log_prices, start, end, periods, freq=freq,
+                                      return_type=return_type, annualize=annualize):
+        returns = np.sort(returns)
+        if risk_type == 'proba':
+            column[i] = prob_below(returns, thresholds)
+        elif risk_type == 'downside':
+            column[i] = downside_below(returns, thresholds)
+        else:
+            column[i] = risk_measure(returns, risk_type, level=level)
+    return column
+
+
+def downside_below(returns, thresholds):
+    """
+    Calculates the downside deviation below many thresholds from running
+    sums of sorted returns.
+
+    Args:
+        returns = sorted NumPy array of rates of return
+        thresholds = NumPy array of threshold rates of return
+    Returns:
+        NumPy array of downside deviations, one entry per threshold
+    """
+    below = np.searchsorted(returns, thresholds)
+    sums = np.concatenate([[0], np.cumsum(returns)])
+    squares = np.concatenate([[0], np.cumsum(returns**2)])
+    shortfall = squares[below] - 2 * thresholds * sums[below] + thresholds**2 * below
+    return np.sqrt(np.maximum(shortfall, 0) / len(returns))
@@ -0,0 +1,195 @@
+"""
+This file simulates future values of portfolios by bootstrapping: each
+simulated day reuses the returns of a randomly chosen historical day.
+The same historical day is used for every investment class, so simulated
+paths keep the correlation between investment classes.
+"""
+import numpy as np
+from backend.log_prices import YEAR
+from backend.datasets import asset_matrix, pool_context
+
+# Number of simulated paths
+SIMULATION_PATHS = 10000
+# Number of simulated years
+SIMULATION_YEARS = 10
+# Number of paths simulated together (bounds the memory used)
+SIMULATION_CHUNK = 1024
+
+
+def asset_log_returns(assets, investment_class_dict, first=None, last=None):
+    """
+    Gets the daily log returns of several investment classes over the days
+    covered by all of them.
+
+    Args:
+        assets = descriptions of the investment classes
+        investment_class_dict = dictionary to translate user input to data frames
+        first, last = optional dates restricting the history used
+    Returns:
+        2-D NumPy array of daily log returns (days x investment classes)
+    """
+    matrix = asset_matrix(investment_class_dict, assets)
+    start, stop = matrix.common_range(assets)
+    if first is not None:
+        start = max(start, matrix.position(first))
+    if last is not None:
+        stop = min(stop, matrix.position(last))
+    return np.diff(np.log(matrix.prices(assets, start, stop)), axis=0)
+
+
+def bootstrap_days(num_history, num_paths, num_days, seed, chunk_index=0):
+    """
+    Draws the historical days used by a chunk of simulated paths.
+    Each chunk has its own random stream, so results do not depend on
+    how chunks are spread over processes.
+
+    Args:
+        num_history = number of historical days to draw from
+        num_paths, num_days = number of paths and days per path
+        seed = seed of the simulation
+        chunk_index = position of the chunk in the simulation
+    Returns:
+        2-D NumPy array of historical day positions (paths x days)
+    """
+    return np.random.RandomState([seed, chunk_index]).randint(0, num_history,
+                                                              size=(num_paths, num_days))
+
+
+def simulate_periods(period_returns, weight_matrix, num_paths):
+    """
+    Simulates several rebalanced portfolios along paths given one rebalancing
+    period at a time. Within a period each portfolio's growth is the weighted
+    growth of its investment classes since the period started (as in
+    functions.rebalance_indices), computed for every path and portfolio with
+    one matrix product; the running peak and the worst fall below it are
+    updated day by day instead of keeping whole paths.
+
+    Args:
+        period_returns = iterable of 3-D arrays of daily log returns
+            (days x paths x investment classes), one per rebalancing period
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        num_paths = number of paths
+    Returns:
+        Tuple of 2-D NumPy arrays (paths x portfolios): value at the end of
+        each path as a multiple of the initial value, and maximum drawdown
+    """
+    num_assets, num_portfolios = weight_matrix.shape[1], len(weight_matrix)
+    value = np.ones((num_paths, num_portfolios))
+    peak = value.copy()
+    worst = value.copy()
+    ratio = np.empty_like(value)
+    for log_returns in period_returns:
+        asset_growth = np.exp(np.cumsum(log_returns, axis=0))
+        period_values = asset_growth.reshape(-1, num_assets).dot(
+            weight_matrix.T).reshape(-1, num_paths, num_portfolios)
+        # Running maxima along the first axis are much faster one row at a time
+        for day_values in period_values:
+            np.multiply(day_values, value, out=day_values)
+            np.maximum(peak, day_values, out=peak)
+            np.divide(day_values, peak, out=ratio)
+            np.minimum(worst, ratio, out=worst)
+        value = period_values[-1]
+    return value, 1 - worst
+
+
+def simulate_chunk(log_returns, weight_matrix, rebal_time, num_paths, num_days, seed,
+                   chunk_index=0):
+    """
+    Simulates one chunk of bootstrapped paths for several portfolios.
+
+    Args:
+        log_returns = 2-D array of historical daily log returns (days x investment classes)
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        num_paths, num_days = number of paths and days per path
+        seed = seed of the simulation
+        chunk_index = position of the chunk in the simulation
+    Returns:
+        Tuple of 2-D NumPy arrays (paths x portfolios): value at the end of
+        each path as a multiple of the initial value, and maximum drawdown
+    """
+    # Simulated days first, so each simulated day is one contiguous row
+    days = bootstrap_days(len(log_returns), num_paths, num_days, seed, chunk_index).T
+    return simulate_periods((log_returns[days[first:first + rebal_time]]
+                             for first in range(0, num_days, rebal_time)),
+                            weight_matrix, num_paths)
+
+
+def run_chunks(chunk_function, chunks, workers=None):
+    """
+    Runs the chunks of a simulation, in this process or in a pool of
+    worker processes, and joins their results.
+
+    Args:
+        chunk_function = function simulating one chunk (such as simulate_chunk)
+        chunks = list of tuples of arguments of chunk_function
+        workers = number of worker processes (None or 1 to simulate in this process)
+    Returns:
+        Dictionary of 2-D NumPy arrays (paths x portfolios):
+        - terminal = value at the end of each path as a multiple of the initial value
+        - maxdd = maximum drawdown along each path
+    """
+    if workers is not None and workers > 1 and len(chunks) > 1:
+        with pool_context().Pool(workers) as pool:
+            results = pool.starmap(chunk_function, chunks)
+    else:
+        results = [chunk_function(*chunk) for chunk in chunks]
+    return {
+        'terminal': np.concatenate([terminal for terminal, drawdown in results]),
+        'maxdd': np.concatenate([drawdown for terminal, drawdown in results])
+    }
+
+
+def simulation_chunks(history, weight_matrix, rebal_time, num_paths=SIMULATION_PATHS,
+                      years=SIMULATION_YEARS, seed=0, chunk_size=SIMULATION_CHUNK):
+    """
+    Splits the paths of a simulation into chunks for run_chunks.
+
+    Args:
+        history = what each chunk simulates from (such as daily log returns)
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        num_paths = number of simulated paths
+        years = length of each path in years
+        seed = seed of the simulation
+        chunk_size = number of paths simulated together
+    Returns:
+        List of tuples of arguments of a chunk function (such as simulate_chunk)
+    """
+    num_days = int(round(years * YEAR))
+    return [(history, weight_matrix, rebal_time,
+             min(chunk_size, num_paths - i * chunk_size), num_days, seed, i)
+            for i in range(-(-num_paths // chunk_size))]
+
+
+def simulate_portfolios(assets, weight_matrix, rebal_time, investment_class_dict,
+                        num_paths=SIMULATION_PATHS, years=SIMULATION_YEARS, seed=0,
+                        first=None, last=None, chunk_size=SIMULATION_CHUNK, workers=None):
+    """
+    Simulates future values of several portfolios holding some investment
+    classes, by bootstrapping the historical daily returns of those classes.
+
+    Args:
+        assets = descriptions of the investment classes
+        weight_matrix = 2-D array of weights (portfolios x investment classes), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        investment_class_dict = dictionary to translate user input to data frames
+        num_paths = number of simulated paths
+        years = length of each path in years
+        seed = seed of the simulation (the same seed and chunk_size give the
+            same paths, however many workers are used)
+        first, last = optional dates restricting the history resampled
+        chunk_size = number of paths simulated together
+        workers = number of worker processes (None or 1 to simulate in this process)
+    Returns:
+        Dictionary of 2-D NumPy arrays (paths x portfolios):
+        - terminal = value at the end of each path as a multiple of the initial value
+        - maxdd = maximum drawdown along each path
+    """
+    log_returns = asset_log_returns(assets, investment_class_dict, first, last)
+    weight_matrix = np.asarray(weight_matrix, dtype=float)
+    return run_chunks(simulate_chunk,
+                      simulation_chunks(log_returns, weight_matrix, rebal_time,
+                                        num_paths=num_paths, years=years, seed=seed,
+                                        chunk_size=chunk_size),
+                      workers)
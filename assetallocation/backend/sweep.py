@@ -0,0 +1,188 @@
+"""
+This file sweeps the weights of portfolios over a grid on the simplex
+(every split of 100% between some investment classes at a fixed step)
+and measures the risk and return of every split in batches.
+"""
+from math import factorial
+import numpy as np
+from backend.functions import YEAR, rebalance_indices
+from backend.bootstrap import risk_return_days, batch_risk_return
+from backend.datasets import asset_matrix
+
+# Number of portfolios evaluated together
+SWEEP_CHUNK = 2048
+
+
+def simplex_size(num_assets, steps):
+    """
+    Counts the splits of a whole into steps equal parts between several assets.
+
+    Args:
+        num_assets = number of assets
+        steps = number of parts (for example 100 for a 1% step)
+    Returns:
+        Number of splits
+    """
+    return factorial(steps + num_assets - 1) // (factorial(steps) * factorial(num_assets - 1))
+
+
+def simplex_block(num_assets, steps):
+    """
+    Lists every split of steps parts between at most three assets, vectorized.
+    Splits are in lexicographic order of the parts of the first assets.
+
+    Args:
+        num_assets = number of assets (1, 2 or 3)
+        steps = number of parts
+    Returns:
+        2-D NumPy array of parts (splits x assets)
+    """
+    if num_assets == 1:
+        return np.array([[steps]])
+    if num_assets == 2:
+        first = np.arange(steps + 1)
+        return np.column_stack([first, steps - first])
+    # For each part of the first asset, the second takes 0 up to what is left
+    first = np.repeat(np.arange(steps + 1), np.arange(steps + 1, 0, -1))
+    row_starts = np.concatenate([[0], np.cumsum(np.arange(steps + 1, 1, -1))])
+    second = np.arange(len(first)) - row_starts[first]
+    return np.column_stack([first, second, steps - first - second])
+
+
+def simplex_counts(num_assets, steps, chunk_size=SWEEP_CHUNK):
+    """
+    Streams every split of steps parts between several assets, in chunks.
+    Splits are in lexicographic order of the parts of the first assets
+    (the order of nested loops over the assets, the last taking the rest).
+
+    Args:
+        num_assets = number of assets
+        steps = number of parts (for example 100 for a 1% step)
+        chunk_size = number of splits per chunk
+    Returns:
+        Generator of 2-D NumPy arrays of parts (splits x assets)
+    """
+    def _blocks(prefix, num_left, steps_left):
+        if num_left <= 3:
+            block = simplex_block(num_left, steps_left)
+            yield np.column_stack([np.tile(prefix, (len(block), 1)), block])
+            return
+        for part in range(steps_left + 1):
+            for block in _blocks(prefix + [part], num_left - 1, steps_left - part):
+                yield block
+
+    pending, num_pending = [], 0
+    for block in _blocks([], num_assets, steps):
+        pending.append(block.astype(int))
+        num_pending += len(block)
+        while num_pending >= chunk_size:
+            merged = np.concatenate(pending)
+            yield merged[:chunk_size]
+            pending, num_pending = [merged[chunk_size:]], num_pending - chunk_size
+    if num_pending:
+        yield np.concatenate(pending)
+
+
+def simplex_weights(num_assets, steps, chunk_size=SWEEP_CHUNK):
+    """
+    Streams every weight vector on the simplex with a step of 1 / steps, in chunks.
+
+    Args:
+        same as simplex_counts
+    Returns:
+        Generator of 2-D NumPy arrays of weights (portfolios x assets), rows add to 1
+    """
+    for counts in simplex_counts(num_assets, steps, chunk_size):
+        yield counts / float(steps)
+
+
+def evaluate_weights(assets, weight_matrix, rebal_time, start, end, investment_class_dict,
+                     **kwargs):
+    """
+    Measures the risk and return of many portfolios holding the same investment
+    classes at once, without building a data frame for each portfolio. The
+    measures are the same as get_risk_return on the portfolio indices: each
+    portfolio is tracked over the history of the classes it holds, so a class
+    at 0% does not shorten it. Portfolios holding a class without data between
+    start and end get NaN.
+
+    Args:
+        assets = descriptions of the investment classes
+        weight_matrix = 2-D array of weights (portfolios x assets), rows add to 1
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        start, end = start and end dates for measuring risk and return
+        investment_class_dict = dictionary to translate user input to data frames
+        kwargs = measures of risk and return (see batch_risk_return)
+    Returns:
+        Tuple of NumPy arrays (risk, return) with one entry per portfolio
+    """
+    weight_matrix = np.asarray(weight_matrix, dtype=float)
+    risk, returns = np.full(len(weight_matrix), np.nan), np.full(len(weight_matrix), np.nan)
+    matrix = asset_matrix(investment_class_dict, assets)
+    # Portfolios holding the same classes are evaluated together
+    holdings, groups = np.unique(weight_matrix != 0, axis=0, return_inverse=True)
+    for group, held in enumerate(holdings):
+        rows = groups == group
+        risk[rows], returns[rows] = group_risk_return(
+            matrix, [asset for asset, hold in zip(assets, held) if hold],
+            weight_matrix[rows][:, held], rebal_time, start, end, **kwargs)
+    return risk, returns
+
+
+def group_risk_return(matrix, names, weight_matrix, rebal_time, start, end, risk_type='stddev',
+                      period=YEAR, freq=1, **kwargs):
+    """
+    Measures the risk and return of portfolios holding the same investment
+    classes, over the history those classes share.
+
+    Args:
+        matrix = AssetMatrix of the investment classes
+        names = descriptions of the investment classes held
+        weight_matrix = 2-D array of weights of the classes held (portfolios x names)
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        start, end = start and end dates for measuring risk and return
+        other arguments = same as batch_risk_return
+    Returns:
+        Tuple of NumPy arrays (risk, return) with one entry per portfolio,
+        or NaN if the classes do not all have data between start and end
+    """
+    first, last = matrix.common_range(names)
+    if last < first or matrix.calendar[first] > start or matrix.calendar[last] < end:
+        return np.nan, np.nan
+    calendar = matrix.calendar[first:last + 1]
+    days = risk_return_days(calendar, start, end, risk_type=risk_type, period=period, freq=freq)
+    log_values = np.log(rebalance_indices(matrix.prices(names, first, last), weight_matrix,
+                                          rebal_time, days=days))
+    return batch_risk_return(log_values, calendar, start, end, days=days, risk_type=risk_type,
+                             period=period, freq=freq, **kwargs)
+
+
+def sweep_risk_return(assets, steps, rebal_time, start, end, investment_class_dict,
+                      chunk_size=SWEEP_CHUNK, **kwargs):
+    """
+    Measures the risk and return of every split of 100% between several
+    investment classes at a step of 1 / steps, streaming the weights in chunks.
+
+    Args:
+        assets = descriptions of the investment classes
+        steps = number of parts (for example 100 for a 1% step)
+        rebal_time = how often to rebalance the portfolios (measured in days)
+        start, end = start and end dates for measuring risk and return
+        investment_class_dict = dictionary to translate user input to data frames
+        chunk_size = number of portfolios evaluated together
+        kwargs = measures of risk and return (see evaluate_weights)
+    Returns:
+        NumPy structured array with fields weights, risk and return,
+        in the order of simplex_weights
+    """
+    results = np.zeros(simplex_size(len(assets), steps),
+                       dtype=[('weights', float, (len(assets),)),
+                              ('risk', float), ('return', float)])
+    done = 0
+    for weight_matrix in simplex_weights(len(assets), steps, chunk_size):
+        chunk = results[done:done + len(weight_matrix)]
+        chunk['weights'] = weight_matrix
+        chunk['risk'], chunk['return'] = evaluate_weights(
+            assets, weight_matrix, rebal_time, start, end, investment_class_dict, **kwargs)
+        done += len(weight_matrix)
+    return results
@@ -3,30 +3,46 @@ This file contains the functions which take the user inputs
 from the frontend, send them to the backend to interact with
 the data, then returns the information to the frontend for graphing.
 """
-from backend.functions import invest_dataframe, track_portfolio_cache, label_risk_return
+from collections import Counter
+import numpy as np
+import pandas as pd
+from backend.functions import label_risk_return, return_cdf
+from backend.series import SERIES_WINDOW, SERIES_STEP, risk_return_series, risk_sensitivity
+from backend.datasets import DatasetRegistry, pool_context
+from backend.portfolio_cache import track_portfolio_cache, track_portfolio_batch, \
+    track_log_prices_cache, canonical_key
+from backend.frontier import efficient_frontier
+from backend.simulation import SIMULATION_PATHS, SIMULATION_YEARS, simulate_portfolios
+from backend.estimates import estimate_risk_return
+from backend.walk_forward import split_dates, walk_forward, rank_stability
+
+# Number of chunks of portfolios given to each worker process
+CHUNKS_PER_WORKER = 4
+# Periods of return and sampling frequencies (days) compared by export_sensitivity
+SENSITIVITY_PERIODS = (30, 90, 180, 365, 730)
+SENSITIVITY_FREQS = (1, 5, 10, 30, 90)
 
 # Dictionary translating descriptions of investment classes to data sets
+# Each data set is loaded the first time it is used.
 # Expand as necessary in the future.
-INVESTMENT_CLASS_DICT = {
-    'U.S. large-cap stocks (S&P 500 index)': invest_dataframe('./Data/SP500.csv'),
-    'U.S. large-cap stocks (Wilshire index)': invest_dataframe('./Data/WILLLRGCAP.csv'),
-    'U.S. mid-cap stocks (Wilshire index)': invest_dataframe('./Data/WILLMIDCAP.csv'),
-    'U.S. small-cap stocks (Wilshire index)': invest_dataframe('./Data/WILLSMLCAP.csv'),
-    'U.S. corporate bonds (investment-grade, AAA rated)':
-        invest_dataframe('./Data/BAMLCC0A1AAATRIV.csv'),
-    'U.S. corporate bonds (investment-grade, BBB rated)':
-        invest_dataframe('./Data/BAMLCC0A4BBBTRIV.csv'),
-    'U.S. Treasury bonds, total market (S&P index)': invest_dataframe('./Data/SPUSBOND.csv'),
-    'U.S. Treasury bonds, 0-1 year (S&P index)': invest_dataframe('./Data/SP01BOND.csv'),
-    'U.S. Treasury bonds, 1-3 year (S&P index)': invest_dataframe('./Data/SP13BOND.csv'),
-    'U.S. Treasury bonds, 3-5 year (S&P index)': invest_dataframe('./Data/SP35BOND.csv'),
-    'U.S. Treasury bonds, 5-7 year (S&P index)': invest_dataframe('./Data/SP57BOND.csv'),
+INVESTMENT_CLASS_DICT = DatasetRegistry({
+    'U.S. large-cap stocks (S&P 500 index)': './Data/SP500.csv',
+    'U.S. large-cap stocks (Wilshire index)': './Data/WILLLRGCAP.csv',
+    'U.S. mid-cap stocks (Wilshire index)': './Data/WILLMIDCAP.csv',
+    'U.S. small-cap stocks (Wilshire index)': './Data/WILLSMLCAP.csv',
+    'U.S. corporate bonds (investment-grade, AAA rated)': './Data/BAMLCC0A1AAATRIV.csv',
+    'U.S. corporate bonds (investment-grade, BBB rated)': './Data/BAMLCC0A4BBBTRIV.csv',
+    'U.S. Treasury bonds, total market (S&P index)': './Data/SPUSBOND.csv',
+    'U.S. Treasury bonds, 0-1 year (S&P index)': './Data/SP01BOND.csv',
+    'U.S. Treasury bonds, 1-3 year (S&P index)': './Data/SP13BOND.csv',
+    'U.S. Treasury bonds, 3-5 year (S&P index)': './Data/SP35BOND.csv',
+    'U.S. Treasury bonds, 5-7 year (S&P index)': './Data/SP57BOND.csv',
     'U.S. Treasury bonds, long-term': None,  # fill in
     'U.S. municipal tax-exempt bonds': None,  # fill in
     'International growth stocks': None,  # fill in
     'International value stocks': None,  # fill in
     'Cash at inflation': None  # fill in
-}
+})
 
 
 def portfolio_from_input(user_input):
@@ -48,14 +64,83 @@ def portfolio_from_input(user_input):
     rebal_time = user_input['Rebalancing frequency (days)']
     start = user_input['Start date']
     end = user_input['End date']
+    return track_portfolio_cache(initial, percent_tuple_from_input(user_input), rebal_time,
+                                 start, end, INVESTMENT_CLASS_DICT)
+
+
+def log_prices_from_input(user_input):
+    """
+    Translates user input (frontend) to the LogPrices of the portfolio (backend),
+    which is all the risk and return measures need.
+
+    Args:
+        user_input: dictionary of user inputs for a single portfolio
+            (see portfolio_from_input)
+    Returns:
+        LogPrices of the portfolio between its start and end dates.
+    """
+    return track_log_prices_cache(percent_tuple_from_input(user_input),
+                                  user_input['Rebalancing frequency (days)'],
+                                  user_input['Start date'], user_input['End date'],
+                                  INVESTMENT_CLASS_DICT)
+
+
+def log_prices_from_inputs(user_portfolio_list):
+    """
+    Returns the log of the values of several portfolios, computing those
+    sharing a rebalancing frequency in batches before looking them up.
+
+    Args:
+        user_portfolio_list: portfolios user has built (see portfolio_from_input)
+    Returns:
+        List of LogPrices of the portfolios.
+    """
+    for rebal_time in set(u['Rebalancing frequency (days)'] for u in user_portfolio_list):
+        track_portfolio_batch([percent_tuple_from_input(u) for u in user_portfolio_list
+                               if u['Rebalancing frequency (days)'] == rebal_time],
+                              rebal_time, INVESTMENT_CLASS_DICT)
+    return [log_prices_from_input(user_input) for user_input in user_portfolio_list]
+
+
+def percent_tuple_from_input(user_input):
+    """
+    Translates the investment classes of a single portfolio to a tuple
+    of investment classes with percentages.
+
+    Args:
+        user_input: dictionary of user inputs for a single portfolio
+    Returns:
+        Tuple of tuples of investment classes with percentages.
+    """
     # Every investment class should be different
     assert len(set(user_input['Investment classes'].keys())) == \
         len(user_input['Investment classes'].keys())
     percent_list = [(invest_class, pct)
                     for invest_class, pct in user_input['Investment classes'].items()]
-    percent_tuple = tuple(percent_list)
-    return track_portfolio_cache(initial, percent_tuple, rebal_time,
-                                 start, end, INVESTMENT_CLASS_DICT)
+    return tuple(percent_list)
+
+
+def holdings_from_inputs(user_portfolio_list):
+    """
+    Groups portfolios by the investment classes they hold, leaving out classes
+    at 0% (as the cached portfolios do), and translates each group's investment
+    classes to weights.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+    Returns:
+        List of tuples, one per group: the sorted descriptions of the investment
+        classes held, the positions of the group's portfolios in user_portfolio_list
+        and a 2-D NumPy array of weights (portfolios x investment classes)
+    """
+    groups = {}
+    for i, user_input in enumerate(user_portfolio_list):
+        key = canonical_key(percent_tuple_from_input(user_input))
+        groups.setdefault(tuple(k for k, v in key), []).append(i)
+    return [(list(assets), np.array(rows),
+             np.array([[user_portfolio_list[i]['Investment classes'][asset] for asset in assets]
+                       for i in rows], dtype=float))
+            for assets, rows in sorted(groups.items())]
 
 
 RETURN_TYPE_DICT = {
@@ -63,13 +148,28 @@ RETURN_TYPE_DICT = {
     'Change in log of portfolio value': 'log'
 }
 
+GRAPH_TYPE_DICT = {
+    'Risk versus return': 'riskreturn',
+    'Probability of return below each threshold': 'cdf',
+    'Simulated future value': 'simulation',
+    'Risk over time': 'series',
+    'Sensitivity of risk to period and frequency': 'sensitivity'
+}
+
 RISK_TYPE_DICT = {
     'Standard deviation of return': 'stddev',
-    'Probability of return below a threshold': 'proba'
+    'Probability of return below a threshold': 'proba',
+    'Value at risk (95%)': 'var',
+    'Conditional value at risk (95%)': 'cvar',
+    'Downside deviation below a threshold': 'downside',
+    'Semi-variance of return': 'semivar',
+    'Maximum drawdown': 'maxdd',
+    'Average drawdown': 'avgdd',
+    'Longest time under water (days)': 'underwater'
 }
 
 
-def export_user_portfolios(user_portfolio_list, user_labels, user_parameters):
+def export_user_portfolios(user_portfolio_list, user_labels, user_parameters, workers=None):
     """
     Translates a list of user portfolios to a dataframe ready for export to graph.
 
@@ -86,10 +186,15 @@ def export_user_portfolios(user_portfolio_list, user_labels, user_parameters):
             rate = threshold rate of return (for probability risk measure)
             start = start date for graphing
             end = end date for graphing
+            resamples = number of bootstrap resamples for confidence intervals (optional)
+            seed = seed of the bootstrap resamples (optional)
+        workers: number of worker processes (None or 1 to compute in this process)
     Returns:
         Dataframe with labels for graphing risk and return of user's chosen portfolios
     """
-    portfolio_list = [portfolio_from_input(user_input) for user_input in user_portfolio_list]
+    if workers is not None and workers > 1 and len(user_portfolio_list) > 1:
+        return export_parallel(user_portfolio_list, user_labels, user_parameters, workers)
+    portfolio_list = log_prices_from_inputs(user_portfolio_list)
     return_type = RETURN_TYPE_DICT[
         user_parameters['Measure of return']
     ]
@@ -104,8 +209,337 @@ def export_user_portfolios(user_portfolio_list, user_labels, user_parameters):
     annualize_return = user_parameters['Display annualized return']
     annualize_risk = user_parameters['Use annualized return for risk measure']
     assert isinstance(period, (float, int))
+    # Confidence intervals are optional: 0 (or no input) resamples skips them
     return label_risk_return(labels=user_labels, portfolios=portfolio_list,
                              start=start, end=end,
                              return_type=return_type, annualize_return=annualize_return,
                              risk_type=risk_type, annualize_risk=annualize_risk,
-                             period=period, freq=freq, threshold=threshold)
+                             period=period, freq=freq, threshold=threshold,
+                             resamples=user_parameters.get('Bootstrap resamples') or 0,
+                             seed=user_parameters.get('Bootstrap seed') or 0)
+
+
+def export_parallel(user_portfolio_list, user_labels, user_parameters, workers):
+    """
+    Computes export_user_portfolios in chunks of portfolios spread over a pool
+    of worker processes. Only the user inputs are sent to the workers: the data
+    sets are loaded (and their binary form brought up to date) before the pool
+    starts, so forked workers share them with this process, and otherwise each
+    worker memory-maps their binary form.
+
+    Args:
+        user_portfolio_list, user_labels, user_parameters: see export_user_portfolios
+        workers: number of worker processes
+    Returns:
+        Dataframe with labels for graphing risk and return, in the order of user_labels
+    """
+    INVESTMENT_CLASS_DICT.prefetch(convert=True)
+    INVESTMENT_CLASS_DICT.matrix()
+    size = -(-len(user_portfolio_list) // (workers * CHUNKS_PER_WORKER))
+    chunks = [(user_portfolio_list[i:i + size], user_labels[i:i + size], user_parameters)
+              for i in range(0, len(user_portfolio_list), size)]
+    with pool_context().Pool(workers) as pool:
+        frames = pool.starmap(export_user_portfolios, chunks)
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_return_cdf(user_portfolio_list, user_labels, user_parameters, thresholds=None):
+    """
+    Translates a list of user portfolios to a dataframe of the probability of a
+    return below each threshold (the distribution of returns), ready for export to graph.
+    The sorted returns of each portfolio are cached, so each threshold is a binary search.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+        thresholds: thresholds rate of return (by default every observed return)
+    Returns:
+        Dataframe with a row per portfolio and threshold: Label, Threshold and Probability
+    """
+    portfolio_list = log_prices_from_inputs(user_portfolio_list)
+    return_type = RETURN_TYPE_DICT[
+        user_parameters['Measure of return']
+    ]
+    frames = []
+    for label, portfolio in zip(user_labels, portfolio_list):
+        threshold, probability = return_cdf(
+            portfolio, user_parameters['Start of period to display'],
+            user_parameters['End of period to display'], thresholds=thresholds,
+            period=user_parameters['Period of return (days) to use for risk measure'],
+            freq=user_parameters['Frequency to measure return'], return_type=return_type,
+            annualize=user_parameters['Use annualized return for risk measure'])
+        frames.append(pd.DataFrame({'Label': label, 'Threshold': threshold,
+                                    'Probability': probability},
+                                   columns=['Label', 'Threshold', 'Probability']))
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_risk_over_time(user_portfolio_list, user_labels, user_parameters,
+                          window=SERIES_WINDOW, step=SERIES_STEP):
+    """
+    Translates a list of user portfolios to a dataframe of risk and return
+    over a trailing window, evaluated at regular dates, ready for export to graph.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+        window: # of days of the trailing window
+        step: # of days between evaluation dates
+    Returns:
+        Dataframe with a row per portfolio and evaluation date: Label, Date, Risk and Return
+    """
+    portfolio_list = log_prices_from_inputs(user_portfolio_list)
+    frames = []
+    for label, portfolio in zip(user_labels, portfolio_list):
+        series = risk_return_series(
+            portfolio, user_parameters['Start of period to display'],
+            user_parameters['End of period to display'], window=window, step=step,
+            return_type=RETURN_TYPE_DICT[user_parameters['Measure of return']],
+            annualize_return=user_parameters['Display annualized return'],
+            risk_type=RISK_TYPE_DICT[user_parameters['Measure of risk']],
+            annualize_risk=user_parameters['Use annualized return for risk measure'],
+            period=user_parameters['Period of return (days) to use for risk measure'],
+            freq=user_parameters['Frequency to measure return'],
+            threshold=user_parameters['Threshold rate of return'])
+        series.insert(0, 'Label', label)
+        frames.append(series)
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_sensitivity(user_portfolio_list, user_labels, user_parameters,
+                       periods=SENSITIVITY_PERIODS, freqs=SENSITIVITY_FREQS, thresholds=None):
+    """
+    Measures the risk of the user's portfolios for every combination of period
+    of return, sampling frequency and threshold, to see how much the choice
+    of these parameters changes the risk of each portfolio and their ranking.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+        periods: periods of return (days) to compare
+        freqs: frequencies to measure return (days) to compare
+        thresholds: thresholds rate of return to compare (by default the user's threshold)
+    Returns:
+        Dataframe with a row per portfolio, period, frequency and threshold:
+        Label, Period, Frequency, Threshold and Risk
+    """
+    portfolio_list = log_prices_from_inputs(user_portfolio_list)
+    if thresholds is None:
+        thresholds = [user_parameters['Threshold rate of return']]
+    thresholds = [0 if threshold is None else threshold for threshold in thresholds]
+    cubes = [risk_sensitivity(
+        portfolio, user_parameters['Start of period to display'],
+        user_parameters['End of period to display'], periods, freqs, thresholds,
+        risk_type=RISK_TYPE_DICT[user_parameters['Measure of risk']],
+        return_type=RETURN_TYPE_DICT[user_parameters['Measure of return']],
+        annualize=user_parameters['Use annualized return for risk measure'])
+             for portfolio in portfolio_list]
+    shape = (len(user_labels), len(periods), len(freqs), len(thresholds))
+    grid = np.meshgrid(np.arange(len(user_labels)), periods, freqs, thresholds, indexing='ij')
+    return pd.DataFrame({
+        'Label': np.asarray(user_labels)[grid[0].ravel()],
+        'Period': grid[1].ravel(),
+        'Frequency': grid[2].ravel(),
+        'Threshold': grid[3].ravel(),
+        'Risk': np.reshape(cubes, shape).ravel()
+    }, columns=['Label', 'Period', 'Frequency', 'Threshold', 'Risk'])
+
+
+def export_frontier(user_portfolio_list, user_parameters):
+    """
+    Finds the efficient frontier of the investment classes used in the user's
+    portfolios, rebalanced at their most common rebalancing frequency,
+    ready for export to graph next to export_user_portfolios.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+    Returns:
+        Dataframe with Risk, Return and a Label describing the weights of each
+        frontier portfolio, by increasing risk
+    """
+    assets = sorted(set(invest_class for user_input in user_portfolio_list
+                        for invest_class, pct in user_input['Investment classes'].items()
+                        if pct > 0))
+    rebal_time = Counter(u['Rebalancing frequency (days)']
+                         for u in user_portfolio_list).most_common(1)[0][0]
+    frontier = efficient_frontier(
+        assets, rebal_time, user_parameters['Start of period to display'],
+        user_parameters['End of period to display'], INVESTMENT_CLASS_DICT,
+        return_type=RETURN_TYPE_DICT[user_parameters['Measure of return']],
+        annualize_return=user_parameters['Display annualized return'],
+        risk_type=RISK_TYPE_DICT[user_parameters['Measure of risk']],
+        annualize_risk=user_parameters['Use annualized return for risk measure'],
+        period=user_parameters['Period of return (days) to use for risk measure'],
+        freq=user_parameters['Frequency to measure return'],
+        threshold=user_parameters['Threshold rate of return'])
+    labels = [', '.join('%s %g%%' % (asset, round(100 * weight, 2))
+                        for asset, weight in zip(assets, weights) if weight > 0)
+              for weights in frontier['weights']]
+    return pd.DataFrame({'Risk': frontier['risk'], 'Return': frontier['return'],
+                         'Label': labels})
+
+
+def export_simulation(user_portfolio_list, user_labels, num_paths=SIMULATION_PATHS,
+                      years=SIMULATION_YEARS, seed=0, workers=None):
+    """
+    Simulates future values of the user's portfolios by bootstrapping the
+    history of the investment classes they hold. Each portfolio resamples the
+    days covered by its own classes, so adding a portfolio changes nothing for
+    the others; portfolios holding the same classes share the same simulated
+    paths, so their distributions can be compared directly.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        num_paths: number of simulated paths
+        years: length of each path in years
+        seed: seed of the simulation
+        workers: number of worker processes (None or 1 to simulate in this process)
+    Returns:
+        Dataframe with a row per portfolio and path: Label, Path, the Terminal value
+        of the initial investment and the Maximum drawdown along the path
+    """
+    terminal, drawdown = simulate_inputs(user_portfolio_list, num_paths=num_paths, years=years,
+                                         seed=seed, workers=workers)
+    initial = np.array([u['Initial investment'] for u in user_portfolio_list], dtype=float)
+    return pd.DataFrame({
+        'Label': np.repeat(user_labels, num_paths),
+        'Path': np.tile(np.arange(num_paths), len(user_labels)),
+        'Terminal value': (terminal * initial).T.ravel(),
+        'Maximum drawdown': drawdown.T.ravel()
+    }, columns=['Label', 'Path', 'Terminal value', 'Maximum drawdown'])
+
+
+def simulate_inputs(user_portfolio_list, num_paths=SIMULATION_PATHS, years=SIMULATION_YEARS,
+                    seed=0, workers=None):
+    """
+    Simulates the user's portfolios, together for those holding the same
+    investment classes and rebalanced at the same frequency.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        other arguments: see export_simulation
+    Returns:
+        Tuple of NumPy arrays (paths x portfolios): the terminal value of 1
+        invested and the maximum drawdown along each path
+    """
+    rebal_times = np.array([u['Rebalancing frequency (days)'] for u in user_portfolio_list])
+    terminal = np.zeros((num_paths, len(user_portfolio_list)))
+    drawdown = np.zeros((num_paths, len(user_portfolio_list)))
+    for assets, rows, weight_matrix in holdings_from_inputs(user_portfolio_list):
+        for rebal_time in set(rebal_times[rows]):
+            group = rebal_times[rows] == rebal_time
+            result = simulate_portfolios(assets, weight_matrix[group], rebal_time,
+                                         INVESTMENT_CLASS_DICT, num_paths=num_paths,
+                                         years=years, seed=seed, workers=workers)
+            terminal[:, rows[group]] = result['terminal']
+            drawdown[:, rows[group]] = result['maxdd']
+    return terminal, drawdown
+
+
+def export_walk_forward(user_portfolio_list, user_labels, user_parameters, splits=None):
+    """
+    Compares the risk and return of the user's portfolios before and after
+    each split date, as if the same query had been run on each split date.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+        splits: split dates (by default once a year, leaving one period of
+            return on both sides)
+    Returns:
+        Tuple of dataframes: risk and return by Label, Split and Sample
+        (see walk_forward.walk_forward), and rank correlations by Split
+        (see walk_forward.rank_stability)
+    """
+    portfolio_list = log_prices_from_inputs(user_portfolio_list)
+    start = user_parameters['Start of period to display']
+    end = user_parameters['End of period to display']
+    period = user_parameters['Period of return (days) to use for risk measure']
+    if splits is None:
+        splits = split_dates(start, end, margin=period)
+    table = walk_forward(portfolio_list, user_labels, start, end, splits,
+                         return_type=RETURN_TYPE_DICT[user_parameters['Measure of return']],
+                         annualize_return=user_parameters['Display annualized return'],
+                         risk_type=RISK_TYPE_DICT[user_parameters['Measure of risk']],
+                         annualize_risk=user_parameters['Use annualized return for risk measure'],
+                         period=period, freq=user_parameters['Frequency to measure return'],
+                         threshold=user_parameters['Threshold rate of return'])
+    return table, rank_stability(table)
+
+
+def estimate_arguments(user_parameters):
+    """
+    Translates user specifications for graphing data to the arguments of
+    the closed-form estimates (see estimates.estimate_risk_return).
+
+    Args:
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+    Returns:
+        Dictionary of keyword arguments
+    """
+    return dict(return_type=RETURN_TYPE_DICT[user_parameters['Measure of return']],
+                annualize_return=user_parameters['Display annualized return'],
+                risk_type=RISK_TYPE_DICT[user_parameters['Measure of risk']],
+                annualize_risk=user_parameters['Use annualized return for risk measure'],
+                period=user_parameters['Period of return (days) to use for risk measure'],
+                freq=user_parameters['Frequency to measure return'],
+                threshold=user_parameters['Threshold rate of return'])
+
+
+def export_estimates(user_portfolio_list, user_labels, user_parameters):
+    """
+    Estimates the risk and return of the user's portfolios in closed form from
+    the means and covariances of their investment classes: a fast estimate of
+    export_user_portfolios that only supports standard deviation and
+    probability of return below a threshold. Each portfolio is estimated over
+    the classes it holds; portfolios holding a class without data over the
+    whole period get NaN.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+    Returns:
+        Dataframe with Risk, Return and Label of each portfolio
+    """
+    risk = np.zeros(len(user_portfolio_list))
+    returns = np.zeros(len(user_portfolio_list))
+    for assets, rows, weight_matrix in holdings_from_inputs(user_portfolio_list):
+        risk[rows], returns[rows] = estimate_risk_return(
+            assets, weight_matrix, user_parameters['Start of period to display'],
+            user_parameters['End of period to display'], INVESTMENT_CLASS_DICT,
+            **estimate_arguments(user_parameters))
+    return pd.DataFrame({'Risk': risk, 'Return': returns, 'Label': user_labels})
+
+
+def export_estimate_drift(user_portfolio_list, user_labels, user_parameters):
+    """
+    Reports how far the closed-form estimates of export_estimates drift from
+    the exact risk and return of export_user_portfolios.
+
+    Args:
+        user_portfolio_list: portfolios user has built
+        user_labels: user-defined (or auto-generated) labels for each portfolio
+        user_parameters: user specifications for graphing data (see export_user_portfolios)
+    Returns:
+        Dataframe with a row per portfolio: Label, Risk, Risk estimate, Risk drift,
+        Return, Return estimate and Return drift (estimate minus exact)
+    """
+    exact = export_user_portfolios(user_portfolio_list, user_labels, user_parameters)
+    estimate = export_estimates(user_portfolio_list, user_labels, user_parameters)
+    return pd.DataFrame({
+        'Label': user_labels,
+        'Risk': exact['Risk'].values,
+        'Risk estimate': estimate['Risk'].values,
+        'Risk drift': estimate['Risk'].values - exact['Risk'].values,
+        'Return': exact['Return'].values,
+        'Return estimate': estimate['Return'].values,
+        'Return drift': estimate['Return'].values - exact['Return'].values
+    }, columns=['Label', 'Risk', 'Risk estimate', 'Risk drift', 'Return', 'Return estimate',
+                'Return drift'])
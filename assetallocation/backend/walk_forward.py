@@ -0,0 +1,173 @@
+"""
+This file runs walk-forward analysis: for each split date, risk and return
+measured before the split (in-sample) are compared to risk and return
+measured after it (out-of-sample), to see whether the past predicts the future.
+The rolling returns of each portfolio are listed once over the whole range,
+and the samples on either side of every split are slices of that list.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from backend.log_prices import YEAR, as_log_prices
+from backend.risk_measures import VAR_LEVELS, risk_measure
+from backend.drawdown import DRAWDOWN_TYPES, calc_drawdown
+from backend.functions import return_list
+
+IN_SAMPLE = 'In-sample'
+OUT_OF_SAMPLE = 'Out-of-sample'
+
+
+def split_dates(start, end, step=YEAR, margin=YEAR):
+    """
+    Lists split dates at a regular step, leaving some time on both sides.
+
+    Args:
+        start, end = start and end dates of the whole range
+        step = # of days between splits
+        margin = smallest # of days before the first split and after the last
+    Returns:
+        DatetimeIndex of split dates
+    """
+    return pd.date_range(start + timedelta(days=margin), end - timedelta(days=margin),
+                         freq=timedelta(days=step))
+
+
+def walk_forward(portfolios, labels, start, end, splits, return_type='percent',
+                 annualize_return=False, risk_type='stddev', annualize_risk=False,
+                 period=YEAR, freq=1, threshold=None, level=VAR_LEVELS[0]):
+    """
+    Measures risk and return of several portfolios before and after each split date.
+    In-sample measures are the same as get_risk_return between start and the split.
+    Rolling returns are sampled every freq days from start, so out-of-sample
+    risk uses the samples starting on or after the split (the same as
+    get_risk_return between the split and end when the split falls on a sample).
+
+    Args:
+        portfolios = list of portfolio data frames (or LogPrices)
+        labels = how we want the portfolios described/labeled
+        start, end = start and end dates of the whole range
+        splits = split dates between start and end
+        other arguments = same as get_risk_return and calc_risk
+    Returns:
+        Dataframe with a row per split, sample and portfolio:
+        Label, Split, Sample (In-sample or Out-of-sample), Risk and Return
+        (empty without splits)
+    """
+    splits = pd.DatetimeIndex(sorted(splits))
+    if len(splits) == 0:
+        return pd.DataFrame(columns=['Label', 'Split', 'Sample', 'Risk', 'Return'])
+    risk, returns = split_measures([as_log_prices(p) for p in portfolios], start, end, splits,
+                                   return_type=return_type, annualize_return=annualize_return,
+                                   risk_type=risk_type, annualize_risk=annualize_risk,
+                                   period=period, freq=freq, threshold=threshold, level=level)
+    return pd.DataFrame({
+        'Label': np.tile(labels, 2 * len(splits)),
+        'Split': np.tile(np.repeat(splits.values, len(labels)), 2),
+        'Sample': np.repeat([IN_SAMPLE, OUT_OF_SAMPLE], len(labels) * len(splits)),
+        'Risk': risk.T.ravel(),
+        'Return': returns.T.ravel()
+    }, columns=['Label', 'Split', 'Sample', 'Risk', 'Return'])
+
+
+def split_measures(portfolios, start, end, splits, return_type='percent',
+                   annualize_return=False, risk_type='stddev', annualize_risk=False,
+                   period=YEAR, freq=1, threshold=None, level=VAR_LEVELS[0]):
+    """
+    Measures risk and return of several portfolios before and after each split date.
+
+    Args:
+        portfolios = list of LogPrices
+        start, end = start and end dates of the whole range
+        splits = sorted DatetimeIndex of split dates between start and end
+        other arguments = same as get_risk_return and calc_risk
+    Returns:
+        Tuple of 2-D NumPy arrays (risk, return) of portfolios x ranges, where
+        the ranges are the in-sample ranges of every split, then the
+        out-of-sample ranges
+    """
+    firsts = pd.DatetimeIndex([start] * len(splits)).append(splits)
+    lasts = splits.append(pd.DatetimeIndex([end] * len(splits)))
+    if risk_type in DRAWDOWN_TYPES:
+        risk = np.array([[calc_drawdown(p, first, last, return_type=return_type)[risk_type]
+                          for first, last in zip(firsts, lasts)] for p in portfolios])
+    else:
+        risk = rolling_split_risk(portfolios, start, end, splits, risk_type=risk_type,
+                                  return_type=return_type, annualize=annualize_risk,
+                                  period=period, freq=freq, threshold=threshold, level=level)
+    return risk, np.array([p.returns(firsts, lasts, return_type=return_type,
+                                     annualize=annualize_return) for p in portfolios])
+
+
+def rolling_split_risk(portfolios, start, end, splits, risk_type='stddev',
+                       return_type='percent', annualize=False, period=YEAR, freq=1,
+                       threshold=None, level=VAR_LEVELS[0]):
+    """
+    Measures risk from rolling returns before and after each split date.
+    The rolling returns are listed once, and the samples on either side
+    of each split are slices of the list.
+
+    Args:
+        same as split_measures
+    Returns:
+        2-D NumPy array of risk (portfolios x ranges), see split_measures
+    """
+    in_counts, out_starts = split_samples(start, end, splits, period=period, freq=freq)
+    rolling = np.array([return_list(p, start, end, period=period, freq=freq,
+                                    return_type=return_type, annualize=annualize)
+                        for p in portfolios])
+    return np.column_stack(
+        [risk_measure(rolling[:, :count], risk_type, threshold=threshold, level=level)
+         for count in in_counts] +
+        [risk_measure(rolling[:, first:], risk_type, threshold=threshold, level=level)
+         for first in out_starts])
+
+
+def split_samples(start, end, splits, period=YEAR, freq=1):
+    """
+    Splits the rolling returns of return_list at each split date.
+
+    Args:
+        start, end = start and end dates of the whole range
+        splits = DatetimeIndex of split dates
+        period, freq = same as return_list
+    Returns:
+        Tuple of NumPy arrays (in_counts, out_starts): the samples before split i
+        are the first in_counts[i], and those after it start at out_starts[i]
+    """
+    samples = pd.date_range(start, end - timedelta(days=period), freq=timedelta(days=freq))
+    in_counts = np.searchsorted(samples.asi8, (splits - timedelta(days=period)).asi8,
+                                side='right')
+    out_starts = np.searchsorted(samples.asi8, splits.asi8)
+    if (in_counts == 0).any() or (out_starts == len(samples)).any():
+        raise Exception('Every split needs a full period of return on both sides.')
+    return in_counts, out_starts
+
+
+def rank_stability(table):
+    """
+    Summarizes how well in-sample measures rank the portfolios out-of-sample:
+    the Spearman rank correlation between in-sample and out-of-sample risk,
+    and between in-sample and out-of-sample return, for each split.
+
+    Args:
+        table = dataframe from walk_forward
+    Returns:
+        Dataframe with a row per split: Split, Risk rank correlation and
+        Return rank correlation (1 when the ranking is kept, -1 when reversed)
+    """
+    rows = []
+    for split, group in table.groupby('Split', sort=True):
+        in_sample = group[group['Sample'] == IN_SAMPLE]
+        out_of_sample = group[group['Sample'] == OUT_OF_SAMPLE]
+        row = [split]
+        for measure in ['Risk', 'Return']:
+            ranks = np.vstack([in_sample[measure].rank().values,
+                               out_of_sample[measure].rank().values])
+            # Undefined when either sample ranks every portfolio the same
+            if (np.ptp(ranks, axis=1) > 0).all():
+                row.append(np.corrcoef(ranks)[0, 1])
+            else:
+                row.append(np.nan)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['Split', 'Risk rank correlation',
+                                       'Return rank correlation'])
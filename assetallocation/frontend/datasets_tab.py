@@ -92,6 +92,8 @@ def attach_callbacks(app):
         if value is None:
             return ""
         dataset = user_input.INVESTMENT_CLASS_DICT[value]
+        if dataset is None:
+            return "No data available for " + value
         return dcc.Graph(
             id='datasets-graph',
             figure=get_params(dataset.index, dataset.values[:, 0]))
@@ -15,11 +15,17 @@ import dash_html_components as html
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
 import backend.user_input as ui
+from backend.log_prices import YEAR
+from backend.series import SERIES_RUNNING_TYPES
 from backend.demo_portfolios import TEST_USER_PARAM_A as options
 import frontend.portfolios_tab as pt
 
+DEFAULT_GRAPH_TYPE = 'Risk versus return'
+# Number of simulated paths drawn on the graph
+GRAPH_SIMULATION_PATHS = 1000
 
-def get_params(x_cords, y_cords, text):
+
+def get_params(x_cords, y_cords, text, frontier_df=None, x_range=None, y_range=None):
     """
     Constructs the plotly specific graph parameters. This configuration
     object can be passed to a Graph dash component.
@@ -28,12 +34,32 @@ def get_params(x_cords, y_cords, text):
         x = the vector containing the x-coordinates of all the points
         y = the vector containing the y-coordinates of all the points
         text = the vector containing the labels of the points.
+        frontier_df = dataframe of the efficient frontier to draw as a line
+            (see user_input.export_frontier), or None
+        x_range, y_range = tuples of vectors with the low and high ends of
+            confidence intervals of the points, drawn as error bars, or None
 
     Returns:
         Plotly graph configuration object
     """
+    error_bars = {}
+    for axis, cords, interval in [('error_x', x_cords, x_range), ('error_y', y_cords, y_range)]:
+        if interval is not None:
+            error_bars[axis] = dict(type='data', symmetric=False,
+                                    array=interval[1] - cords, arrayminus=cords - interval[0],
+                                    color='#999', thickness=1)
+    frontier = []
+    if frontier_df is not None:
+        frontier = [go.Scatter({
+            'x': frontier_df['Risk'].values,
+            'y': frontier_df['Return'].values,
+            'text': frontier_df['Label'].values,
+            'name': 'Efficient frontier',
+            'mode': 'lines',
+            'line': dict(color='#1f77b4')
+        })]
     return {
-        'data': [go.Scatter({
+        'data': frontier + [go.Scatter({
             'x': x_cords,
             'y': y_cords,
             'text': text,
@@ -47,7 +73,8 @@ def get_params(x_cords, y_cords, text):
             'marker': dict(
                 color='black',
                 size=7
-            )
+            ),
+            **error_bars
         })],
         'layout': {
             'title': 'Risk-Return Chart',
@@ -61,6 +88,258 @@ def get_params(x_cords, y_cords, text):
     }
 
 
+def get_cdf_params(cdf_df):
+    """
+    Constructs the plotly specific graph parameters for the probability
+    of a return below each threshold, with one line per portfolio.
+
+    Args:
+        cdf_df = dataframe with Label, Threshold and Probability columns
+            (see user_input.export_return_cdf)
+
+    Returns:
+        Plotly graph configuration object
+    """
+    return {
+        'data': [go.Scatter({
+            'x': group['Threshold'].values,
+            'y': group['Probability'].values,
+            'name': label,
+            'mode': 'lines',
+            'line': dict(shape='hv')
+        }) for label, group in cdf_df.groupby('Label', sort=False)],
+        'layout': {
+            'title': 'Probability of Return Below Threshold',
+            'xaxis': {
+                'title': 'Threshold rate of return'
+            },
+            'yaxis': {
+                'title': 'Probability'
+            }
+        }
+    }
+
+
+def get_simulation_params(simulation_df):
+    """
+    Constructs the plotly specific graph parameters for the distribution
+    of simulated future values, with one box per portfolio.
+
+    Args:
+        simulation_df = dataframe with Label and Terminal value columns
+            (see user_input.export_simulation)
+
+    Returns:
+        Plotly graph configuration object
+    """
+    return {
+        'data': [go.Box({
+            'y': group['Terminal value'].values,
+            'name': label,
+            'boxpoints': False
+        }) for label, group in simulation_df.groupby('Label', sort=False)],
+        'layout': {
+            'title': 'Simulated Value After %d Years' % ui.SIMULATION_YEARS,
+            'yaxis': {
+                'title': 'Value'
+            }
+        }
+    }
+
+
+def get_series_params(series_df, risk_type='stddev'):
+    """
+    Constructs the plotly specific graph parameters for risk and return
+    over time, with a solid risk line and a dotted return line per portfolio.
+    Measures of risk that are recomputed for every window are noted on the graph.
+
+    Args:
+        series_df = dataframe with Label, Date, Risk and Return columns
+            (see user_input.export_risk_over_time)
+        risk_type = measure of risk of the Risk column
+
+    Returns:
+        Plotly graph configuration object
+    """
+    data = []
+    for label, group in series_df.groupby('Label', sort=False):
+        data.append(go.Scatter({
+            'x': group['Date'].values,
+            'y': group['Risk'].values,
+            'name': '%s risk' % label,
+            'mode': 'lines'
+        }))
+        data.append(go.Scatter({
+            'x': group['Date'].values,
+            'y': group['Return'].values,
+            'name': '%s return' % label,
+            'mode': 'lines',
+            'line': dict(dash='dot'),
+            'yaxis': 'y2'
+        }))
+    annotations = []
+    if risk_type not in SERIES_RUNNING_TYPES:
+        annotations.append({
+            'text': 'This measure of risk is recomputed for every window, '
+                    'so it takes longer to draw',
+            'xref': 'paper',
+            'yref': 'paper',
+            'x': 0,
+            'y': 1.05,
+            'showarrow': False
+        })
+    return {
+        'data': data,
+        'layout': {
+            'title': 'Risk and Return over a Trailing %d-Year Window' % (ui.SERIES_WINDOW // YEAR),
+            'annotations': annotations,
+            'xaxis': {
+                'title': 'End of window'
+            },
+            'yaxis': {
+                'title': 'Risk'
+            },
+            'yaxis2': {
+                'title': 'Return',
+                'overlaying': 'y',
+                'side': 'right'
+            }
+        }
+    }
+
+
+def get_sensitivity_params(sensitivity_df):
+    """
+    Constructs the plotly specific graph parameters for the risk of each
+    portfolio by period of return and sampling frequency, with one heatmap
+    per portfolio side by side on a shared color scale.
+
+    Args:
+        sensitivity_df = dataframe with Label, Period, Frequency and Risk
+            columns for one threshold (see user_input.export_sensitivity)
+
+    Returns:
+        Plotly graph configuration object
+    """
+    groups = list(sensitivity_df.groupby('Label', sort=False))
+    width = 1. / len(groups)
+    data, layout = [], {'title': 'Risk by Period of Return and Frequency'}
+    for i, (label, group) in enumerate(groups):
+        suffix = str(i + 1) if i else ''
+        table = group.pivot(index='Period', columns='Frequency', values='Risk')
+        data.append(go.Heatmap({
+            'x': [str(freq) for freq in table.columns],
+            'y': [str(period) for period in table.index],
+            'z': table.values,
+            'zmin': sensitivity_df['Risk'].min(),
+            'zmax': sensitivity_df['Risk'].max(),
+            'showscale': i == 0,
+            'xaxis': 'x' + suffix,
+            'yaxis': 'y' + suffix
+        }))
+        layout['xaxis' + suffix] = {
+            'title': '%s: frequency (days)' % label,
+            'domain': [i * width + 0.02, (i + 1) * width - 0.02],
+            'anchor': 'y' + suffix
+        }
+        layout['yaxis' + suffix] = {
+            'title': 'Period of return (days)' if i == 0 else '',
+            'anchor': 'x' + suffix
+        }
+    return {
+        'data': data,
+        'layout': layout
+    }
+
+
+def get_figure():
+    """
+    Computes the graph of the portfolios on the portfolios tab,
+    in the graph type chosen by the user.
+
+    Args:
+        None
+
+    Returns:
+        Plotly graph configuration object
+    """
+    user_portfolio_list = [s['input'] for s in pt.state]
+    user_labels = [s['name'] for s in pt.state]
+    graph_type = ui.GRAPH_TYPE_DICT[options.get('Graph type', DEFAULT_GRAPH_TYPE)]
+    if graph_type == 'cdf':
+        return get_cdf_params(ui.export_return_cdf(user_portfolio_list, user_labels, options))
+    if graph_type == 'simulation':
+        return get_simulation_params(ui.export_simulation(user_portfolio_list, user_labels,
+                                                          num_paths=GRAPH_SIMULATION_PATHS))
+    if graph_type == 'series':
+        return get_series_params(ui.export_risk_over_time(user_portfolio_list, user_labels,
+                                                          options),
+                                 ui.RISK_TYPE_DICT[options['Measure of risk']])
+    if graph_type == 'sensitivity':
+        return get_sensitivity_params(ui.export_sensitivity(user_portfolio_list, user_labels,
+                                                            options))
+
+    graph_df = ui.export_user_portfolios(user_portfolio_list, user_labels, options)
+    frontier_df = None
+    if options.get('Show efficient frontier', False):
+        frontier_df = ui.export_frontier(user_portfolio_list, options)
+
+    x_cords = graph_df['Risk'].values
+    y_cords = graph_df['Return'].values
+    text = graph_df['Label'].values
+    x_range = y_range = None
+    if 'Risk low' in graph_df:
+        x_range = (graph_df['Risk low'].values, graph_df['Risk high'].values)
+        y_range = (graph_df['Return low'].values, graph_df['Return high'].values)
+
+    return get_params(x_cords, y_cords, text, frontier_df, x_range, y_range)
+
+
+def graph_type_component():
+    """
+    The dash input component that renders
+    a dropdown for selecting the type of graph.
+
+    Args:
+        None
+
+    Returns:
+        dcc.Div object containing the input
+    """
+    component_id = 'graph-type'
+    component = html.Div(children=[
+        "Graph type",
+        html.Span(id=component_id + 'out', children=''),
+        dcc.Dropdown(
+            options=[{'label': i, 'value': i} for i in ui.GRAPH_TYPE_DICT],
+            value=options.get('Graph type', DEFAULT_GRAPH_TYPE),
+            id=component_id
+        )
+    ])
+
+    return component
+
+
+def graph_type_callback(app):
+    """
+    Attaches the callback function for the component
+    rendered in the graph_type_component function
+
+    Args:
+        app = the dash app
+    Returns:
+        None
+    """
+    component_id = 'graph-type'
+
+    @app.callback(
+        Output(component_id + 'out', 'children'),
+        [Input(component_id, 'value')])
+    def _callback(value):
+        options['Graph type'] = value
+        return ''
+
+
 def measure_of_return_component():
     """
     The dash input component that renders
@@ -293,6 +572,53 @@ def frequency_callback(app):
         return ''
 
 
+def resamples_component():
+    """
+    Returns the dash input component that renders a numeric input
+    for the number of bootstrap resamples used for confidence intervals.
+
+    Args:
+        None
+
+    Returns:
+        dcc.Div object containing the input
+    """
+    component_id = 'bootstrap-resamples'
+    component = html.Span(children=[
+        "Bootstrap resamples for confidence intervals (0 for none)",
+        html.Span(id=component_id + 'out', children=''),
+        dcc.Input(
+            type='number',
+            min=0,
+            id=component_id,
+            value=options.get('Bootstrap resamples', 0)
+        ),
+        html.Div(),
+    ])
+
+    return component
+
+
+def resamples_callback(app):
+    """
+    Attaches the callback function for the input
+    rendered in the resamples_component function
+
+    Args:
+        app = the dash app
+    Returns:
+        None
+    """
+    component_id = 'bootstrap-resamples'
+
+    @app.callback(
+        Output(component_id + 'out', 'children'),
+        [Input(component_id, 'value')])
+    def _callback(value):
+        options['Bootstrap resamples'] = value
+        return ''
+
+
 def annualized_component():
     """
     Renders two checkboxes, specifying if risk and
@@ -346,6 +672,50 @@ def annualized_callback(app):
         return ''
 
 
+def frontier_component():
+    """
+    Renders a checkbox, specifying if the efficient frontier of the
+    investment classes in the portfolios should be drawn on the graph.
+
+    Args:
+        None
+
+    Returns:
+        dcc.Div object containing the input
+    """
+    component_id = 'frontier_checkbox'
+    component = html.Div(children=[
+        html.Span(id=component_id + 'out', children=''),
+        dcc.Checklist(
+            options=[{'label': 'Show efficient frontier', 'value': 'frontier'}],
+            id=component_id,
+            values=['frontier'] if options.get('Show efficient frontier', False) else []
+        )
+    ])
+
+    return component
+
+
+def frontier_callback(app):
+    """
+    Attaches the callback function for the checkbox
+    rendered in the frontier_component function
+
+    Args:
+        app = the dash app
+    Returns:
+        None
+    """
+    component_id = 'frontier_checkbox'
+
+    @app.callback(
+        Output(component_id + 'out', 'children'),
+        [Input(component_id, 'values')])
+    def _callback(value):
+        options['Show efficient frontier'] = 'frontier' in (value or [])
+        return ''
+
+
 def render_component():
     """
     Renders a button which the user has to press after
@@ -386,15 +756,7 @@ def render_callback(app):
         Output('riskreturn_graph', 'figure'),
         [Input(component_id, 'n_clicks')])
     def _callback(_value):
-        graph_df = ui.export_user_portfolios(
-            [s['input'] for s in pt.state],
-            [s['name'] for s in pt.state], options)
-
-        x_cords = graph_df['Risk'].values
-        y_cords = graph_df['Return'].values
-        text = graph_df['Label'].values
-
-        return get_params(x_cords, y_cords, text)
+        return get_figure()
 
 
 def get_component():
@@ -408,23 +770,18 @@ def get_component():
     Returns:
         the div containing all the components on this tab
     """
-    graph_df = ui.export_user_portfolios(
-        [s['input'] for s in pt.state],
-        [s['name'] for s in pt.state], options)
-
-    x_cords = graph_df['Risk'].values
-    y_cords = graph_df['Return'].values
-    text = graph_df['Label'].values
-
     return html.Div(children=[
+        graph_type_component(),
         measure_of_return_component(),
         measure_of_risk_component(),
         return_period_component(),
         threshold_component(),
         frequency_component(),
+        resamples_component(),
         annualized_component(),
+        frontier_component(),
         render_component(),
-        dcc.Graph(id='riskreturn_graph', figure=get_params(x_cords, y_cords, text)),
+        dcc.Graph(id='riskreturn_graph', figure=get_figure()),
     ])
 
 
@@ -438,10 +795,13 @@ def attach_callbacks(app):
     Returns:
         None
     """
+    graph_type_callback(app)
     measure_of_return_callback(app)
     measure_of_risk_callback(app)
     return_period_callback(app)
     threshold_callback(app)
     frequency_callback(app)
+    resamples_callback(app)
     annualized_callback(app)
+    frontier_callback(app)
     render_callback(app)
@@ -14,6 +14,7 @@ import sys
 import os
 import inspect
 import unittest
+from datetime import timedelta
 import pandas as pd
 import numpy as np
 CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -418,6 +419,77 @@ class UnitTests(unittest.TestCase):
         self.assertGreaterEqual(ror_percent, 0)
         self.assertLessEqual(ror_percent, 100)
 
+    def test_return_list_matches_calc_return(self):
+        """check that the vectorized return_list gives the same
+        rates of return as calling calc_return on every window.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if the returns differ.
+
+        Raises:
+            Raises AssertionError Values not equal
+        """
+        data_input = functions.invest_dataframe(FILE_NAME)
+        start = pd.Timestamp(str(BOND_START_YEAR) + '-01-02 00:00:00', tz=None)
+        end = pd.Timestamp(str(BOND_END_YEAR) + '-01-03 00:00:00', tz=None)
+        for return_type in ['percent', 'log']:
+            for annualize in [False, True]:
+                out_return = functions.return_list(data_input, start, end, period=QUARTER,
+                                                   freq=7, return_type=return_type,
+                                                   annualize=annualize)
+                days = pd.date_range(start, end - timedelta(days=QUARTER),
+                                     freq=timedelta(days=7))
+                expected = [functions.calc_return(data_input, day, day + timedelta(days=QUARTER),
+                                                  return_type=return_type, annualize=annualize)
+                            for day in days]
+                self.assertTrue(np.allclose(out_return, expected))
+
+    def test_rebalance_index_values(self):
+        """check that rebalance_index rebalances to the target
+        weights on the first day and every rebal_time days after.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        """
+        prices = np.array([[1., 1.], [2., 1.], [2., 1.], [4., 1.]])
+        out_index = functions.rebalance_index(prices, [0.5, 0.5], 2, initial=100)
+        self.assertTrue(np.allclose(out_index, [100, 150, 150, 225]))
+
+    def test_rebalance_indices_match_single(self):
+        """check that each row of rebalance_indices equals the
+        index computed by rebalance_index for the same weights.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        """
+        stock = functions.invest_dataframe(FILE_NAME)
+        bond = functions.invest_dataframe(BOND_FILE_NAME)
+        days = pd.date_range(max(stock.index.min(), bond.index.min()),
+                             min(stock.index.max(), bond.index.max()))
+        prices = functions.price_matrix([stock, bond], days)
+        weight_matrix = [[TEST_STOCKSHARE, 1 - TEST_STOCKSHARE], [0.5, 0.5], [1, 0]]
+        out_indices = functions.rebalance_indices(prices, weight_matrix, QUARTER)
+        for weights, out_index in zip(weight_matrix, out_indices):
+            self.assertTrue(np.allclose(out_index,
+                                        functions.rebalance_index(prices, weights, QUARTER)))
 
 SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
 _ = unittest.TextTestRunner().run(SUITE)
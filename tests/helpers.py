@@ -0,0 +1,48 @@
+'''Shared constants and portfolios of the tests of the backend modules'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import portfolio_cache as pc
+from backend import user_input as ui
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+#Constants
+FILE_NAME = './Data/SP500.csv'
+BOND_FILE_NAME = './Data/BAMLCC0A1AAATRIV.csv'
+TEST_START = pd.Timestamp('1990-01-02 00:00:00')
+TEST_END = pd.Timestamp('2018-01-03 00:00:00')
+YEAR = 365
+QUARTER = 90
+START = pd.Timestamp('2010-01-01 00:00:00')
+END = pd.Timestamp('2018-01-01 00:00:00')
+ASSETS = ['U.S. large-cap stocks (S&P 500 index)',
+          'U.S. small-cap stocks (Wilshire index)',
+          'U.S. Treasury bonds, 3-5 year (S&P index)']
+WEIGHTS = np.array([[0.5, 0.3, 0.2], [0.1, 0.1, 0.8], [1.0, 0.0, 0.0]])
+LABELS = ['Mixed', 'Bonds', 'Stocks']
+
+
+def get_portfolios(weight_matrix=WEIGHTS, start=START, end=END):
+    '''Gets the log values of test portfolios of ASSETS, rebalanced quarterly.
+
+    Args:
+        weight_matrix = 2-D array of weights (portfolios x ASSETS), rows add to 1
+        start, end = start and end dates
+
+    Returns:
+        List of LogPrices, one per portfolio
+    '''
+    return [pc.track_log_prices_cache(tuple(zip(ASSETS, weights)), QUARTER, start, end,
+                                      ui.INVESTMENT_CLASS_DICT)
+            for weights in weight_matrix]
@@ -0,0 +1,90 @@
+'''Tests bootstrap.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import bootstrap
+from backend import log_prices as lp
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, TEST_END, QUARTER
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the bootstrap module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_batch_risk_return(self):
+        '''check that batch_risk_return on a path of log values
+        matches calc_return and calc_risk of the investment.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_prices = lp.LogPrices.from_frame(functions.invest_dataframe(FILE_NAME))
+        for risk_type in ['stddev', 'proba', 'semivar', 'avgdd']:
+            kwargs = dict(return_type='percent', risk_type=risk_type, period=QUARTER, freq=7,
+                          threshold=0.01)
+            days = bootstrap.risk_return_days(log_prices.index, TEST_START, TEST_END,
+                                              risk_type=risk_type, period=QUARTER, freq=7)
+            risk, returns = bootstrap.batch_risk_return(
+                np.vstack([log_prices.log_values[days]] * 2), log_prices.index,
+                TEST_START, TEST_END, days=days, annualize_return=True, **kwargs)
+            expected = functions.get_risk_return([log_prices], TEST_START, TEST_END,
+                                                 annualize_return=True, **kwargs)
+            self.assertTrue(np.allclose(risk, expected['Risk'][0]))
+            self.assertTrue(np.allclose(returns, expected['Return'][0]))
+
+    def test_stationary_bootstrap(self):
+        '''check that bootstrap resamples are made of blocks of
+        consecutive days, are reproducible with a seed, and give
+        confidence intervals in get_risk_return.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        draws = bootstrap.stationary_bootstrap(1000, 20, block_length=50, seed=3)
+        self.assertEqual(draws.shape, (20, 1000))
+        self.assertTrue(((draws >= 0) & (draws < 1000)).all())
+        consecutive = (np.diff(draws, axis=1) % 1000) == 1
+        self.assertTrue(0.9 < consecutive.mean() < 0.995)
+        self.assertTrue(np.array_equal(draws, bootstrap.stationary_bootstrap(1000, 20, 50, 3)))
+        log_prices = lp.LogPrices.from_frame(functions.invest_dataframe(FILE_NAME))
+        intervals = functions.get_risk_return([log_prices], TEST_START, TEST_END, freq=30,
+                                              resamples=40, seed=1)
+        self.assertEqual(list(intervals), ['Risk', 'Return', 'Risk low', 'Risk high',
+                                           'Return low', 'Return high'])
+        self.assertTrue((intervals['Risk low'] < intervals['Risk high']).all())
+        self.assertTrue((intervals['Return low'] < intervals['Return high']).all())
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,141 @@
+'''Tests datasets.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import datasets
+from backend import functions
+from tests.helpers import FILE_NAME, BOND_FILE_NAME
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the datasets module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_dataset_registry_lazy(self):
+        '''check that DatasetRegistry loads a data set only when
+        it is first looked up, loads it once, and lists investment
+        classes without data as None.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        loaded = []
+
+        def _loader(filename):
+            loaded.append(filename)
+            return functions.invest_dataframe(filename)
+
+        registry = datasets.DatasetRegistry({'stock': FILE_NAME, 'none': None}, loader=_loader)
+        self.assertEqual(list(registry), ['stock', 'none'])
+        self.assertEqual(loaded, [])
+        self.assertIsNone(registry['none'])
+        self.assertIs(registry['stock'], registry['stock'])
+        self.assertEqual(loaded, [FILE_NAME])
+        registry.prefetch(background=True).join()
+        self.assertTrue(registry.is_loaded('stock'))
+        self.assertEqual(loaded, [FILE_NAME])
+
+    def test_dataset_registry_matrix(self):
+        '''check that the shared AssetMatrix of a DatasetRegistry
+        only loads the data sets asked for, and grows a column when
+        another investment class is asked for.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        registry = datasets.DatasetRegistry({'stock': FILE_NAME, 'bond': BOND_FILE_NAME,
+                                             'none': None})
+        matrix = datasets.asset_matrix(registry, ['stock'])
+        self.assertEqual(matrix.columns, ['stock'])
+        self.assertFalse(registry.is_loaded('bond'))
+        self.assertIs(datasets.asset_matrix(registry, ['stock']), matrix)
+        matrix = datasets.asset_matrix(registry, ['bond', 'none'])
+        self.assertEqual(matrix.columns, ['stock', 'bond'])
+        self.assertIs(registry.matrix(), matrix)
+
+    def test_binary_dataset_matches_csv(self):
+        '''check that invest_dataframe loads the binary form written
+        by convert_dataset and that it equals the parsed CSV file.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        with tempfile.TemporaryDirectory() as directory:
+            filename = shutil.copy(FILE_NAME, directory)
+            self.assertFalse(functions.binary_is_current(filename))
+            functions.convert_dataset(filename)
+            self.assertTrue(functions.binary_is_current(filename))
+            df_to_test = functions.invest_dataframe(filename)
+            self.assertFalse(df_to_test.values.flags.writeable)
+            pd.testing.assert_frame_equal(df_to_test, functions.read_csv_dataset(filename))
+
+    def test_asset_matrix_alignment(self):
+        '''check that AssetMatrix aligns data sets on a shared
+        calendar with NaN outside each data set's range.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        stock = functions.invest_dataframe(FILE_NAME)
+        bond = functions.invest_dataframe(BOND_FILE_NAME)
+        matrix = datasets.AssetMatrix({'stock': stock, 'bond': bond})
+        first, last = matrix.common_range(['stock', 'bond'])
+        start = max(stock.index.min(), bond.index.min())
+        end = min(stock.index.max(), bond.index.max())
+        self.assertEqual(matrix.calendar[first], start)
+        self.assertEqual(matrix.calendar[last], end)
+        prices = matrix.prices(['bond', 'stock'], first, last)
+        self.assertTrue(np.array_equal(prices[:, 1], stock.loc[start:end].iloc[:, 0].values))
+        self.assertEqual(np.isnan(matrix.values).sum(),
+                         matrix.values.size - len(stock) - len(bond))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,89 @@
+'''Tests drawdown.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import drawdown
+from backend import log_prices as lp
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, TEST_END
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the drawdown module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_drawdown_measures(self):
+        '''check maximum drawdown, average drawdown and time under
+        water on a small known path, and that a two dimensional
+        array of paths gives the same measures as each row alone.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        values = np.array([100., 120., 90., 110., 130., 117.])
+        measures = drawdown.drawdown_measures(np.log(values))
+        self.assertTrue(np.isclose(measures['maxdd'], 0.25))
+        self.assertTrue(np.isclose(measures['avgdd'], (0.25 + 10. / 120 + 0.1) / 6))
+        self.assertEqual(measures['underwater'], 2)
+        paths = np.log(np.vstack([values, values[::-1], np.full(6, 50.)]))
+        batch = drawdown.drawdown_measures(paths, return_type='log')
+        for row, path in enumerate(paths):
+            single = drawdown.drawdown_measures(path, return_type='log')
+            for name in drawdown.DRAWDOWN_TYPES:
+                self.assertTrue(np.isclose(batch[name][row], single[name]))
+
+    def test_drawdown_risk_type(self):
+        '''check that calc_risk gives the drawdown measures of the
+        investment values between two dates, computed with a loop.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        data_input = functions.invest_dataframe(FILE_NAME)
+        values = data_input.loc[TEST_START:TEST_END].iloc[:, 0].values
+        peak, max_drawdown, longest, peak_day = values[0], 0, 0, 0
+        for day, value in enumerate(values):
+            if value >= peak:
+                peak, peak_day = value, day
+            max_drawdown = max(max_drawdown, 1 - value / peak)
+            longest = max(longest, day - peak_day)
+        log_prices = lp.LogPrices.from_frame(data_input)
+        for data in [data_input, log_prices]:
+            self.assertTrue(np.isclose(functions.calc_risk(data, TEST_START, TEST_END,
+                                                           risk_type='maxdd'), max_drawdown))
+            self.assertEqual(functions.calc_risk(data, TEST_START, TEST_END,
+                                                 risk_type='underwater'), longest)
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
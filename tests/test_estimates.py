@@ -0,0 +1,162 @@
+'''Tests estimates.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import estimates
+from backend import sweep
+from backend import user_input as ui
+from backend import demo_portfolios as demo
+from tests.helpers import YEAR, QUARTER, START, END, ASSETS
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the estimates module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_single_class_estimates(self):
+        '''check that estimates are exact for portfolios holding one
+        investment class, and that the moments are cached.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        for return_type, annualize_risk in [('percent', False), ('log', True)]:
+            kwargs = dict(return_type=return_type, annualize_return=True, risk_type='stddev',
+                          annualize_risk=annualize_risk, period=YEAR, freq=10)
+            risk, returns = estimates.estimate_risk_return(ASSETS, np.eye(3), START, END,
+                                                           ui.INVESTMENT_CLASS_DICT, **kwargs)
+            expected = sweep.evaluate_weights(ASSETS, np.eye(3), QUARTER, START, END,
+                                              ui.INVESTMENT_CLASS_DICT, **kwargs)
+            self.assertTrue(np.allclose(risk, expected[0]))
+            self.assertTrue(np.allclose(returns, expected[1]))
+        estimate = estimates.moment_estimate(ASSETS, START, END, ui.INVESTMENT_CLASS_DICT,
+                                             period=YEAR, freq=10, return_type='log',
+                                             annualize=True)
+        self.assertIs(estimate, estimates.moment_estimate(
+            ASSETS[::-1], START, END, ui.INVESTMENT_CLASS_DICT, period=YEAR, freq=10,
+            return_type='log', annualize=True))
+        self.assertEqual(estimate.assets, sorted(ASSETS))
+        self.assertEqual(estimate.num_days, (END - START).days)
+
+    def test_risk_estimates(self):
+        '''check the closed-form risk of a mix of investment classes:
+        standard deviation from the covariance and probability below
+        a threshold from a normal distribution.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        cov = np.array([[0.04, 0.01], [0.01, 0.01]])
+        weights = [[0.5, 0.5], [1, 0]]
+        period = estimates.Moments(np.array([0.1, 0.0]), cov)
+        daily = estimates.Moments(np.zeros(2), np.zeros((2, 2)))
+        estimate = estimates.MomentEstimate(ASSETS[:2], period, 2 * cov, daily, 100,
+                                            return_type='log')
+        self.assertTrue(np.allclose(estimate.risk(weights), [np.sqrt(0.0175), 0.2]))
+        # Mean log return of the mix: 0.05 + (0.025 - 0.0175) / 2
+        self.assertTrue(np.allclose(estimate.risk(weights, risk_type='proba', threshold=0.1),
+                                    [estimates.normal_cdf(0.04625 / np.sqrt(0.0175)), 0.5]))
+        self.assertTrue(np.allclose(estimates.normal_cdf([-1.959964, 0]), [0.025, 0.5]))
+        estimate.return_type = 'percent'
+        self.assertTrue(np.allclose(estimate.risk(weights), [np.sqrt(0.035), np.sqrt(0.08)]))
+        estimate.period_div = 0.5
+        self.assertTrue(np.allclose(estimate.risk(weights)[1],
+                                    np.sqrt(np.expm1(0.16) * np.exp(0.56))))
+        with self.assertRaises(Exception):
+            estimate.risk(weights, risk_type='cvar')
+
+    def test_demo_drift(self):
+        '''check that the drift report compares the estimates with the
+        exact risk and return of the demo portfolios, and that the
+        estimates stay close to them.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        portfolios = demo.demo_portfolios(10000, QUARTER, demo.START_PORTFOLIOS,
+                                          demo.END_PORTFOLIOS, demo.TEST_USER_PARAM_B,
+                                          stock_only=True, mix=True)
+        user_list = [portfolio['input'] for portfolio in portfolios]
+        labels = [portfolio['name'] for portfolio in portfolios]
+        drift = ui.export_estimate_drift(user_list, labels, demo.TEST_USER_PARAM_B)
+        self.assertEqual(list(drift['Label']), labels)
+        exact = ui.export_user_portfolios(user_list, labels, demo.TEST_USER_PARAM_B)
+        self.assertTrue(np.allclose(drift['Risk'], exact['Risk']))
+        self.assertTrue(np.allclose(drift['Return'], exact['Return']))
+        fast = ui.export_estimates(user_list, labels, demo.TEST_USER_PARAM_B)
+        self.assertTrue(np.allclose(drift['Risk estimate'], fast['Risk']))
+        self.assertTrue(np.allclose(drift['Risk drift'], fast['Risk'] - exact['Risk']))
+        # Risk of returns that are not annualized is close
+        params = dict(demo.TEST_USER_PARAM_B, **{'Use annualized return for risk measure': False})
+        drift = ui.export_estimate_drift(user_list, labels, params)
+        self.assertLess((drift['Risk drift'] / drift['Risk']).abs().max(), 0.05)
+        self.assertLess(drift['Return drift'].abs().max(), 0.01)
+
+    def test_export_estimates_own_classes(self):
+        '''check that each portfolio is estimated over the classes it
+        holds: adding a portfolio of a class with a shorter history, or
+        a class at 0% without data, leaves its estimates unchanged.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        params = dict(demo.TEST_USER_PARAM_B, **{
+            'Start of period to display': pd.Timestamp('2000-01-03 00:00:00')})
+        stocks = {'Investment classes': {ASSETS[0]: 1.0}}
+        zero_cash = {'Investment classes': {ASSETS[0]: 1.0, 'Cash at inflation': 0}}
+        bonds = {'Investment classes': {ASSETS[2]: 1.0}}
+        alone = ui.export_estimates([stocks], ['Stocks'], params)
+        together = ui.export_estimates([zero_cash, bonds], ['Stocks', 'Bonds'], params)
+        self.assertTrue(np.isfinite(alone[['Risk', 'Return']].values).all())
+        self.assertTrue(np.allclose(together[['Risk', 'Return']].values[0],
+                                    alone[['Risk', 'Return']].values[0]))
+        self.assertTrue(together[['Risk', 'Return']].isnull().values[1].all())
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
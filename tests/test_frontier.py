@@ -0,0 +1,140 @@
+'''Tests frontier.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import time
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import frontier
+from backend import sweep
+from backend import user_input as ui
+from tests.helpers import YEAR, QUARTER, START, END, ASSETS
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the frontier module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_pareto_front(self):
+        '''check that only the points not beaten on both risk and
+        return are kept, by increasing risk.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        risk = np.array([1., 2., 2., 3., 0.5, 4.])
+        returns = np.array([1., 3., 2., 2.5, 0.5, 4.])
+        self.assertEqual(list(frontier.pareto_front(risk, returns)), [4, 0, 1, 5])
+
+    def test_efficient_frontier(self):
+        '''check that the frontier is not beaten by any split on a
+        grid, and that its risk and return are those of its weights.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        kwargs = dict(risk_type='stddev', period=YEAR, freq=10)
+        front = frontier.efficient_frontier(ASSETS, QUARTER, START, END,
+                                            ui.INVESTMENT_CLASS_DICT, **kwargs)
+        self.assertTrue(np.allclose(front['weights'].sum(axis=1), 1))
+        self.assertTrue((np.diff(front['risk']) > 0).all())
+        self.assertTrue((np.diff(front['return']) > 0).all())
+        risk, returns = sweep.evaluate_weights(ASSETS, front['weights'], QUARTER, START, END,
+                                               ui.INVESTMENT_CLASS_DICT, **kwargs)
+        self.assertTrue(np.allclose(front['risk'], risk))
+        self.assertTrue(np.allclose(front['return'], returns))
+        grid = sweep.sweep_risk_return(ASSETS, 20, QUARTER, START, END,
+                                       ui.INVESTMENT_CLASS_DICT, **kwargs)
+        for point in front:
+            self.assertFalse(np.any((grid['risk'] < point['risk'] - 1e-4) &
+                                    (grid['return'] > point['return'] + 1e-4)))
+
+    def test_efficient_frontier_proba(self):
+        '''check that no split on a 2% grid beats the frontier for
+        a measure of risk that changes in steps (the probability of
+        a loss), whose frontier climbing alone does not reach.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        kwargs = dict(risk_type='proba', period=YEAR, freq=10, threshold=0)
+        front = frontier.efficient_frontier(ASSETS, QUARTER, START, END,
+                                            ui.INVESTMENT_CLASS_DICT, **kwargs)
+        grid = sweep.sweep_risk_return(ASSETS, 50, QUARTER, START, END,
+                                       ui.INVESTMENT_CLASS_DICT, **kwargs)
+        for point in front:
+            no_worse = (grid['risk'] <= point['risk'] + 1e-12) & \
+                (grid['return'] >= point['return'] - 1e-12)
+            better = (grid['risk'] < point['risk'] - 1e-12) | \
+                (grid['return'] > point['return'] + 1e-12)
+            self.assertFalse(np.any(no_worse & better))
+
+    def test_efficient_frontier_many_assets(self):
+        '''check that the frontier of ten investment classes is found
+        quickly for a measure from the whole path of values (maximum
+        drawdown), and keeps at most one point per bucket of risk.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        assets = ASSETS + ['U.S. large-cap stocks (Wilshire index)',
+                           'U.S. mid-cap stocks (Wilshire index)',
+                           'U.S. corporate bonds (investment-grade, AAA rated)',
+                           'U.S. corporate bonds (investment-grade, BBB rated)',
+                           'U.S. Treasury bonds, total market (S&P index)',
+                           'U.S. Treasury bonds, 0-1 year (S&P index)',
+                           'U.S. Treasury bonds, 5-7 year (S&P index)']
+        began = time.time()
+        front = frontier.efficient_frontier(assets, QUARTER, START, END,
+                                            ui.INVESTMENT_CLASS_DICT, risk_type='maxdd')
+        self.assertLess(time.time() - began, 30)
+        self.assertTrue(1 < len(front) <= frontier.FRONTIER_BUCKETS + 1)
+        self.assertTrue(np.allclose(front['weights'].sum(axis=1), 1))
+        self.assertTrue((np.diff(front['risk']) > 0).all())
+        self.assertTrue((np.diff(front['return']) > 0).all())
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,88 @@
+'''Tests log_prices.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import log_prices as lp
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, QUARTER
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the log_prices module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_day_offset(self):
+        '''check that day_offset finds the same positions as a
+        label lookup and raises KeyError outside the data set.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        df_to_test = functions.invest_dataframe(FILE_NAME)
+        index = df_to_test.index
+        self.assertTrue(lp.is_daily(index))
+        self.assertEqual(lp.day_offset(index, TEST_START), index.get_loc(TEST_START))
+        weekdays = index[index.dayofweek < 5]
+        self.assertFalse(lp.is_daily(weekdays))
+        self.assertEqual(lp.day_offset(weekdays, TEST_START), weekdays.get_loc(TEST_START))
+        with self.assertRaises(KeyError):
+            lp.day_offset(index, index[-1] + timedelta(days=1))
+        self.assertEqual(lp.day_offset(index, index[-1] + timedelta(days=1),
+                                       bounds_check=False), len(index))
+
+    def test_batch_returns_match_calc_return(self):
+        '''check that batch_returns on LogPrices gives the same
+        rates of return as calc_return on the data frame.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if the returns differ.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        data_input = functions.invest_dataframe(FILE_NAME)
+        log_prices = lp.LogPrices.from_frame(data_input)
+        starts = pd.date_range(TEST_START, periods=5, freq='400D')
+        ends = starts + pd.to_timedelta(np.arange(1, 6) * QUARTER, unit='D')
+        for return_type in ['percent', 'log']:
+            for annualize in [False, True]:
+                out_return = lp.batch_returns(log_prices, starts, ends,
+                                              return_type=return_type,
+                                              annualize=annualize)
+                expected = [functions.calc_return(data_input, start, end,
+                                                  return_type=return_type, annualize=annualize)
+                            for start, end in zip(starts, ends)]
+                self.assertTrue(np.allclose(out_return, expected))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,145 @@
+'''Tests portfolio_cache.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import portfolio_cache as pc
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, TEST_END, QUARTER
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the portfolio_cache module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_portfolio_cache_eviction(self):
+        '''check that PortfolioCache evicts the least recently
+        used index once the memory budget is exceeded and counts
+        hits, misses and evictions.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        frame = pd.DataFrame({'Value': np.ones(10)}, index=pd.date_range(TEST_START, periods=10))
+        size = int(frame.memory_usage(index=True).sum()) + frame.values.nbytes
+        cache = pc.PortfolioCache(max_bytes=2 * size)
+        cache.put('a', frame)
+        cache.put('b', frame)
+        self.assertIs(cache.get('a'), frame)
+        cache.put('c', frame)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.nbytes, 2 * size)
+        self.assertEqual(cache.stats(), {'entries': 2, 'bytes': 2 * size,
+                                         'hits': 1, 'misses': 1, 'evictions': 1,
+                                         'duplicates_avoided': 0})
+
+    def test_portfolio_cache_memo_budget(self):
+        '''check that results memoized on a cached LogPrices count
+        towards the memory budget of PortfolioCache, and are no
+        longer counted once the index is evicted.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        frame = pd.DataFrame({'Value': np.arange(1., 101.)},
+                             index=pd.date_range(TEST_START, periods=100))
+        size = int(frame.memory_usage(index=True).sum()) + frame.values.nbytes
+        cache = pc.PortfolioCache(max_bytes=3 * size)
+        cache.put('a', frame)
+        log_prices = cache.get('a', log_prices=True)
+        returns = functions.return_list(log_prices.window(frame.index[10], frame.index[-10]),
+                                        frame.index[10], frame.index[-10], period=5)
+        self.assertEqual(log_prices.memo_nbytes, returns.nbytes)
+        self.assertEqual(cache.nbytes, size + returns.nbytes)
+        cache.put('b', frame)
+        cache.put('c', frame)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.nbytes, 2 * size)
+
+    def test_canonical_key(self):
+        '''check that portfolios differing only in order, float
+        noise or zero weights get the same canonical key.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if the keys differ.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        key_1 = pc.canonical_key((('stock', 0.7), ('bond', 0.30000000000000004)))
+        key_2 = pc.canonical_key((('bond', 0.3), ('cash', 0.), ('stock', 0.7)))
+        self.assertEqual(key_1, (('bond', 0.3), ('stock', 0.7)))
+        self.assertEqual(key_1, key_2)
+        frame = pd.DataFrame({'Value': np.ones(10)}, index=pd.date_range(TEST_START, periods=10))
+        cache = pc.PortfolioCache()
+        cache.put(key_1, frame, aliases=['first'])
+        cache.get(key_2, alias='second')
+        cache.get(key_2, alias='second')
+        self.assertEqual(cache.stats()['duplicates_avoided'], 1)
+
+    def test_disk_cache_round_trip(self):
+        '''check that DiskCache reads back a saved portfolio index
+        and ignores it once the underlying data set changes.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        stock = functions.invest_dataframe(FILE_NAME)
+        key = ((('SP500', 1.0),), QUARTER)
+        portfolio_index = functions.track_portfolio(functions.INDEX_BASE, [(stock, 1.0)],
+                                                    QUARTER, TEST_START, TEST_END)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = pc.DiskCache(directory)
+            self.assertIsNone(cache.load(key, [stock]))
+            cache.save(key, [stock], portfolio_index)
+            out_index = cache.load(key, [stock])
+            self.assertTrue(out_index.index.equals(portfolio_index.index))
+            self.assertTrue(np.array_equal(out_index['Value'].values,
+                                           portfolio_index['Value'].values))
+            self.assertIsNone(cache.load(key, [stock * 2]))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,172 @@
+'''Tests risk_measures.py module and the measures of risk in functions.py'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import risk_measures as rm
+from backend import log_prices as lp
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, TEST_END, QUARTER
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the risk_measures module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_calc_risk_no_window(self):
+        '''check that calc_risk gives NaN, not an error, for the
+        probability of a return below the threshold when no period
+        fits between start and end, whether given a data frame or
+        LogPrices.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected value encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        data_input = functions.invest_dataframe(FILE_NAME)
+        start = pd.Timestamp('2015-01-01 00:00:00', tz=None)
+        end = pd.Timestamp('2015-03-01 00:00:00', tz=None)
+        for data in [data_input, lp.LogPrices.from_frame(data_input)]:
+            out_risk = functions.calc_risk(data, start, end, risk_type='proba', period=365)
+            self.assertTrue(np.isnan(out_risk))
+
+    def test_rolling_risk_stats_match_return_list(self):
+        '''check that rolling_risk_stats gives the same mean,
+        variance and count below threshold as the full return_list
+        for several periods, even when split into small chunks.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        data_input = functions.invest_dataframe(FILE_NAME)
+        periods = [30, QUARTER, 365]
+        stats = functions.rolling_risk_stats(data_input, TEST_START, TEST_END, periods=periods,
+                                             freq=3, threshold=0.01, chunk_size=100)
+        for period in periods:
+            returns = functions.return_list(data_input, TEST_START, TEST_END,
+                                            period=period, freq=3)
+            self.assertEqual(stats[period].count, len(returns))
+            self.assertTrue(np.isclose(stats[period].mean, np.mean(returns)))
+            self.assertTrue(np.isclose(stats[period].variance, np.var(returns)))
+            self.assertEqual(stats[period].below, np.sum(returns < 0.01))
+
+    def test_risk_measures(self):
+        '''check the risk measures of risk_measures on a small
+        known array of returns, and that calc_risk gives the
+        same values from the rolling returns of an investment.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        returns = np.array([-0.2, -0.1, 0.0, 0.1, 0.2])
+        measures = rm.risk_measures(returns, threshold=0.05, levels=[0.8])
+        self.assertTrue(np.isclose(measures['stddev'], np.std(returns)))
+        self.assertEqual(measures['proba'], 0.6)
+        self.assertTrue(np.isclose(measures['var_80'], 0.12))
+        self.assertTrue(np.isclose(measures['cvar_80'], 0.2))
+        self.assertTrue(np.isclose(measures['downside'], np.sqrt((0.0625 + 0.0225 + 0.0025) / 5)))
+        self.assertTrue(np.isclose(measures['semivar'], (0.04 + 0.01) / 5))
+        data_input = functions.invest_dataframe(FILE_NAME)
+        returns = functions.return_list(data_input, TEST_START, TEST_END, freq=7)
+        expected = rm.risk_measures(returns, threshold=0.02)
+        for risk_type, name in [('var', 'var_95'), ('cvar', 'cvar_95'),
+                                ('downside', 'downside'), ('semivar', 'semivar')]:
+            risk = functions.calc_risk(data_input, TEST_START, TEST_END, risk_type=risk_type,
+                                       freq=7, threshold=0.02)
+            self.assertTrue(np.isclose(risk, expected[name]))
+
+    def test_risk_bundle_memoized(self):
+        '''check that the rolling returns and risk measures of a
+        LogPrices window are computed once and then reused.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_prices = lp.LogPrices.from_frame(functions.invest_dataframe(FILE_NAME))
+        window = log_prices.window(TEST_START, TEST_END)
+        self.assertIs(log_prices.window(TEST_START, TEST_END), window)
+        returns = functions.return_list(window, TEST_START, TEST_END, freq=7)
+        self.assertIs(functions.return_list(window, TEST_START, TEST_END, freq=7), returns)
+        self.assertFalse(returns.flags.writeable)
+        bundle = functions.risk_bundle(window, TEST_START, TEST_END, freq=7)
+        self.assertIs(functions.risk_bundle(window, TEST_START, TEST_END, freq=7), bundle)
+        self.assertEqual(functions.calc_risk(window, TEST_START, TEST_END, risk_type='cvar',
+                                             freq=7), bundle['cvar_95'])
+
+    def test_return_cdf(self):
+        '''check that the probabilities from the sorted returns
+        match a direct count of returns below each threshold.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        data_input = functions.invest_dataframe(FILE_NAME)
+        returns = functions.return_list(data_input, TEST_START, TEST_END, freq=5)
+        thresholds = [-0.2, -0.05, 0, 0.05, 0.2]
+        log_prices = lp.LogPrices.from_frame(data_input)
+        cdf_thresholds, probabilities = functions.return_cdf(log_prices, TEST_START, TEST_END,
+                                                             thresholds=thresholds, freq=5)
+        self.assertEqual(list(cdf_thresholds), thresholds)
+        for threshold, probability in zip(thresholds, probabilities):
+            self.assertEqual(probability, np.mean(returns < threshold))
+            self.assertEqual(functions.calc_risk(log_prices, TEST_START, TEST_END,
+                                                 risk_type='proba', freq=5,
+                                                 threshold=threshold), probability)
+        all_thresholds, probabilities = functions.return_cdf(data_input, TEST_START, TEST_END,
+                                                             freq=5)
+        self.assertTrue(np.array_equal(all_thresholds, np.sort(returns)))
+        self.assertEqual(probabilities[-1], 1)
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
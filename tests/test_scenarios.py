@@ -0,0 +1,139 @@
+'''Tests scenarios.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import scenarios
+from backend import simulation
+from backend import user_input as ui
+from tests.helpers import QUARTER, ASSETS, WEIGHTS
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the scenarios module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_fit_normal(self):
+        '''check that the normal model matches the mean and covariance
+        of the history, that its draws have the same moments, and
+        that fitted models are cached.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_returns = simulation.asset_log_returns(sorted(ASSETS), ui.INVESTMENT_CLASS_DICT)
+        model = scenarios.fitted_model(ASSETS, ui.INVESTMENT_CLASS_DICT)
+        self.assertIs(model, scenarios.fitted_model(ASSETS[::-1], ui.INVESTMENT_CLASS_DICT))
+        self.assertTrue(np.allclose(model.mean, log_returns.mean(axis=0)))
+        self.assertTrue(np.allclose(model.cov, np.cov(log_returns, rowvar=False)))
+        blocks = list(model.draw_periods(np.random.RandomState(0), 2000, 100, 30))
+        self.assertEqual([block.shape for block in blocks],
+                         [(30, 2000, 3)] * 3 + [(10, 2000, 3)])
+        draws = np.concatenate(blocks).reshape(-1, len(ASSETS))
+        self.assertTrue(np.allclose(np.cov(draws, rowvar=False), model.cov,
+                                    rtol=0.02, atol=1e-8))
+        with self.assertRaises(Exception):
+            scenarios.fitted_model(ASSETS, ui.INVESTMENT_CLASS_DICT, model='gaussian')
+
+    def test_fit_t_and_regimes(self):
+        '''check that the Student-t model keeps the covariance of the
+        history with heavier tails than the normal model, and that the
+        regime model has more volatile draws in its volatile regime.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        normal = scenarios.fitted_model(ASSETS, ui.INVESTMENT_CLASS_DICT)
+        student = scenarios.fitted_model(ASSETS, ui.INVESTMENT_CLASS_DICT, model='t')
+        self.assertTrue(np.allclose(student.cov, normal.cov))
+        draws = {}
+        for name, model in [('normal', normal), ('t', student)]:
+            blocks = model.draw_periods(np.random.RandomState(0), 4000, 100, 100)
+            draws[name] = np.concatenate(list(blocks))[..., 0].ravel()
+        limit = 4 * np.sqrt(normal.cov[0, 0])
+        self.assertTrue(np.mean(np.abs(draws['t'] - student.mean[0]) > limit) >
+                        2 * np.mean(np.abs(draws['normal'] - normal.mean[0]) > limit))
+
+        regime = scenarios.fitted_model(ASSETS, ui.INVESTMENT_CLASS_DICT, model='regime')
+        self.assertTrue(np.allclose(regime.transition.sum(axis=1), 1))
+        self.assertAlmostEqual(regime.initial.sum(), 1)
+        self.assertTrue((np.diag(regime.transition) > 0.5).all())
+        self.assertTrue((np.diag(regime.regimes[1].cov) > np.diag(regime.regimes[0].cov)).all())
+        blocks = list(regime.draw_periods(np.random.RandomState(0), 100, 250, QUARTER))
+        self.assertEqual(sum(len(block) for block in blocks), 250)
+
+    def test_simulate_scenarios(self):
+        '''check that scenario simulations give the same paths for the
+        same seed, in this process or in worker processes (or with the
+        investment classes in another order), that another seed or
+        model does not, and that stress scales the spread.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        kwargs = dict(num_paths=50, years=2, chunk_size=16)
+        for model in ['normal', 't', 'regime']:
+            result = scenarios.simulate_scenarios(ASSETS, WEIGHTS, QUARTER,
+                                                  ui.INVESTMENT_CLASS_DICT, model=model,
+                                                  seed=1, **kwargs)
+            self.assertEqual(result['terminal'].shape, (50, 3))
+            self.assertTrue((result['terminal'] > 0).all())
+            self.assertTrue(((result['maxdd'] >= 0) & (result['maxdd'] < 1)).all())
+            parallel = scenarios.simulate_scenarios(ASSETS, WEIGHTS, QUARTER,
+                                                    ui.INVESTMENT_CLASS_DICT, model=model,
+                                                    seed=1, workers=2, **kwargs)
+            self.assertTrue(np.array_equal(result['terminal'], parallel['terminal']))
+            other = scenarios.simulate_scenarios(ASSETS, WEIGHTS, QUARTER,
+                                                 ui.INVESTMENT_CLASS_DICT, model=model,
+                                                 seed=2, **kwargs)
+            self.assertFalse(np.array_equal(result['terminal'], other['terminal']))
+        calm = scenarios.simulate_scenarios(ASSETS, WEIGHTS, QUARTER, ui.INVESTMENT_CLASS_DICT,
+                                            seed=1, **kwargs)
+        reordered = scenarios.simulate_scenarios(ASSETS[::-1], WEIGHTS[:, ::-1], QUARTER,
+                                                 ui.INVESTMENT_CLASS_DICT, seed=1, **kwargs)
+        self.assertTrue(np.allclose(calm['terminal'], reordered['terminal']))
+        stressed = scenarios.simulate_scenarios(ASSETS, WEIGHTS, QUARTER,
+                                                ui.INVESTMENT_CLASS_DICT, seed=1,
+                                                vol_scale=2, **kwargs)
+        self.assertTrue((np.log(stressed['terminal']).std(axis=0) >
+                         np.log(calm['terminal']).std(axis=0)).all())
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,95 @@
+'''Tests series.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+from datetime import timedelta
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import series
+from backend import log_prices as lp
+from backend import functions
+from tests.helpers import FILE_NAME, TEST_START, TEST_END, QUARTER
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the series module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_risk_return_series(self):
+        '''check that the trailing-window series matches calc_return
+        and calc_risk over each window, for measures from running
+        sums and measures computed per window.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_prices = lp.LogPrices.from_frame(functions.invest_dataframe(FILE_NAME))
+        for risk_type in ['stddev', 'proba', 'downside', 'cvar', 'maxdd']:
+            kwargs = dict(return_type='percent', risk_type=risk_type, period=QUARTER, freq=7,
+                          threshold=0.01)
+            out_series = series.risk_return_series(log_prices, TEST_START, TEST_END,
+                                                   window=2 * 364, step=28, **kwargs)
+            self.assertEqual(list(out_series), ['Date', 'Risk', 'Return'])
+            self.assertEqual(out_series['Date'][0], TEST_START + timedelta(days=2 * 364))
+            for date, risk, rate in out_series.values[::5]:
+                first = date - timedelta(days=2 * 364)
+                expected = functions.get_risk_return([log_prices], first, date, **kwargs)
+                self.assertTrue(np.allclose(risk, expected['Risk'][0]))
+                self.assertTrue(np.allclose(rate, expected['Return'][0]))
+        with self.assertRaises(Exception):
+            series.risk_return_series(log_prices, TEST_START, TEST_END, window=30,
+                                      period=QUARTER)
+
+    def test_risk_sensitivity(self):
+        '''check that every entry of the sensitivity cube matches
+        calc_risk with the same period, frequency and threshold.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_prices = lp.LogPrices.from_frame(functions.invest_dataframe(FILE_NAME))
+        periods, freqs, thresholds = [30, QUARTER, 365], [7, 30], [-0.05, 0, 0.05]
+        for risk_type in ['stddev', 'proba', 'downside', 'var', 'semivar', 'maxdd']:
+            cube = series.risk_sensitivity(log_prices, TEST_START, TEST_END, periods, freqs,
+                                           thresholds, risk_type=risk_type,
+                                           return_type='log', annualize=True)
+            self.assertEqual(cube.shape, (3, 2, 3))
+            for i, period in enumerate(periods):
+                for j, freq in enumerate(freqs):
+                    for k, threshold in enumerate(thresholds):
+                        expected = functions.calc_risk(
+                            log_prices, TEST_START, TEST_END, risk_type=risk_type, period=period,
+                            freq=freq, threshold=threshold, return_type='log', annualize=True)
+                        self.assertTrue(np.allclose(cube[i, j, k], expected))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -0,0 +1,88 @@
+'''Tests simulation.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import simulation
+from backend import functions
+from backend import user_input as ui
+from tests.helpers import QUARTER, ASSETS, WEIGHTS
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the simulation module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_simulate_chunk(self):
+        '''check that the simulated terminal value and maximum
+        drawdown match a rebalanced index of the resampled prices.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        log_returns = simulation.asset_log_returns(ASSETS, ui.INVESTMENT_CLASS_DICT)
+        terminal, drawdown = simulation.simulate_chunk(log_returns, WEIGHTS, QUARTER,
+                                                       4, 1000, 7, 3)
+        days = simulation.bootstrap_days(len(log_returns), 4, 1000, 7, 3)
+        for path in range(4):
+            log_prices = np.vstack([np.zeros((1, len(ASSETS))),
+                                    np.cumsum(log_returns[days[path]], axis=0)])
+            values = functions.rebalance_indices(np.exp(log_prices), WEIGHTS, QUARTER,
+                                                 initial=1)
+            self.assertTrue(np.allclose(terminal[path], values[:, -1]))
+            expected = 1 - (values / np.maximum.accumulate(values, axis=1)).min(axis=1)
+            self.assertTrue(np.allclose(drawdown[path], expected))
+
+    def test_simulate_portfolios_seed(self):
+        '''check that the same seed gives the same paths, in this
+        process or in worker processes, and another seed does not.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        kwargs = dict(num_paths=50, years=2, chunk_size=16)
+        result = simulation.simulate_portfolios(ASSETS, WEIGHTS, QUARTER,
+                                                ui.INVESTMENT_CLASS_DICT, seed=1, **kwargs)
+        self.assertEqual(result['terminal'].shape, (50, 3))
+        self.assertTrue(((result['maxdd'] >= 0) & (result['maxdd'] < 1)).all())
+        parallel = simulation.simulate_portfolios(ASSETS, WEIGHTS, QUARTER,
+                                                  ui.INVESTMENT_CLASS_DICT, seed=1,
+                                                  workers=2, **kwargs)
+        other = simulation.simulate_portfolios(ASSETS, WEIGHTS, QUARTER,
+                                               ui.INVESTMENT_CLASS_DICT, seed=2, **kwargs)
+        self.assertTrue(np.array_equal(result['terminal'], parallel['terminal']))
+        self.assertTrue(np.array_equal(result['maxdd'], parallel['maxdd']))
+        self.assertFalse(np.array_equal(result['terminal'], other['terminal']))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
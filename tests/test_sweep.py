@@ -0,0 +1,137 @@
+'''Tests sweep.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import sweep
+from backend import functions
+from backend import portfolio_cache as pc
+from backend import user_input as ui
+from tests.helpers import YEAR, QUARTER, START, END, ASSETS, get_portfolios
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the sweep module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_simplex_counts(self):
+        '''check that the streamed splits are every split in the
+        order of nested loops, whatever the chunk size.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        for num_assets, steps in [(1, 4), (2, 3), (3, 6), (5, 6)]:
+            expected = [split for split in itertools.product(range(steps + 1), repeat=num_assets)
+                        if sum(split) == steps]
+            chunks = list(sweep.simplex_counts(num_assets, steps, chunk_size=7))
+            self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+            actual = [tuple(row) for chunk in chunks for row in chunk]
+            self.assertEqual(actual, expected)
+            self.assertEqual(sweep.simplex_size(num_assets, steps), len(expected))
+
+    def test_evaluate_weights(self):
+        '''check that the batched risk and return of several
+        portfolios match those of the cached portfolio indices.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        weight_matrix = np.array([[0.5, 0.3, 0.2], [0.1, 0.1, 0.8], [0.6, 0.2, 0.2]])
+        portfolios = get_portfolios(weight_matrix)
+        for risk_type in ['stddev', 'proba', 'cvar', 'maxdd']:
+            kwargs = dict(return_type='log', risk_type=risk_type, period=YEAR, freq=10,
+                          threshold=0)
+            risk, returns = sweep.evaluate_weights(ASSETS, weight_matrix, QUARTER, START, END,
+                                                   ui.INVESTMENT_CLASS_DICT, **kwargs)
+            expected = functions.get_risk_return(portfolios, START, END, **kwargs)
+            self.assertTrue(np.allclose(risk, expected['Risk']))
+            self.assertTrue(np.allclose(returns, expected['Return']))
+
+    def test_evaluate_weights_zero_weight(self):
+        '''check that a class held at 0% does not limit the history
+        of a portfolio, and that portfolios holding a class without
+        data over the whole range get NaN.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        start = pd.Timestamp('2000-01-03 00:00:00')
+        assets = [ASSETS[0], ASSETS[2]]
+        portfolio = pc.track_log_prices_cache(((ASSETS[0], 1.0),), QUARTER, start, END,
+                                              ui.INVESTMENT_CLASS_DICT)
+        expected = functions.get_risk_return([portfolio], start, END, period=YEAR, freq=10)
+        risk, returns = sweep.evaluate_weights(assets, [[1, 0], [0.5, 0.5]], QUARTER, start,
+                                               END, ui.INVESTMENT_CLASS_DICT, period=YEAR,
+                                               freq=10)
+        self.assertTrue(np.allclose(risk[0], expected['Risk']))
+        self.assertTrue(np.allclose(returns[0], expected['Return']))
+        self.assertTrue(np.isnan(risk[1]) and np.isnan(returns[1]))
+
+    def test_sweep_risk_return(self):
+        '''check that the sweep has one row per split with the
+        weights of simplex_weights and their risk and return.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        results = sweep.sweep_risk_return(ASSETS, 10, QUARTER, START, END,
+                                          ui.INVESTMENT_CLASS_DICT, chunk_size=16,
+                                          risk_type='stddev', period=YEAR, freq=10)
+        weights = np.concatenate(list(sweep.simplex_weights(len(ASSETS), 10)))
+        self.assertEqual(len(results), 66)
+        self.assertTrue(np.array_equal(results['weights'], weights))
+        risk, returns = sweep.evaluate_weights(ASSETS, weights, QUARTER, START, END,
+                                               ui.INVESTMENT_CLASS_DICT, risk_type='stddev',
+                                               period=YEAR, freq=10)
+        self.assertTrue(np.allclose(results['risk'], risk))
+        self.assertTrue(np.allclose(results['return'], returns))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)
@@ -4,6 +4,7 @@ import sys
 import os
 import inspect
 import unittest
+import numpy as np
 import pandas as pd
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
@@ -282,6 +283,242 @@ class UnitTests(unittest.TestCase):
         expected_row_num = len(TEST_USER_INPUT)
         self.assertEqual(actual_row_num, expected_row_num)
 
+    def test_export_return_cdf(self):
+        '''check that the distribution of returns has a row per
+        portfolio and threshold, and that its probability at the
+        threshold matches the probability risk measure.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_portfolio_list = [portfolio['input'] for portfolio in TEST_USER_INPUT]
+        user_labels = [portfolio['name'] for portfolio in TEST_USER_INPUT]
+        thresholds = [-0.1, THRESHOLD_A, 0.1]
+        cdf_data = ui.export_return_cdf(user_portfolio_list, user_labels,
+                                        TEST_USER_PARAM_A, thresholds=thresholds)
+        self.assertEqual(list(cdf_data), ['Label', 'Threshold', 'Probability'])
+        self.assertEqual(len(cdf_data), len(TEST_USER_INPUT) * len(thresholds))
+        export_data = ui.export_user_portfolios(user_portfolio_list, user_labels,
+                                                TEST_USER_PARAM_A)
+        at_threshold = cdf_data[cdf_data['Threshold'] == THRESHOLD_A]
+        self.assertEqual(list(at_threshold['Probability']), list(export_data['Risk']))
+
+    def test_export_parallel(self):
+        '''check that computing the export in worker processes
+        gives the same risk and return in the same label order.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_portfolio_list = [portfolio['input'] for portfolio in TEST_USER_INPUT] * 3
+        user_labels = ['Portfolio %d' % i for i in range(len(user_portfolio_list))]
+        serial = ui.export_user_portfolios(user_portfolio_list, user_labels, TEST_USER_PARAM_B)
+        parallel = ui.export_user_portfolios(user_portfolio_list, user_labels,
+                                             TEST_USER_PARAM_B, workers=2)
+        self.assertEqual(list(parallel['Label']), user_labels)
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_export_frontier(self):
+        '''check that the efficient frontier of the investment
+        classes in the portfolios has risk, return and labels.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        frontier_data = ui.export_frontier([portfolio['input'] for portfolio in TEST_USER_INPUT],
+                                           TEST_USER_PARAM_B)
+        self.assertEqual(sorted(list(frontier_data)), ['Label', 'Return', 'Risk'])
+        self.assertGreater(len(frontier_data), 1)
+        self.assertTrue(frontier_data['Risk'].is_monotonic_increasing)
+
+    def test_export_simulation(self):
+        '''check that the simulation has a row per portfolio and
+        path, and that its values start from the initial investment.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        simulation_data = ui.export_simulation(
+            [portfolio['input'] for portfolio in TEST_USER_INPUT],
+            [portfolio['name'] for portfolio in TEST_USER_INPUT], num_paths=20, years=1)
+        self.assertEqual(list(simulation_data),
+                         ['Label', 'Path', 'Terminal value', 'Maximum drawdown'])
+        self.assertEqual(len(simulation_data), 20 * len(TEST_USER_INPUT))
+        self.assertEqual(list(simulation_data['Label'].unique()),
+                         [portfolio['name'] for portfolio in TEST_USER_INPUT])
+        median = simulation_data.groupby('Label', sort=False)['Terminal value'].median()
+        self.assertTrue(np.allclose(median / INITIAL_INV_P1, 1, atol=0.5))
+
+    def test_export_simulation_own_history(self):
+        '''check that each portfolio resamples the history of the
+        classes it holds: adding another portfolio, or a class at 0%
+        without data, leaves its simulated values unchanged.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        first = TEST_USER_INPUT[0]['input']
+        alone = ui.export_simulation([first], ['Alone'], num_paths=20, years=1)
+        zero_cash = dict(first)
+        zero_cash['Investment classes'] = dict(first['Investment classes'],
+                                               **{'Cash at inflation': 0})
+        together = ui.export_simulation([zero_cash, TEST_USER_INPUT[1]['input']],
+                                        ['Alone', 'Other'], num_paths=20, years=1)
+        together = together[together['Label'] == 'Alone']
+        for column in ['Terminal value', 'Maximum drawdown']:
+            self.assertTrue(np.allclose(alone[column].values, together[column].values))
+
+    def test_export_walk_forward(self):
+        '''check that the walk-forward table has in-sample and
+        out-of-sample rows for every split and portfolio, that the
+        in-sample rows match the graph up to the split, and that the
+        summary has a rank correlation per split.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_list = [portfolio['input'] for portfolio in TEST_USER_INPUT]
+        labels = [portfolio['name'] for portfolio in TEST_USER_INPUT]
+        table, stability = ui.export_walk_forward(user_list, labels, TEST_USER_PARAM_A)
+        self.assertEqual(list(table), ['Label', 'Split', 'Sample', 'Risk', 'Return'])
+        splits = table['Split'].unique()
+        self.assertEqual(len(splits), 4)
+        self.assertEqual(len(table), 2 * len(splits) * len(labels))
+        self.assertEqual(list(stability['Split']), list(splits))
+        self.assertTrue(((stability['Return rank correlation'].abs() <= 1) |
+                         stability['Return rank correlation'].isnull()).all())
+        params = dict(TEST_USER_PARAM_A, **{'End of period to display': pd.Timestamp(splits[1])})
+        expected = ui.export_user_portfolios(user_list, labels, params)
+        actual = table[(table['Split'] == splits[1]) & (table['Sample'] == 'In-sample')]
+        self.assertTrue(np.allclose(actual['Risk'], expected['Risk']))
+        self.assertTrue(np.allclose(actual['Return'], expected['Return']))
+
+    def test_export_walk_forward_no_split(self):
+        '''check that a range too short for any split (one period of
+        return on both sides) gives empty tables.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_list = [portfolio['input'] for portfolio in TEST_USER_INPUT]
+        labels = [portfolio['name'] for portfolio in TEST_USER_INPUT]
+        params = dict(TEST_USER_PARAM_A, **{
+            'Start of period to display': pd.Timestamp('2016-01-01'),
+            'End of period to display': pd.Timestamp('2017-06-01')})
+        table, stability = ui.export_walk_forward(user_list, labels, params)
+        self.assertEqual(list(table), ['Label', 'Split', 'Sample', 'Risk', 'Return'])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(len(stability), 0)
+
+    def test_export_risk_over_time(self):
+        '''check that the risk over time has a row per portfolio and
+        evaluation date, and that its last row matches the graph
+        over the last window.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_list = [portfolio['input'] for portfolio in TEST_USER_INPUT]
+        labels = [portfolio['name'] for portfolio in TEST_USER_INPUT]
+        series_data = ui.export_risk_over_time(user_list, labels, TEST_USER_PARAM_A,
+                                               window=2 * YEAR, step=RETURN_FREQ_A)
+        self.assertEqual(list(series_data), ['Label', 'Date', 'Risk', 'Return'])
+        self.assertEqual(list(series_data['Label'].unique()), labels)
+        last = series_data.groupby('Label', sort=False).last()
+        params = dict(TEST_USER_PARAM_A, **{
+            'Start of period to display': last['Date'][0] - pd.Timedelta(days=2 * YEAR),
+            'End of period to display': last['Date'][0]})
+        expected = ui.export_user_portfolios(user_list, labels, params)
+        self.assertTrue(np.allclose(last['Risk'], expected['Risk']))
+        self.assertTrue(np.allclose(last['Return'], expected['Return']))
+
+    def test_export_sensitivity(self):
+        '''check that the sensitivity table has a row per portfolio,
+        period, frequency and threshold, and that the user's own
+        period and frequency give the risk on the graph.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        user_list = [portfolio['input'] for portfolio in TEST_USER_INPUT]
+        labels = [portfolio['name'] for portfolio in TEST_USER_INPUT]
+        sensitivity_data = ui.export_sensitivity(user_list, labels, TEST_USER_PARAM_A,
+                                                 periods=[QUARTER, YEAR],
+                                                 freqs=[RETURN_FREQ_B, RETURN_FREQ_A],
+                                                 thresholds=[-0.1, THRESHOLD_A])
+        self.assertEqual(list(sensitivity_data),
+                         ['Label', 'Period', 'Frequency', 'Threshold', 'Risk'])
+        self.assertEqual(len(sensitivity_data), 2 * 2 * 2 * len(labels))
+        chosen = sensitivity_data[(sensitivity_data['Period'] == YEAR) &
+                                  (sensitivity_data['Frequency'] == RETURN_FREQ_A) &
+                                  (sensitivity_data['Threshold'] == THRESHOLD_A)]
+        expected = ui.export_user_portfolios(user_list, labels, TEST_USER_PARAM_A)
+        self.assertEqual(list(chosen['Label']), labels)
+        self.assertTrue(np.allclose(chosen['Risk'], expected['Risk']))
+
 
 SUITE1 = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
 _ = unittest.TextTestRunner().run(SUITE1)
@@ -0,0 +1,94 @@
+'''Tests walk_forward.py module'''
+#pylint: disable=duplicate-code
+import sys
+import os
+import inspect
+import unittest
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+FINAL_DIR = os.path.join(str(PARENT_DIR), 'assetallocation')
+sys.path.insert(0, PARENT_DIR)
+sys.path.insert(0, FINAL_DIR)
+#pylint: disable=wrong-import-position
+from backend import walk_forward as wf
+from backend import functions
+from tests.helpers import YEAR, START, END, LABELS, get_portfolios
+#pylint: enable=wrong-import-position
+#pylint: enable=duplicate-code
+
+
+class UnitTests(unittest.TestCase):
+    '''Set of unittests for the walk_forward module.
+
+    Each function in this class is a self contained unittest.
+    All queries necessary for execution are run inside the functions
+    without using and global results or variables.
+    '''
+
+    def test_walk_forward(self):
+        '''check that in-sample and out-of-sample risk and return
+        match get_risk_return on either side of splits that fall on
+        a sample date, for several measures of risk.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        portfolios = get_portfolios()
+        splits = wf.split_dates(START, END, step=2 * 360, margin=3 * 360)
+        self.assertEqual(len(splits), 2)
+        for risk_type in ['stddev', 'proba', 'cvar', 'maxdd']:
+            kwargs = dict(return_type='log', annualize_return=True, risk_type=risk_type,
+                          period=YEAR, freq=10, threshold=0)
+            table = wf.walk_forward(portfolios, LABELS, START, END, splits, **kwargs)
+            self.assertEqual(len(table), 2 * len(splits) * len(LABELS))
+            for split in splits:
+                for sample, first, last in [('In-sample', START, split),
+                                            ('Out-of-sample', split, END)]:
+                    expected = functions.get_risk_return(portfolios, first, last, **kwargs)
+                    actual = table[(table['Split'] == split) & (table['Sample'] == sample)]
+                    self.assertEqual(list(actual['Label']), LABELS)
+                    self.assertTrue(np.allclose(actual['Risk'], expected['Risk']))
+                    self.assertTrue(np.allclose(actual['Return'], expected['Return']))
+        with self.assertRaises(Exception):
+            wf.walk_forward(portfolios, LABELS, START, END, [START + pd.Timedelta(days=100)])
+
+    def test_rank_stability(self):
+        '''check that the rank correlation is 1 when the ranking is
+        kept out-of-sample and -1 when it is reversed.
+
+        Args:
+            No special arguments as it is a unittest.
+
+        Returns:
+            No return values. Passes the test if all okay else
+            raises an error if unexpected values encountered.
+
+        Raises:
+            Raises AssertionError Values not equal
+        '''
+        splits = [START, END]
+        table = pd.DataFrame({
+            'Label': LABELS * 4,
+            'Split': np.repeat(splits * 2, 3),
+            'Sample': np.repeat(['In-sample', 'Out-of-sample'], 6),
+            'Risk': [1, 2, 3, 4, 5, 6, 10, 20, 30, 6, 5, 4],
+            'Return': [0.1, 0.3, 0.2, 0.3, 0.1, 0.2, 1, 3, 2, 2, 1, 3]
+        })
+        stability = wf.rank_stability(table)
+        self.assertEqual(list(stability['Split']), splits)
+        self.assertTrue(np.allclose(stability['Risk rank correlation'], [1, -1]))
+        self.assertTrue(np.allclose(stability['Return rank correlation'], [1, 0.5]))
+
+
+SUITE = unittest.TestLoader().loadTestsFromTestCase(UnitTests)
+_ = unittest.TextTestRunner().run(SUITE)